@@ -0,0 +1,146 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    bounded in-process LRU of users keyed by the JWT user id claim.
+
+    Entries expire after timeout seconds so changes made through other
+    workers are picked up. With shared=True misses fall back to Django's
+    cache before hitting the database.
+    """
+
+    def __init__(self, maxsize, timeout, shared=False):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.shared = shared
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared_key(self, user_id):
+        return f"account:jwt_user:{user_id}"
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                user, expires = entry
+                if expires > now:
+                    self._users.move_to_end(user_id)
+                    return copy.copy(user)
+                del self._users[user_id]
+
+        if self.shared:
+            user = cache.get(self._shared_key(user_id))
+            if user is not None:
+                self._remember(user_id, user, now)
+                return copy.copy(user)
+        return None
+
+    def set(self, user_id, user):
+        self._remember(user_id, user, time.monotonic())
+        if self.shared:
+            cache.set(self._shared_key(user_id), user, timeout=self.timeout)
+
+    def _remember(self, user_id, user, now):
+        with self._lock:
+            self._users[user_id] = (copy.copy(user), now + self.timeout)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+        if self.shared:
+            cache.delete(self._shared_key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(
+    maxsize=settings.JWT_USER_CACHE_SIZE,
+    timeout=settings.JWT_USER_CACHE_TIMEOUT,
+    shared=settings.JWT_USER_CACHE_SHARED,
+)
+
+
+def invalidate_user(user):
+    """drops a user from the authentication cache after it changed"""
+    user_cache.invalidate(getattr(user, api_settings.USER_ID_FIELD))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user from user_cache"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        else:
+            self.check_revoked(validated_token, user)
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views, the user is fetched with the async ORM"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            if not user.is_active:
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            user_cache.set(user_id, user)
+        self.check_revoked(validated_token, user)
+        return user
+
+    def check_revoked(self, validated_token, user):
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "account.authentication.CachedJWTAuthentication"
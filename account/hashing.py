@@ -0,0 +1,89 @@
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password operations in progress, try again shortly."
+    default_code = "hashing_busy"
+    # picked up by DRF's exception handler as the Retry-After header
+    wait = 1
+
+
+class HashingLimiter:
+    """
+    bounds how many password hashes a process computes at once.
+
+    Hashing runs on the request's own thread, at most workers at a time. Up
+    to queue_size more operations wait for a turn, anything beyond that, or
+    waiting longer than timeout, fails fast with HashingBusy instead of piling
+    up behind a login burst and starving the other endpoints of CPU.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.timeout = timeout
+        self._admitted = threading.BoundedSemaphore(workers + queue_size)
+        self._running = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._stats = {
+            "count": 0,
+            "rejected": 0,
+            "hash_seconds": 0.0,
+            "wait_seconds": 0.0,
+            "max_hash_seconds": 0.0,
+        }
+
+    def run(self, func, *args):
+        """calls func(*args) once it's this thread's turn and returns its result"""
+        if not self._admitted.acquire(blocking=False):
+            self._record(rejected=1)
+            raise HashingBusy()
+        try:
+            submitted = time.perf_counter()
+            if not self._running.acquire(timeout=self.timeout):
+                self._record(rejected=1)
+                raise HashingBusy()
+            try:
+                return self._timed(submitted, func, *args)
+            finally:
+                self._running.release()
+        finally:
+            self._admitted.release()
+
+    def _timed(self, submitted, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            self._record(
+                count=1,
+                hash_seconds=finished - started,
+                wait_seconds=started - submitted,
+            )
+
+    def _record(self, count=0, rejected=0, hash_seconds=0.0, wait_seconds=0.0):
+        with self._lock:
+            self._stats["count"] += count
+            self._stats["rejected"] += rejected
+            self._stats["hash_seconds"] += hash_seconds
+            self._stats["wait_seconds"] += wait_seconds
+            self._stats["max_hash_seconds"] = max(
+                self._stats["max_hash_seconds"], hash_seconds
+            )
+
+    def stats(self):
+        """operation counts and timings of this process"""
+        with self._lock:
+            return dict(self._stats)
+
+
+hashing_limiter = HashingLimiter(
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    queue_size=settings.PASSWORD_HASHING_QUEUE_SIZE,
+    timeout=settings.PASSWORD_HASHING_TIMEOUT,
+)
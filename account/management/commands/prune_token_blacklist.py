@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding refresh tokens, and with them their "
+        "blacklist entries, in batches. Meant to run on a schedule, e.g. "
+        "daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="seconds to pause between batches to spare the database",
+        )
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by("pk")
+        deleted = 0
+        while ids := list(
+            expired.values_list("pk", flat=True)[: options["batch_size"]]
+        ):
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write(f"deleted {deleted} expired tokens")
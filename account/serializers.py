@@ -1,16 +1,21 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.exceptions import TokenError
 
+from budgetme.metrics import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+from .hashing import hashing_limiter
+from .tokens import CachedBlacklistRefreshToken
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name"]
 
 
-class RegisterUserSerializer(serializers.ModelSerializer):
+class RegisterUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     confirm_password = serializers.CharField(write_only=True)
 
@@ -35,7 +40,12 @@ class RegisterUserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("confirm_password")
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.pop("password")
+        user = User(**validated_data)
+        user.username = User.normalize_username(user.username)
+        user.email = User.objects.normalize_email(user.email)
+        hashing_limiter.run(user.set_password, password)
+        user.save()
         return user
 
 
@@ -47,7 +57,9 @@ class LoginUserSerializer(serializers.Serializer):
         user = User.objects.filter(username=attrs["username"]).first()
         if user is None:
             raise serializers.ValidationError("User not found")
-        if not user.check_password(attrs["password"]):
+        # check_password saves a rehashed password when the hasher's settings
+        # changed since it was stored
+        if not hashing_limiter.run(user.check_password, attrs["password"]):
             raise serializers.ValidationError("Incorrect password")
 
         return user
@@ -64,11 +76,15 @@ class LogoutUserSerializer(serializers.Serializer):
 
     def save(self, **kwargs):
         try:
-            RefreshToken(self.token).blacklist()
+            CachedBlacklistRefreshToken(self.token).blacklist()
         except TokenError:
             self.fail("bad_token")
 
 
+class RefreshTokenSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
 class PasswordChangeSerializer(serializers.Serializer):
     current_password = serializers.CharField(required=True, write_only=True)
     new_password = serializers.CharField(required=True, write_only=True)
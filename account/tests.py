@@ -1,3 +1,201 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache
+from .hashing import HashingBusy, HashingLimiter
+from .tokens import BlacklistCache
+
+PBKDF2 = "django.contrib.auth.hashers.PBKDF2PasswordHasher"
+MD5 = "django.contrib.auth.hashers.MD5PasswordHasher"
+
+
+class BlacklistCacheTests(TestCase):
+    """two BlacklistCache instances stand in for two worker processes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("worker", password="Xx12345678!")
+
+    def blacklist(self, worker):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        jti = token.payload[api_settings.JTI_CLAIM]
+        worker.add(jti)
+        return jti
+
+    def test_per_process_cache_asks_the_database(self):
+        first, second = BlacklistCache(300), BlacklistCache(300)
+        self.assertFalse(first.enabled)
+
+        jti = self.blacklist(second)
+
+        self.assertTrue(first.contains(jti))
+
+    def test_shared_cache_tells_other_workers(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+        ):
+            first, second = BlacklistCache(300), BlacklistCache(300)
+            self.assertTrue(first.enabled)
+            token = RefreshToken.for_user(self.user)
+            # loads the blacklist before the other worker writes to it
+            self.assertFalse(first.contains(token.payload[api_settings.JTI_CLAIM]))
+
+            jti = self.blacklist(second)
+
+            self.assertTrue(first.contains(jti))
+
+
+class HashingLimiterTests(SimpleTestCase):
+    def test_returns_the_result_and_counts_it(self):
+        limiter = HashingLimiter(workers=1, queue_size=0, timeout=1)
+
+        self.assertEqual(limiter.run(sum, [1, 2]), 3)
+        self.assertEqual(limiter.stats()["count"], 1)
+
+    def test_rejects_beyond_workers_and_queue(self):
+        limiter = HashingLimiter(workers=1, queue_size=0, timeout=1)
+
+        with self.assertRaises(HashingBusy):
+            limiter.run(limiter.run, sum, [1, 2])
+        self.assertEqual(limiter.stats()["rejected"], 1)
+        # the slot was given back
+        self.assertEqual(limiter.run(sum, [1, 2]), 3)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class PasswordTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        self.client = APIClient()
+
+    @override_settings(PASSWORD_HASHERS=[MD5])
+    def create_md5_user(self):
+        return User.objects.create_user("spender", password="Xx12345678!")
+
+    @override_settings(PASSWORD_HASHERS=[PBKDF2, MD5])
+    def test_login_upgrades_an_outdated_hash(self):
+        user = self.create_md5_user()
+        self.assertTrue(user.password.startswith("md5$"))
+
+        response = self.client.post(
+            reverse("login"), {"username": "spender", "password": "Xx12345678!"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("Xx12345678!"))
+
+    def test_wrong_password_is_rejected(self):
+        User.objects.create_user("spender", password="Xx12345678!")
+
+        response = self.client.post(
+            reverse("login"), {"username": "spender", "password": "wrong"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_password_change_notifies_the_validators(self):
+        user = User.objects.create_user("spender", password="Xx12345678!")
+        self.client.force_authenticate(user)
+
+        with mock.patch(
+            "django.contrib.auth.base_user.password_validation.password_changed"
+        ) as password_changed:
+            response = self.client.post(
+                reverse("password_change"),
+                {
+                    "current_password": "Xx12345678!",
+                    "new_password": "Yy87654321!",
+                    "confirm_new_password": "Yy87654321!",
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        password_changed.assert_called_once_with("Yy87654321!", user)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("Yy87654321!"))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class UserCacheTests(TestCase):
+    """requests authenticate with a JWT, so request.user comes from user_cache"""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user("spender", password="Xx12345678!")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def profile(self):
+        return self.client.get(reverse("get_edit_user")).json()["response"]
+
+    def change_password(self, current, new):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("password_change"),
+                {
+                    "current_password": current,
+                    "new_password": new,
+                    "confirm_new_password": new,
+                },
+            )
+
+    def test_profile_update_evicts_the_cached_user(self):
+        self.assertEqual(self.profile()["first_name"], "")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                reverse("get_edit_user"),
+                {"username": "spender", "first_name": "Ada"},
+                format="json",
+            )
+
+        self.assertEqual(self.profile()["first_name"], "Ada")
+
+    def test_password_change_evicts_the_cached_user(self):
+        self.profile()
+
+        self.change_password("Xx12345678!", "Yy87654321!")
+
+        self.assertIsNone(user_cache.get(self.user.pk))
+        response = self.change_password("Yy87654321!", "Zz11223344!")
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_update_keeps_a_password_changed_elsewhere(self):
+        self.profile()
+        # another worker changes the password, this one's cache still holds
+        # the old hash
+        changed = User.objects.get(pk=self.user.pk)
+        changed.set_password("Yy87654321!")
+        changed.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                reverse("get_edit_user"),
+                {"username": "spender", "first_name": "Ada"},
+                format="json",
+            )
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("Yy87654321!"))
+        self.assertEqual(self.user.first_name, "Ada")
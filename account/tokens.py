@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BlacklistCache:
+    """
+    per-process set of blacklisted refresh token ids.
+
+    Every blacklist write bumps a generation counter in the shared cache.
+    A check only goes to the database when the generation moved, and then
+    only for entries blacklisted since the last load. The whole set is
+    reloaded every refresh_interval seconds, which also drops pruned entries.
+
+    A per-process cache can't tell this process about tokens revoked by
+    other workers, so with locmem or dummy caches every check asks the
+    database, as simplejwt does.
+    """
+
+    generation_key = "account:token_blacklist:generation"
+    # overlap between incremental loads, covers rows committed out of order
+    overlap = timedelta(seconds=60)
+
+    def __init__(self, refresh_interval, alias=DEFAULT_CACHE_ALIAS):
+        self.refresh_interval = refresh_interval
+        self.alias = alias
+        self._jtis = set()
+        self._generation = None
+        self._loaded_at = None
+        self._reloaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        # the backend itself, django.core.cache.cache is a proxy of it
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    def contains(self, jti):
+        if not self.enabled:
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+        generation = self.cache.get(self.generation_key)
+        with self._lock:
+            if time.monotonic() - self._reloaded_at > self.refresh_interval:
+                self._load(generation, since=None)
+            elif generation is None or generation != self._generation:
+                self._load(generation, since=self._loaded_at)
+            return jti in self._jtis
+
+    def _load(self, generation, since):
+        now = timezone.now()
+        blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        if since is None:
+            self._jtis = set()
+            self._reloaded_at = time.monotonic()
+        else:
+            blacklisted = blacklisted.filter(blacklisted_at__gte=since - self.overlap)
+        self._jtis.update(blacklisted.values_list("token__jti", flat=True))
+        self._generation = generation
+        self._loaded_at = now
+
+    def add(self, jti):
+        with self._lock:
+            self._jtis.add(jti)
+        if self.enabled:
+            try:
+                self.cache.incr(self.generation_key)
+            except ValueError:
+                self.cache.set(self.generation_key, time.time_ns(), timeout=None)
+
+
+blacklist_cache = BlacklistCache(
+    refresh_interval=settings.TOKEN_BLACKLIST_REFRESH_INTERVAL
+)
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check is answered by blacklist_cache"""
+
+    def check_blacklist(self):
+        if blacklist_cache.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
@@ -1,11 +1,19 @@
 from django.urls import path
 
-from .views import RegisterUser, LoginUser, LogoutUser, GetEditUser, PasswordChangeView
+from .views import (
+    RegisterUser,
+    LoginUser,
+    LogoutUser,
+    GetEditUser,
+    PasswordChangeView,
+    RefreshTokenView,
+)
 
 urlpatterns = [
     path("register/", RegisterUser.as_view(), name="register"),
     path("login/", LoginUser.as_view(), name="login"),
     path("logout/", LogoutUser.as_view(), name="logout"),
+    path("token/refresh/", RefreshTokenView.as_view(), name="token_refresh"),
     path("", GetEditUser.as_view(), name="get_edit_user"),
     path("password_change/", PasswordChangeView.as_view(), name="password_change"),
 ]
@@ -1,19 +1,23 @@
 from django.shortcuts import render
 from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth.hashers import check_password
+from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 
+from .authentication import invalidate_user
+from .hashing import hashing_limiter
 from .serializers import (
     RegisterUserSerializer,
     LoginUserSerializer,
     LogoutUserSerializer,
     UserSerializer,
     PasswordChangeSerializer,
+    RefreshTokenSerializer,
 )
 
 
@@ -21,6 +25,7 @@ from .serializers import (
 class RegisterUser(generics.CreateAPIView):
     serializer_class = RegisterUserSerializer
     permission_classes = [AllowAny]
+    throttle_scope = "login"
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -37,21 +42,21 @@ class RegisterUser(generics.CreateAPIView):
 @extend_schema(tags=["auth"])
 class LoginUser(generics.GenericAPIView):
     permission_classes = [AllowAny]
+    throttle_scope = "login"
     serializer_class = LoginUserSerializer
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data
-        user_info = User.objects.get(username=user)
         token = RefreshToken.for_user(user)
         data = serializer.data
         data["user"] = {
-            "id": user_info.id,
-            "username": user_info.username,
-            "first_name": user_info.first_name,
-            "last_name": user_info.last_name,
-            "email": user_info.email,
+            "id": user.id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "email": user.email,
         }
         data["token"] = {"refresh": str(token), "access": str(token.access_token)}
         response = {
@@ -77,6 +82,11 @@ class LogoutUser(generics.GenericAPIView):
         return Response(response, status=status.HTTP_205_RESET_CONTENT)
 
 
+@extend_schema(tags=["auth"])
+class RefreshTokenView(TokenRefreshView):
+    serializer_class = RefreshTokenSerializer
+
+
 @extend_schema(tags=["user"])
 class GetEditUser(generics.RetrieveUpdateAPIView):
     queryset = User.objects.all()
@@ -101,7 +111,9 @@ class GetEditUser(generics.RetrieveUpdateAPIView):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
 
-        instance = self.get_object()
+        # request.user may be a cached copy, saving it would write back stale
+        # columns such as an old password hash
+        instance = User.objects.get(pk=request.user.pk)
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
@@ -115,33 +127,36 @@ class GetEditUser(generics.RetrieveUpdateAPIView):
     def perform_update(self, instance):
         """save updated instance"""
         instance.save()
+        db_transaction.on_commit(lambda: invalidate_user(instance.instance))
 
 
 @extend_schema(tags=["user"])
 class PasswordChangeView(generics.GenericAPIView):
     serializer_class = PasswordChangeSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = "login"
 
     def get_object(self):
         return self.request.user
 
     def post(self, request, *args, **kwargs):
-        user = self.request.user
-        object = self.get_object()
-        serializer = self.get_serializer(object, data=request.data)
+        # the stored hash, not the one of a possibly stale cached request.user
+        user = User.objects.get(pk=request.user.pk)
+        serializer = self.get_serializer(user, data=request.data)
         serializer.is_valid(raise_exception=True)
         current_password = serializer.validated_data["current_password"]
-        password = user.password
 
-        if not check_password(current_password, password):
+        if not hashing_limiter.run(user.check_password, current_password):
             return Response(
                 {"Error": "Current Password not correct"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         new_password = serializer.validated_data["new_password"]
 
-        user.set_password(new_password)
-        user.save()
+        hashing_limiter.run(user.set_password, new_password)
+        # save() tells the password validators about the change
+        user.save(update_fields=["password"])
+        db_transaction.on_commit(lambda: invalidate_user(user))
 
         response = {
             "message": "Password changed successfully",
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class BudgetmeConfig(AppConfig):
+    name = "budgetme"
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .metrics import install_execute_wrapper
+
+        connection_created.connect(install_execute_wrapper)
@@ -0,0 +1,40 @@
+import math
+
+
+def percentile(samples, pct):
+    """nearest-rank percentile of already sorted samples"""
+    if not samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """throughput and latency percentiles, in milliseconds, of one benchmark run"""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def is_regression(result, previous, tolerance, min_delta_ms):
+    """
+    whether a summarize result regressed against the previous one: p95 grew,
+    or sequential rps dropped, by more than tolerance and by more than
+    min_delta_ms of latency
+    """
+    p95_delta = result["p95_ms"] - previous["p95_ms"]
+    # mean latency, the inverse of the sequential rps
+    mean_delta = 1000 / result["rps"] - 1000 / previous["rps"]
+    return (
+        p95_delta > min_delta_ms
+        and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance)
+    ) or (
+        mean_delta > min_delta_ms and result["rps"] < previous["rps"] * (1 - tolerance)
+    )
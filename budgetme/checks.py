@@ -0,0 +1,48 @@
+"""
+Deployment checks, run by `manage.py check --deploy` from build.sh.
+
+State that every worker has to agree on is kept in Django's cache. LocMemCache
+is per process and DummyCache keeps nothing, so with either one each worker
+would only see its own.
+"""
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+def is_shared(alias):
+    """whether the cache alias is seen by every process"""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+@register(Tags.caches, deploy=True)
+def check_replica_cache(app_configs, **kwargs):
+    """read-after-write stickiness has to hold whichever worker serves a read"""
+    if not settings.DATABASE_REPLICAS or is_shared(DEFAULT_CACHE_ALIAS):
+        return []
+    return [
+        Error(
+            "Read replicas are configured but the default cache is per process.",
+            hint="Set CACHE_BACKEND to a shared cache such as Redis, otherwise "
+            "a user's reads can go to a replica that hasn't caught up with "
+            "their write.",
+            id="budgetme.E001",
+        )
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_throttle_cache(app_configs, **kwargs):
+    """rate limits have to count the requests of every worker"""
+    if is_shared(settings.THROTTLE_CACHE):
+        return []
+    return [
+        Error(
+            f"THROTTLE_CACHE {settings.THROTTLE_CACHE!r} is per process.",
+            hint="Point it at a shared cache such as Redis, otherwise each "
+            "worker allows the full rate on its own.",
+            id="budgetme.E002",
+        )
+    ]
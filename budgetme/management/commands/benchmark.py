@@ -0,0 +1,500 @@
+import json
+import platform
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from budgetme.benchmarking import is_regression, summarize
+from transaction import budgets, exports
+from transaction.models import Budget, Category, ExportJob, Transaction
+
+
+# namespaces whose routes are not part of the API
+SKIPPED_NAMESPACES = {"admin"}
+
+
+def route_names(patterns=None):
+    """names of every route in the URLconf, outside SKIPPED_NAMESPACES"""
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace not in SKIPPED_NAMESPACES:
+                names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def without_throttles():
+    rates = settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    return {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": dict.fromkeys(rates)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database with seed_data, then drives every API "
+        "route through the Django test client and reports requests/sec and "
+        "p50/p95/p99 latency per scenario. Write the results with --output, and "
+        "pass an earlier output as --baseline to fail on regressions. Compare "
+        "hot-path latency before and after archiving by running it once plain "
+        "and once with --archive-after-days against that baseline. "
+        "benchmarks/baseline.json holds a SQLite run with the defaults."
+    )
+    password = "Bench-password-1"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--transactions", type=int, default=2000)
+        parser.add_argument(
+            "--days", type=int, default=365, help="history length of the seeded users"
+        )
+        parser.add_argument(
+            "--archive-after-days",
+            type=int,
+            help="run archive_transactions with this horizon after seeding",
+        )
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="only run scenarios starting with this name, may be repeated",
+        )
+        parser.add_argument("--output", help="write the results to this JSON file")
+        parser.add_argument("--baseline", help="JSON output of an earlier run")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="allowed relative p95 increase or rps drop against the baseline",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=1.0,
+            help="p95 increases smaller than this are never regressions",
+        )
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)["results"]
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        databases = runner.setup_databases()
+        try:
+            call_command(
+                "seed_data",
+                users=options["users"],
+                transactions=options["transactions"],
+                days=options["days"],
+                password=self.password,
+                stdout=self.stdout,
+            )
+            if options["archive_after_days"] is not None:
+                call_command(
+                    "archive_transactions",
+                    days=options["archive_after_days"],
+                    stdout=self.stdout,
+                )
+            # scenarios repeat requests far faster than the throttle rates allow
+            with tempfile.TemporaryDirectory() as export_root, override_settings(
+                EXPORT_ROOT=export_root, REST_FRAMEWORK=without_throttles()
+            ):
+                results = self.run_scenarios(options)
+        finally:
+            runner.teardown_databases(databases)
+            teardown_test_environment()
+
+        artifact = {
+            "meta": {
+                "date": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "users": options["users"],
+                "transactions": options["transactions"],
+                "days": options["days"],
+                "archive_after_days": options["archive_after_days"],
+                "requests": options["requests"],
+            },
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(artifact, file, indent=2)
+
+        regressions = self.report(results, baseline, options)
+        if regressions:
+            raise CommandError(
+                "regressions against the baseline:\n" + "\n".join(regressions)
+            )
+
+    def run_scenarios(self, options):
+        scenarios = self.scenarios()
+        covered = {route for _, route, _ in scenarios}
+        for name in sorted(route_names() - covered):
+            self.stderr.write(f"route {name} has no benchmark scenario")
+
+        results = {}
+        for label, route, prepare in scenarios:
+            if options["scenarios"] and not any(
+                label.startswith(prefix) for prefix in options["scenarios"]
+            ):
+                continue
+            for i in range(options["warmup"]):
+                self.request(prepare(-i - 1))
+            latencies, errors = [], 0
+            for i in range(options["requests"]):
+                latency, failed = self.request(prepare(i))
+                latencies.append(latency)
+                errors += failed
+            results[label] = {
+                "route": route,
+                **summarize(latencies, sum(latencies), errors),
+            }
+        return results
+
+    def request(self, prepared):
+        client, method, path, data, *extra = prepared
+        headers = extra[0] if extra else {}
+        started = time.perf_counter()
+        response = getattr(client, method)(path, data, format="json", **headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return time.perf_counter() - started, response.status_code >= 400
+
+    def client_for(self, user):
+        client = APIClient(SERVER_NAME="localhost")
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+        )
+        return client
+
+    def scenarios(self):
+        """(label, route name, prepare(i) -> (client, method, path, data[, META]))"""
+        user = User.objects.filter(username="seed_user_0").get()
+        admin = User.objects.create_user(
+            "bench_admin", password=self.password, is_staff=True
+        )
+        changer = User.objects.create_user("bench_password", password=self.password)
+        client = self.client_for(user)
+        admin_client = self.client_for(admin)
+        changer_client = self.client_for(changer)
+        anonymous = APIClient(SERVER_NAME="localhost")
+
+        transaction = Transaction.objects.filter(user=user).order_by("-id").first()
+        detail = reverse("transaction_delete", kwargs={"pk": transaction.pk})
+        async_detail = reverse(
+            "transaction_async_detail", kwargs={"pk": transaction.pk}
+        )
+        history = reverse("transaction_history")
+        next_page = client.get(history).json()["response"]["next"]
+        since = (timezone.localdate() - timedelta(days=90)).isoformat()
+        year_ago = (timezone.localdate() - timedelta(days=365)).isoformat()
+        bulk = [
+            {"description": f"bulk {n}", "amount": f"-{n + 1}.25"} for n in range(100)
+        ]
+
+        category = Category.objects.create(user=user, name="Groceries")
+        budget = Budget.objects.create(
+            user=user,
+            category=category,
+            limit=Decimal("400.00"),
+            tracked_from=timezone.localdate(),
+        )
+        budgets.start_tracking(budget)
+        category_detail = reverse(
+            "transaction_category_detail", kwargs={"pk": category.pk}
+        )
+        budget_detail = reverse("transaction_budget_detail", kwargs={"pk": budget.pk})
+
+        ExportJob.objects.create(user=user)
+        export = exports.run_job(exports.claim_job(), 2000)
+        export_detail = reverse("transaction_export_detail", kwargs={"pk": export.pk})
+        download = reverse("transaction_export_download", kwargs={"pk": export.pk})
+
+        passwords = [self.password, self.password + "!"]
+
+        def password_change(i):
+            # swaps the two passwords, after the swap the first one is the new one
+            passwords.reverse()
+            new, current = passwords
+            data = {
+                "current_password": current,
+                "new_password": new,
+                "confirm_new_password": new,
+            }
+            return changer_client, "post", reverse("password_change"), data
+
+        def deletable(i):
+            row = Transaction.objects.create(
+                user=user, description="to delete", amount=Decimal("-1.00")
+            )
+            path = reverse("transaction_delete", kwargs={"pk": row.pk})
+            return client, "delete", path, None
+
+        def queue_export(i):
+            # keeps the user under EXPORT_MAX_ACTIVE_JOBS, nothing runs the jobs
+            ExportJob.objects.filter(user=user, status="pending").delete()
+            data = {"format": "csv", "type": "expense"}
+            return client, "post", reverse("transaction_exports"), data
+
+        def get(route, query="", on=None):
+            path = reverse(route) + query
+            return lambda i: (on or client, "get", path, None)
+
+        def post(route, data, on=None):
+            return lambda i: (on or client, "post", reverse(route), data)
+
+        return [
+            (
+                "register",
+                "register",
+                lambda i: (
+                    anonymous,
+                    "post",
+                    reverse("register"),
+                    {
+                        "username": f"bench_{i}",
+                        "email": f"bench_{i}@example.com",
+                        "password": self.password,
+                        "confirm_password": self.password,
+                    },
+                ),
+            ),
+            (
+                "login",
+                "login",
+                post(
+                    "login",
+                    {"username": user.username, "password": self.password},
+                    anonymous,
+                ),
+            ),
+            (
+                "token_refresh",
+                "token_refresh",
+                lambda i: (
+                    anonymous,
+                    "post",
+                    reverse("token_refresh"),
+                    {"refresh": str(RefreshToken.for_user(user))},
+                ),
+            ),
+            (
+                "logout",
+                "logout",
+                lambda i: (
+                    client,
+                    "post",
+                    reverse("logout"),
+                    {"refresh": str(RefreshToken.for_user(user))},
+                ),
+            ),
+            ("get_edit_user", "get_edit_user", get("get_edit_user")),
+            (
+                "get_edit_user (patch)",
+                "get_edit_user",
+                lambda i: (
+                    client,
+                    "patch",
+                    reverse("get_edit_user"),
+                    {"first_name": f"n{i}"},
+                ),
+            ),
+            ("password_change", "password_change", password_change),
+            (
+                "transaction_create",
+                "transaction_create",
+                post("transaction_create", {"description": "bench", "amount": "-3.50"}),
+            ),
+            (
+                "transaction_create (budget)",
+                "transaction_create",
+                post(
+                    "transaction_create",
+                    {
+                        "description": "bench",
+                        "amount": "-3.50",
+                        "category": category.pk,
+                    },
+                ),
+            ),
+            (
+                "transaction_bulk_create",
+                "transaction_bulk_create",
+                post("transaction_bulk_create", bulk),
+            ),
+            ("transaction_history", "transaction_history", get("transaction_history")),
+            (
+                "transaction_history (next page)",
+                "transaction_history",
+                lambda i: (client, "get", next_page, None),
+            ),
+            (
+                "transaction_history (filtered)",
+                "transaction_history",
+                get(
+                    "transaction_history", f"?start={since}&type=expense&min_amount=10"
+                ),
+            ),
+            (
+                "transaction_history (last year)",
+                "transaction_history",
+                get("transaction_history", f"?start={year_ago}"),
+            ),
+            (
+                "transaction_history (stream)",
+                "transaction_history",
+                get("transaction_history", "?stream=ndjson"),
+            ),
+            ("transaction_sync", "transaction_sync", get("transaction_sync")),
+            (
+                "transaction_summary",
+                "transaction_summary",
+                get("transaction_summary", "?period=week"),
+            ),
+            (
+                "transaction_summary (last year)",
+                "transaction_summary",
+                get("transaction_summary", f"?start={year_ago}"),
+            ),
+            (
+                "transaction_search",
+                "transaction_search",
+                get("transaction_search", "?q=subscr"),
+            ),
+            (
+                "transaction_delete (get)",
+                "transaction_delete",
+                lambda i: (client, "get", detail, None),
+            ),
+            (
+                "transaction_delete (patch)",
+                "transaction_delete",
+                lambda i: (client, "patch", detail, {"amount": f"-{i % 50 + 1}.00"}),
+            ),
+            ("transaction_delete (delete)", "transaction_delete", deletable),
+            (
+                "transaction_categories",
+                "transaction_categories",
+                get("transaction_categories"),
+            ),
+            (
+                "transaction_category_detail",
+                "transaction_category_detail",
+                lambda i: (client, "get", category_detail, None),
+            ),
+            ("transaction_budgets", "transaction_budgets", get("transaction_budgets")),
+            (
+                "transaction_budget_detail",
+                "transaction_budget_detail",
+                lambda i: (client, "get", budget_detail, None),
+            ),
+            (
+                "transaction_budget_detail (patch)",
+                "transaction_budget_detail",
+                lambda i: (client, "patch", budget_detail, {"limit": f"{400 + i}.00"}),
+            ),
+            ("transaction_exports", "transaction_exports", get("transaction_exports")),
+            ("transaction_exports (post)", "transaction_exports", queue_export),
+            (
+                "transaction_export_detail",
+                "transaction_export_detail",
+                lambda i: (client, "get", export_detail, None),
+            ),
+            (
+                "transaction_export_download",
+                "transaction_export_download",
+                lambda i: (client, "get", download, None),
+            ),
+            (
+                "transaction_export_download (range)",
+                "transaction_export_download",
+                lambda i: (
+                    client,
+                    "get",
+                    download,
+                    None,
+                    {"HTTP_RANGE": "bytes=-4096"},
+                ),
+            ),
+            (
+                "transaction_cache_stats",
+                "transaction_cache_stats",
+                get("transaction_cache_stats", on=admin_client),
+            ),
+            (
+                "transaction_async_create",
+                "transaction_async_create",
+                post(
+                    "transaction_async_create",
+                    {"description": "bench", "amount": "-3.50"},
+                ),
+            ),
+            (
+                "transaction_async_history",
+                "transaction_async_history",
+                get("transaction_async_history"),
+            ),
+            (
+                "transaction_async_totals",
+                "transaction_async_totals",
+                get("transaction_async_totals"),
+            ),
+            (
+                "transaction_async_detail",
+                "transaction_async_detail",
+                lambda i: (client, "get", async_detail, None),
+            ),
+            ("metrics", "metrics", get("metrics", on=admin_client)),
+            ("schema", "schema", get("schema", on=anonymous)),
+            ("swagger-ui", "swagger-ui", get("swagger-ui", on=anonymous)),
+            ("redoc", "redoc", get("redoc", on=anonymous)),
+        ]
+
+    def report(self, results, baseline, options):
+        regressions = []
+        self.stdout.write(
+            f"{'scenario':<36} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7}"
+        )
+        for label, result in results.items():
+            line = (
+                f"{label:<36} {result['rps']:>8} {result['p50_ms']:>8} "
+                f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']:>7}"
+            )
+            previous = baseline.get(label)
+            if previous:
+                p95_delta = result["p95_ms"] - previous["p95_ms"]
+                line += f"   p95 {p95_delta:+.2f} ms"
+                if is_regression(
+                    result, previous, options["tolerance"], options["min_delta_ms"]
+                ):
+                    line += "  REGRESSION"
+                    regressions.append(
+                        f"{label}: p95 {previous['p95_ms']} -> {result['p95_ms']} ms, "
+                        f"rps {previous['rps']} -> {result['rps']}"
+                    )
+            self.stdout.write(line)
+        return regressions
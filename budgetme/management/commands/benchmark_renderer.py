@@ -0,0 +1,106 @@
+import datetime
+import io
+import time
+import uuid
+from decimal import Decimal
+from random import Random
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser as DRFJSONParser
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+
+from budgetme import renderers
+from budgetme.parsers import JSONParser
+
+
+def history_payload(rows, rng):
+    """a history response with rows entries and the awkward values JSON can hold"""
+    return {
+        "message": "Transactions retrieved successfully",
+        "status": 200,
+        "response": {
+            "income": Decimal("1234.50"),
+            "expense": Decimal("-987.25"),
+            "balance": Decimal("247.25"),
+            "history": [
+                {
+                    "id": pk,
+                    "description": rng.choice(
+                        ["Groceries", "Café crème", "Rent June", "日用品", 'a "quote"']
+                    ),
+                    "amount": "{:.2f}".format(rng.randint(-50000, 50000) / 100),
+                }
+                for pk in range(rows, 0, -1)
+            ],
+            "next": None,
+            "checked_at": datetime.datetime(
+                2023, 12, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "day": datetime.date(2023, 12, 1),
+            "request_id": uuid.UUID(int=rng.getrandbits(128)),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Times rendering and parsing history responses with DRF's JSONRenderer "
+        "and the orjson and stdlib backends of budgetme.renderers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="50,500,5000,50000",
+            help="comma separated history lengths to benchmark",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = Random(0)
+        drf = DRFJSONRenderer()
+        backends = {"stdlib": renderers.stdlib_dumps}
+        if renderers.orjson is not None:
+            backends["orjson"] = renderers.orjson_dumps
+        else:
+            self.stderr.write("orjson is not installed, only timing the fallback")
+
+        self.stdout.write(
+            f"{'rows':>8} {'drf ms':>8} "
+            + " ".join(f"{name + ' ms':>10}" for name in backends)
+            + f" {'drf parse':>10} {'parse':>8}"
+        )
+        for size in sorted(int(size) for size in options["sizes"].split(",")):
+            data = history_payload(size, rng)
+            timings = [self.best_of(options["repeat"], lambda: drf.render(data))]
+            timings += [
+                self.best_of(options["repeat"], lambda: dumps(data))
+                for dumps in backends.values()
+            ]
+            content = drf.render(data)
+            timings.append(
+                self.best_of(
+                    options["repeat"], lambda: self.parse(DRFJSONParser(), content)
+                )
+            )
+            timings.append(
+                self.best_of(
+                    options["repeat"], lambda: self.parse(JSONParser(), content)
+                )
+            )
+            self.stdout.write(
+                f"{size:>8} {timings[0]:>8.2f} "
+                + " ".join(f"{timing:>10.2f}" for timing in timings[1:-2])
+                + f" {timings[-2]:>10.2f} {timings[-1]:>8.2f}"
+            )
+
+    def parse(self, parser, content):
+        return parser.parse(io.BytesIO(content), "application/json", {})
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
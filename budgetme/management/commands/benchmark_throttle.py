@@ -0,0 +1,101 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from budgetme import throttling
+from budgetme.benchmarking import percentile
+from transaction.models import Transaction
+
+
+def with_rates(rate):
+    """settings with every throttle scope at rate, None turns them off"""
+    scopes = settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+    return override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": dict.fromkeys(scopes, rate),
+        }
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Times one throttle check against THROTTLE_CACHE, then the history "
+        "endpoint with throttling off and on at a rate it never reaches, in a "
+        "throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--checks", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        databases = runner.setup_databases()
+        try:
+            self.run(options)
+        finally:
+            runner.teardown_databases(databases)
+            teardown_test_environment()
+
+    def run(self, options):
+        cache = caches[settings.THROTTLE_CACHE]
+        self.stdout.write(f"throttle cache: {cache.__class__.__name__}")
+
+        checks = options["checks"]
+        started = time.perf_counter()
+        for _ in range(checks):
+            throttling.check("benchmark", "ip:127.0.0.1", checks * 2, 3600)
+        per_check = (time.perf_counter() - started) / checks * 1e6
+        self.stdout.write(f"one check: {per_check:.1f} us")
+
+        user = User.objects.create(username="__benchmark_throttle__")
+        Transaction.objects.bulk_create(
+            Transaction(user=user, description="benchmark", amount=Decimal("-1.00"))
+            for _ in range(200)
+        )
+        client = APIClient(SERVER_NAME="localhost")
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+        )
+        path = reverse("transaction_history")
+        rates = {"off": None, "on": f"{options['requests'] * 10}/h"}
+        latencies = {label: [] for label in rates}
+        cache.clear()
+        # alternating keeps drift in the process from favouring either side
+        for i in range(options["requests"] * 2):
+            label = "off" if i % 2 else "on"
+            with with_rates(rates[label]):
+                started = time.perf_counter()
+                response = client.get(path)
+                latencies[label].append(time.perf_counter() - started)
+            if response.status_code != 200:
+                self.stderr.write(f"throttling {label}: {response.status_code}")
+
+        self.stdout.write(f"{'history':<10} {'p50 ms':>8} {'p95 ms':>8}")
+        timings = {}
+        for label, samples in latencies.items():
+            samples.sort()
+            timings[label] = percentile(samples, 50) * 1000
+            self.stdout.write(
+                f"{label:<10} {timings[label]:>8.2f} "
+                f"{percentile(samples, 95) * 1000:>8.2f}"
+            )
+        self.stdout.write(
+            f"overhead: {timings['on'] - timings['off']:+.3f} ms per request "
+            f"({(timings['on'] / timings['off'] - 1) * 100:+.1f}%)"
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from budgetme.schema import code_version, schema_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the OpenAPI schema into SCHEMA_ARTIFACT_ROOT for the current "
+        "code version, so /schema/ serves it from disk instead of generating it. "
+        "Run it at build time, after collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-old",
+            action="store_true",
+            help="keep the artifacts of other code versions",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        directory = schema_store.build(prune=not options["keep_old"])
+        self.stdout.write(
+            f"wrote the schema for {code_version()} to {directory} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
@@ -0,0 +1,121 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from budgetme.benchmarking import summarize
+
+
+DEFAULT_PATHS = [
+    "/transaction/history/",
+    "/transaction/async/history/",
+    "/transaction/async/totals/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives a running server with concurrent requests and reports requests/sec "
+        "and latency percentiles per path. Run it once against the WSGI deployment "
+        "(gunicorn budgetme.wsgi) and once against the ASGI one (gunicorn -k "
+        "uvicorn.workers.UvicornWorker budgetme.asgi), then pass the first "
+        "--output file to --compare on the second run. Raise the server's "
+        "THROTTLE_*_RATE settings first, or most requests get a 429."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="path to request, may be repeated",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--username")
+        parser.add_argument("--password")
+        parser.add_argument("--token", help="access token, instead of logging in")
+        parser.add_argument("--output", help="write the results to this JSON file")
+        parser.add_argument("--compare", help="JSON results of a previous run")
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        token = options["token"] or self.login(base_url, options)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        results = {}
+        for path in options["paths"] or DEFAULT_PATHS:
+            results[path] = self.run(
+                base_url + path,
+                headers,
+                options["requests"],
+                options["concurrency"],
+            )
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+        self.report(results, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+
+    def login(self, base_url, options):
+        if not options["username"] or not options["password"]:
+            raise CommandError("pass --token or --username and --password")
+        request = urllib.request.Request(
+            base_url + "/user/login/",
+            data=json.dumps(
+                {"username": options["username"], "password": options["password"]}
+            ).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)["response"]["token"]["access"]
+        except urllib.error.URLError as exc:
+            raise CommandError(f"login failed: {exc}")
+
+    def run(self, url, headers, requests, concurrency):
+        def fetch(_):
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(
+                    urllib.request.Request(url, headers=headers), timeout=30
+                ) as response:
+                    response.read()
+                return time.perf_counter() - start, False
+            except (urllib.error.URLError, TimeoutError):
+                return time.perf_counter() - start, True
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, failed in samples if not failed]
+        errors = sum(failed for _, failed in samples)
+        return summarize(latencies, elapsed, errors)
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f"{'path':<32} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for path, result in results.items():
+            line = (
+                f"{path:<32} {result['rps']:>9} {result['p50_ms']:>9} "
+                f"{result['p99_ms']:>9} {result['errors']:>7}"
+            )
+            previous = baseline.get(path)
+            if previous and previous["rps"]:
+                line += (
+                    f"   rps {result['rps'] / previous['rps'] - 1:+.0%}"
+                    f"  p99 {result['p99_ms'] - previous['p99_ms']:+.2f} ms"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,273 @@
+"""
+Per-route request metrics, kept in memory and exposed in Prometheus text format.
+
+Every process keeps its own registry, so with several workers each scrape
+sees the worker that answered it. Run Prometheus against each worker, or
+aggregate the scrapes by instance.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from rest_framework import serializers
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """cumulative Prometheus histogram, one series per label tuple"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            label_text = _labels(self.labels, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _labels(self.labels + ("le",), labels + (_number(bound),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            le = _labels(self.labels + ("le",), labels + ("+Inf",))
+            yield f"{self.name}_bucket{le} {count}"
+            yield f"{self.name}_sum{label_text} {_number(total)}"
+            yield f"{self.name}_count{label_text} {count}"
+
+
+class CounterMetric:
+    """Prometheus counter, one series per label tuple"""
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series = Counter()
+
+    def inc(self, labels, value=1):
+        self._series[labels] += value
+
+    def expose(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._series.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestStats:
+    """timings collected while one request is handled"""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_seconds = 0.0
+        self.render_started = None
+        self.statements = Counter()
+        self._depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        """execute wrapper hook, counts and times every query"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """counts and times a query against the current request, if there is one"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.execute(execute, sql, params, many, context)
+
+
+def install_execute_wrapper(sender, connection, **kwargs):
+    """
+    connection_created receiver adding execute_wrapper to the connection.
+
+    Connections belong to a thread, and the ORM calls of async views run on
+    other threads than the middleware, so every connection gets the wrapper
+    and finds the request's stats through the context var instead.
+    """
+    if execute_wrapper not in connection.execute_wrappers:
+        # first, so connection.execute_wrapper() blocks that are open still pop
+        # their own wrapper
+        connection.execute_wrappers.insert(0, execute_wrapper)
+
+
+@contextmanager
+def collect():
+    """makes a fresh RequestStats the current one for the enclosed block"""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_serialization():
+    """adds the enclosed block to the current request's serialization time"""
+    stats = _current.get()
+    if stats is None or stats._depth:
+        yield
+        return
+    stats._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - started
+        stats._depth -= 1
+
+
+class TimedSerializerMixin:
+    """records the time spent building serializer.data in the request metrics"""
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        route = ("route", "method")
+        self.requests = CounterMetric(
+            "budgetme_requests_total",
+            "Requests handled, by route, method and status code.",
+            ("route", "method", "status"),
+        )
+        self.latency = Histogram(
+            "budgetme_request_duration_seconds",
+            "Time from the request entering the middleware to the response leaving it.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            "budgetme_request_queries",
+            "SQL queries run per request.",
+            route,
+            QUERY_BUCKETS,
+        )
+        self.query_time = Histogram(
+            "budgetme_request_query_duration_seconds",
+            "Time spent in SQL queries per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.serialize_time = Histogram(
+            "budgetme_request_serialize_duration_seconds",
+            "Time spent building serializer data per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.render_time = Histogram(
+            "budgetme_request_render_duration_seconds",
+            "Time spent rendering the response body per request.",
+            route,
+            LATENCY_BUCKETS,
+        )
+        self.query_floods = CounterMetric(
+            "budgetme_request_query_threshold_exceeded_total",
+            "Requests that ran more queries than METRICS_QUERY_THRESHOLD.",
+            ("route",),
+        )
+        self.throttled = CounterMetric(
+            "budgetme_throttled_requests_total",
+            "Requests rejected by a throttle, by throttle scope.",
+            ("scope",),
+        )
+
+    def record_throttled(self, scope):
+        with self._lock:
+            self.throttled.inc((scope,))
+
+    def record(self, route, method, status, seconds, stats, flagged):
+        labels = (route, method)
+        with self._lock:
+            self.requests.inc((route, method, str(status)))
+            self.latency.observe(labels, seconds)
+            self.queries.observe(labels, stats.queries)
+            self.query_time.observe(labels, stats.query_seconds)
+            self.serialize_time.observe(labels, stats.serialize_seconds)
+            self.render_time.observe(labels, stats.render_seconds)
+            if flagged:
+                self.query_floods.inc((route,))
+
+    def expose(self, extra=()):
+        """the registry, plus any extra (name, type, help, value) samples"""
+        with self._lock:
+            lines = []
+            for metric in (
+                self.requests,
+                self.latency,
+                self.queries,
+                self.query_time,
+                self.serialize_time,
+                self.render_time,
+                self.query_floods,
+                self.throttled,
+            ):
+                lines.extend(metric.expose())
+        for name, type, help, value in extra:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
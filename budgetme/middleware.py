@@ -0,0 +1,153 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+from .routers import routing
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    records latency, SQL and serialization timings per URL name.
+
+    Goes first in MIDDLEWARE so the latency covers the whole stack. Rendering
+    is timed from process_template_response, which runs right before Django
+    renders a DRF Response, until the response comes back here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with metrics.collect() as stats:
+            response = self.get_response(request)
+        return self.record(request, response, stats, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        # queries are counted by metrics.execute_wrapper, on whichever thread
+        # sync_to_async runs them
+        with metrics.collect() as stats:
+            response = await self.get_response(request)
+        return self.record(request, response, stats, started)
+
+    def record(self, request, response, stats, started):
+        finished = time.perf_counter()
+
+        if stats.render_started is not None:
+            stats.render_seconds = finished - stats.render_started
+
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match is not None else "unmatched"
+        flagged = stats.queries > settings.METRICS_QUERY_THRESHOLD
+        if flagged:
+            statement, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                "%s %s ran %d queries, most repeated (%d times): %s",
+                request.method,
+                route,
+                stats.queries,
+                repeats,
+                statement,
+            )
+
+        metrics.registry.record(
+            route,
+            request.method,
+            response.status_code,
+            finished - started,
+            stats,
+            flagged,
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.queries} queries"',
+                    f"serialize;dur={stats.serialize_seconds * 1000:.2f}",
+                    f"render;dur={stats.render_seconds * 1000:.2f}",
+                    f"total;dur={(finished - started) * 1000:.2f}",
+                ]
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        stats = metrics.current_stats()
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+        return response
+
+
+class ReplicaMiddleware:
+    """lets ReplicaRouter route the queries of each request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        with routing(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        # the routing context var is copied into the threads sync_to_async
+        # runs ORM calls on
+        with routing(request):
+            return await self.get_response(request)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can also sit in an async chain.
+
+    WhiteNoise 6 is sync only, which makes Django run every async view behind
+    it on a thread. Here only requests for a static file leave the event loop,
+    to stat and open the file.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
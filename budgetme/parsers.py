@@ -0,0 +1,31 @@
+import codecs
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import json
+
+from .renderers import JSONRenderer, orjson
+
+
+def loads(content):
+    """parses a JSON document, with orjson if it's installed"""
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+class JSONParser(parsers.JSONParser):
+    """JSONParser that parses UTF-8 bodies with orjson"""
+
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,101 @@
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_state = contextvars.ContextVar("database_routing", default=None)
+
+
+def _sticky_key(user_id):
+    return f"budgetme:db_sticky:{user_id}"
+
+
+class RequestRouting:
+    """where the reads of one request go, set up by ReplicaMiddleware"""
+
+    def __init__(self, request):
+        self.request = request
+        self.safe = request.method in SAFE_METHODS
+        # one replica per request, so its reads see a single snapshot
+        self.replica = random.choice(settings.DATABASE_REPLICAS)
+        self.checked_user = None
+        self.sticky = False
+        self.marked = False
+
+    def user_id(self):
+        # only a user that's already resolved counts, looking at a lazy one
+        # would run its own query from inside the router
+        user = self.request.__dict__.get("user")
+        if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def read_alias(self):
+        if not self.safe:
+            return DEFAULT_DB_ALIAS
+        user_id = self.user_id()
+        if user_id is None:
+            # reads that resolve the user itself, e.g. authentication
+            return DEFAULT_DB_ALIAS
+        if user_id != self.checked_user:
+            self.checked_user = user_id
+            self.sticky = cache.get(_sticky_key(user_id)) is not None
+        return DEFAULT_DB_ALIAS if self.sticky else self.replica
+
+    def wrote(self):
+        user_id = self.user_id()
+        if user_id is None or self.marked:
+            return
+        cache.set(_sticky_key(user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+        self.marked = self.sticky = True
+        self.checked_user = user_id
+
+
+@contextmanager
+def routing(request):
+    """routes the queries run in the enclosed block on behalf of request"""
+    token = _state.set(RequestRouting(request))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    sends reads of GET, HEAD and OPTIONS requests to a read replica.
+
+    Everything else, and every read outside a request, uses the primary. Once
+    a user writes, their reads stay on the primary for REPLICA_STICKY_SECONDS
+    so they see their own changes despite replication lag. The sticky marks
+    live in Django's cache, which has to be shared between workers for them
+    to hold across processes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,160 @@
+"""
+The OpenAPI schema, generated once per code version and served from disk.
+
+Generating the schema walks every view and serializer, so instead of doing it
+per request `manage.py build_schema` renders it at build time into
+SCHEMA_ARTIFACT_ROOT/<version>/, as YAML and JSON plus a gzipped copy of each.
+A process that finds no artifact for its version generates it on the first
+request and writes it for the others.
+
+The version is RENDER_GIT_COMMIT when set, otherwise a fingerprint of the
+project's source files, so editing any view or serializer regenerates it.
+"""
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+# format -> (file suffix, content type)
+FORMATS = {
+    "yaml": ("yaml", "application/vnd.oai.openapi; charset=utf-8"),
+    "json": ("json", "application/vnd.oai.openapi+json"),
+}
+
+
+@dataclass(frozen=True)
+class Artifact:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body, gzipped=None):
+        if gzipped is None:
+            # mtime=0 keeps the gzipped bytes the same across builds
+            gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return cls(body, gzipped, f'"{digest}"')
+
+    @property
+    def gzip_etag(self):
+        return self.etag[:-1] + '-gzip"'
+
+
+def _source_fingerprint():
+    digest = hashlib.sha1()
+    for config in sorted(apps.get_app_configs(), key=lambda config: config.label):
+        if not config.path.startswith(str(settings.BASE_DIR)):
+            continue
+        for path in sorted(Path(config.path).rglob("*.py")):
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def code_version():
+    """the version the schema artifact is keyed by"""
+    version = settings.SCHEMA_CODE_VERSION or f"src-{_source_fingerprint()}"
+    return f"{version}-spectacular-{drf_spectacular.__version__}"
+
+
+def generate():
+    """renders the public schema, {format: bytes}"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF
+    )
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "yaml": OpenApiYamlRenderer().render(schema),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def _write(path, data):
+    # written next to the target and renamed, so readers never see half a file
+    handle, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}")
+    with os.fdopen(handle, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+class SchemaStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._artifacts = None
+
+    def directory(self, version):
+        return Path(settings.SCHEMA_ARTIFACT_ROOT) / version
+
+    def build(self, prune=False):
+        """generates and writes the artifact for this version, returns its path"""
+        version = code_version()
+        artifacts = {
+            name: Artifact.from_body(body) for name, body in generate().items()
+        }
+        directory = self._save(version, artifacts)
+        if prune:
+            for other in directory.parent.iterdir():
+                if other.is_dir() and other != directory:
+                    shutil.rmtree(other, ignore_errors=True)
+        with self._lock:
+            self._artifacts = artifacts
+        return directory
+
+    def _load(self, version):
+        directory = self.directory(version)
+        artifacts = {}
+        for format, (suffix, _) in FORMATS.items():
+            try:
+                body = (directory / f"schema.{suffix}").read_bytes()
+                gzipped = (directory / f"schema.{suffix}.gz").read_bytes()
+            except FileNotFoundError:
+                return None
+            artifacts[format] = Artifact.from_body(body, gzipped)
+        return artifacts
+
+    def get(self, format):
+        """the Artifact of the given format for the running code"""
+        if self._artifacts is None:
+            with self._lock:
+                if self._artifacts is None:
+                    version = code_version()
+                    artifacts = self._load(version)
+                    if artifacts is None:
+                        artifacts = {
+                            name: Artifact.from_body(body)
+                            for name, body in generate().items()
+                        }
+                        try:
+                            self._save(version, artifacts)
+                        except OSError:
+                            # a read-only filesystem still serves from memory
+                            pass
+                    self._artifacts = artifacts
+        return self._artifacts[format]
+
+    def _save(self, version, artifacts):
+        directory = self.directory(version)
+        directory.mkdir(parents=True, exist_ok=True)
+        for format, artifact in artifacts.items():
+            suffix, _ = FORMATS[format]
+            _write(directory / f"schema.{suffix}.gz", artifact.gzipped)
+            _write(directory / f"schema.{suffix}", artifact.body)
+        return directory
+
+    def clear(self):
+        with self._lock:
+            self._artifacts = None
+
+
+schema_store = SchemaStore()
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
 import dj_database_url
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 from datetime import timedelta
 
@@ -52,14 +52,17 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
     # Local apps
+    "budgetme",
     "account",
     "transaction",
 ]
 
 MIDDLEWARE = [
+    "budgetme.middleware.MetricsMiddleware",
+    "budgetme.middleware.ReplicaMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "budgetme.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -108,6 +111,41 @@ else:
         )
     }
 
+# read replicas, e.g. postgres://replica1/budgetme,postgres://replica2/budgetme
+# or sqlite:///replica.sqlite3 locally. Tests run them as mirrors of default.
+DATABASE_REPLICAS = []
+for number, url in enumerate(config("DATABASE_REPLICA_URLS", "", cast=Csv()), start=1):
+    DATABASES[f"replica_{number}"] = {
+        **dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["budgetme.routers.ReplicaRouter"]
+
+# seconds a user's reads stay on the primary after they wrote something. The
+# marks are kept in the default cache, which has to be shared between workers
+# when there are replicas, check --deploy fails otherwise
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", 10, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", ""),
+    }
+}
+
+# seconds a rendered history page stays cached, writes invalidate it earlier
+TRANSACTION_HISTORY_CACHE_TIMEOUT = config(
+    "TRANSACTION_HISTORY_CACHE_TIMEOUT", 300, cast=int
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -128,6 +166,15 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# at most this many password hashes run at once per process, requests beyond
+# workers + queue size are answered with 503 instead of queueing up
+PASSWORD_HASHING_WORKERS = config(
+    "PASSWORD_HASHING_WORKERS", os.cpu_count() or 2, cast=int
+)
+PASSWORD_HASHING_QUEUE_SIZE = config("PASSWORD_HASHING_QUEUE_SIZE", 32, cast=int)
+PASSWORD_HASHING_TIMEOUT = config("PASSWORD_HASHING_TIMEOUT", 10, cast=float)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -159,11 +206,68 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "account.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "budgetme.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "budgetme.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # views pick a scope with throttle_scope, see budgetme.throttling
+    "DEFAULT_THROTTLE_CLASSES": ("budgetme.throttling.ScopedThrottle",),
+    "DEFAULT_THROTTLE_RATES": {
+        # login, register and password change, each hashes a password
+        "login": config("THROTTLE_LOGIN_RATE", "10/min"),
+        "history": config("THROTTLE_HISTORY_RATE", "120/min"),
+        "writes": config("THROTTLE_WRITES_RATE", "60/min"),
+        "bulk": config("THROTTLE_BULK_RATE", "10/min"),
+    },
+    # anonymous requests are throttled per client IP, taken from
+    # X-Forwarded-For past this many proxies (Render puts one in front)
+    "NUM_PROXIES": config("NUM_PROXIES", 0 if DEBUG else 1, cast=int),
 }
 
+# cache alias the throttle counters are kept in. Every worker has to see the
+# same counters, so point it at a shared backend like Redis in production,
+# check --deploy fails otherwise
+THROTTLE_CACHE = config("THROTTLE_CACHE", "default")
+
+# default page size of /transaction/history/, clients may ask for up to 500
+TRANSACTION_PAGE_SIZE = config("TRANSACTION_PAGE_SIZE", 50, cast=int)
+
+# limits of /transaction/bulk/, rows are inserted batch_size at a time
+TRANSACTION_BULK_MAX_ITEMS = config("TRANSACTION_BULK_MAX_ITEMS", 5000, cast=int)
+TRANSACTION_BULK_BATCH_SIZE = config("TRANSACTION_BULK_BATCH_SIZE", 500, cast=int)
+
+# rows fetched per server-side cursor round-trip when streaming history
+TRANSACTION_STREAM_CHUNK_SIZE = config("TRANSACTION_STREAM_CHUNK_SIZE", 2000, cast=int)
+
+# /transaction/sync/ sends changes of this many seconds again on the next sync,
+# so rows committing after a later-timestamped one aren't skipped
+SYNC_OVERLAP_SECONDS = config("SYNC_OVERLAP_SECONDS", 300, cast=int)
+# prune_tombstones deletes deletion tombstones after this many days, sync
+# tokens older than that get a 410 and clients do a full sync
+SYNC_TOMBSTONE_RETENTION_DAYS = config("SYNC_TOMBSTONE_RETENTION_DAYS", 90, cast=int)
+
+# archive_transactions moves transactions older than this many days, rounded
+# down to the start of a month, out of the hot table
+TRANSACTION_ARCHIVE_AFTER_DAYS = config("TRANSACTION_ARCHIVE_AFTER_DAYS", 730, cast=int)
+
+# exports of /transaction/exports/ are written here by run_exports, the
+# worker and the web processes must share it
+EXPORT_ROOT = config("EXPORT_ROOT", os.path.join(BASE_DIR, "exports"))
+# rows fetched per server-side cursor round-trip while writing an export
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", 2000, cast=int)
+# pending and running exports a user may have at once
+EXPORT_MAX_ACTIVE_JOBS = config("EXPORT_MAX_ACTIVE_JOBS", 2, cast=int)
+# finished exports and their files are deleted after this many hours
+EXPORT_RETENTION_HOURS = config("EXPORT_RETENTION_HOURS", 24, cast=int)
+
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}
@@ -177,6 +281,35 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# the schema is rendered once per code version into this directory, by
+# build_schema or on the first request to /schema/ when it wasn't run
+SCHEMA_ARTIFACT_ROOT = config(
+    "SCHEMA_ARTIFACT_ROOT", os.path.join(BASE_DIR, "schema_artifacts")
+)
+# keys the schema artifact, Render sets RENDER_GIT_COMMIT on every deploy.
+# When empty a fingerprint of the project's source files is used instead
+SCHEMA_CODE_VERSION = config("RENDER_GIT_COMMIT", "")
+
+# users resolved from access tokens are kept in a per-process LRU for
+# JWT_USER_CACHE_TIMEOUT seconds, and in the shared cache too if enabled
+JWT_USER_CACHE_SIZE = config("JWT_USER_CACHE_SIZE", 1024, cast=int)
+JWT_USER_CACHE_TIMEOUT = config("JWT_USER_CACHE_TIMEOUT", 60, cast=int)
+JWT_USER_CACHE_SHARED = config("JWT_USER_CACHE_SHARED", False, cast=bool)
+
+# seconds between full reloads of the in-memory refresh token blacklist
+TOKEN_BLACKLIST_REFRESH_INTERVAL = config(
+    "TOKEN_BLACKLIST_REFRESH_INTERVAL", 300, cast=int
+)
+
+# requests running more SQL queries than this are logged as likely N+1s
+METRICS_QUERY_THRESHOLD = config("METRICS_QUERY_THRESHOLD", 20, cast=int)
+# adds a Server-Timing header with db, serialize and render times, off in
+# production where it would tell anyone how long our queries take
+METRICS_SERVER_TIMING = config("METRICS_SERVER_TIMING", DEBUG, cast=bool)
+# /metrics is readable by staff users, and with "Authorization: Bearer
+# <METRICS_TOKEN>" when a token is set, e.g. for Prometheus
+METRICS_TOKEN = config("METRICS_TOKEN", "")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
@@ -202,4 +335,3 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=20),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 }
-
@@ -0,0 +1,17 @@
+from django.core.handlers.asgi import ASGIHandler
+from django.test import SimpleTestCase, override_settings
+
+
+class ASGIMiddlewareTests(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_no_middleware_is_adapted_to_sync(self):
+        # Django logs each middleware it has to wrap in a thread hop, in DEBUG
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+    @override_settings(WHITENOISE_AUTOREFRESH=True, WHITENOISE_USE_FINDERS=True)
+    async def test_serves_static_files_in_async_chains(self):
+        response = await self.async_client.get("/static/admin/css/base.css")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/css"))
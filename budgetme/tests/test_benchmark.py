@@ -0,0 +1,69 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from budgetme.benchmarking import is_regression, percentile, summarize
+from budgetme.management.commands import benchmark
+
+RESULT = {"p95_ms": 10.0, "rps": 100.0}
+
+
+class BenchmarkingTests(SimpleTestCase):
+    def test_percentile_is_nearest_rank(self):
+        samples = [0.001 * n for n in range(1, 101)]
+
+        self.assertEqual(percentile(samples, 50), samples[49])
+        self.assertEqual(percentile(samples, 99), samples[98])
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize(self):
+        summary = summarize([0.002, 0.001, 0.003, 0.004], elapsed=0.5, errors=1)
+
+        self.assertEqual(summary["requests"], 4)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["rps"], 8.0)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["max_ms"], 4.0)
+
+    def test_slower_p95_beyond_tolerance_regresses(self):
+        self.assertTrue(is_regression({**RESULT, "p95_ms": 14.0}, RESULT, 0.25, 1.0))
+        self.assertFalse(is_regression({**RESULT, "p95_ms": 12.0}, RESULT, 0.25, 1.0))
+
+    def test_lower_rps_beyond_tolerance_regresses(self):
+        self.assertTrue(is_regression({**RESULT, "rps": 50.0}, RESULT, 0.25, 1.0))
+        self.assertFalse(is_regression({**RESULT, "rps": 90.0}, RESULT, 0.25, 1.0))
+
+    def test_changes_below_min_delta_never_regress(self):
+        fast = {"p95_ms": 0.1, "rps": 10000.0}
+
+        self.assertFalse(is_regression({"p95_ms": 0.5, "rps": 2000.0}, fast, 0.25, 1.0))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ScenarioTests(TestCase):
+    def test_every_route_runs_without_errors(self):
+        call_command(
+            "seed_data",
+            users=1,
+            transactions=100,
+            password=benchmark.Command.password,
+            stdout=StringIO(),
+        )
+        command = benchmark.Command(stdout=StringIO(), stderr=StringIO())
+        options = {"requests": 1, "warmup": 0, "scenarios": None}
+
+        with tempfile.TemporaryDirectory() as export_root, override_settings(
+            EXPORT_ROOT=export_root, REST_FRAMEWORK=benchmark.without_throttles()
+        ):
+            results = command.run_scenarios(options)
+
+        self.assertEqual(
+            {label: result["errors"] for label, result in results.items()},
+            dict.fromkeys(results, 0),
+        )
+        self.assertEqual(
+            {result["route"] for result in results.values()},
+            benchmark.route_names(),
+        )
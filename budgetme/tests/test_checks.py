@@ -0,0 +1,33 @@
+from django.core.checks import run_checks
+from django.test import SimpleTestCase, override_settings
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# shared as far as the checks can tell, nothing is ever stored in it
+SHARED = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+
+
+class DeployCheckTests(SimpleTestCase):
+    def errors(self):
+        return [error.id for error in run_checks(include_deployment_checks=True)]
+
+    @override_settings(DATABASE_REPLICAS=["replica_1"], CACHES=LOCMEM)
+    def test_replicas_need_a_shared_cache(self):
+        self.assertIn("budgetme.E001", self.errors())
+
+    @override_settings(DATABASE_REPLICAS=["replica_1"], CACHES=SHARED)
+    def test_replicas_with_a_shared_cache(self):
+        self.assertNotIn("budgetme.E001", self.errors())
+
+    @override_settings(DATABASE_REPLICAS=[], CACHES=LOCMEM)
+    def test_no_replicas_no_stickiness(self):
+        self.assertNotIn("budgetme.E001", self.errors())
+
+    @override_settings(CACHES=LOCMEM, THROTTLE_CACHE="default")
+    def test_throttles_need_a_shared_cache(self):
+        self.assertIn("budgetme.E002", self.errors())
+
+    @override_settings(
+        CACHES={**LOCMEM, "throttle": SHARED["default"]}, THROTTLE_CACHE="throttle"
+    )
+    def test_throttles_with_a_shared_cache(self):
+        self.assertNotIn("budgetme.E002", self.errors())
@@ -0,0 +1,94 @@
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import user_cache
+from budgetme.middleware import MetricsMiddleware
+
+
+def bearer(user):
+    return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        self.path = reverse("metrics")
+
+    @override_settings(METRICS_TOKEN="")
+    def test_anonymous_requests_are_refused_without_a_token(self):
+        self.assertEqual(self.client.get(self.path).status_code, 401)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token(self):
+        response = self.client.get(
+            self.path, headers={"Authorization": "Bearer s3cret"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"budgetme_password_hashes_total", response.content)
+
+        response = self.client.get(self.path, headers={"Authorization": "Bearer nope"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_staff_users_only(self):
+        user = User.objects.create_user("spender", password="Xx12345678!")
+        staff = User.objects.create_user("ops", password="Xx12345678!", is_staff=True)
+
+        self.assertEqual(
+            self.client.get(self.path, headers=bearer(user)).status_code, 401
+        )
+        self.assertEqual(
+            self.client.get(self.path, headers=bearer(staff)).status_code, 200
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(self.path).status_code, 200)
+
+
+@override_settings(DATABASE_REPLICAS=[], METRICS_SERVER_TIMING=True)
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        user = User.objects.create_user("spender", password="Xx12345678!")
+        self.headers = bearer(user)
+
+    def queries(self, response):
+        return int(re.search(r'desc="(\d+) queries"', response["Server-Timing"])[1])
+
+    def test_times_sync_views(self):
+        response = self.client.get(reverse("transaction_history"), headers=self.headers)
+
+        self.assertGreater(self.queries(response), 0)
+
+    async def test_times_async_views(self):
+        response = await self.async_client.get(
+            reverse("transaction_async_history"), headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.queries(response), 0)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_can_be_turned_off(self):
+        response = self.client.get(reverse("transaction_history"), headers=self.headers)
+
+        self.assertNotIn("Server-Timing", response)
+
+
+class AsyncCapableTests(SimpleTestCase):
+    def test_follows_the_mode_of_the_chain(self):
+        async def async_view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(async_view)))
+        self.assertFalse(iscoroutinefunction(MetricsMiddleware(HttpResponse)))
@@ -0,0 +1,75 @@
+import datetime
+import json
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+
+from budgetme import renderers
+
+BACKENDS = {"stdlib": renderers.stdlib_dumps}
+if renderers.orjson is not None:
+    BACKENDS["orjson"] = renderers.orjson_dumps
+
+PAYLOAD = {
+    "message": "Transactions retrieved successfully",
+    "status": 200,
+    "response": {
+        "history": [
+            {"id": 2, "description": "Café crème", "amount": "-3.50"},
+            {"id": 1, "description": 'a "quote" 日用品', "amount": "1200.00"},
+        ],
+        "next": None,
+        "hit_ratio": 0.25,
+        "checked_at": datetime.datetime(
+            2023, 12, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        ),
+        "day": datetime.date(2023, 12, 1),
+        "request_id": uuid.UUID(int=1),
+        1: "non-string key",
+    },
+}
+
+
+class RendererTests(SimpleTestCase):
+    def test_backends_match_drf(self):
+        expected = DRFJSONRenderer().render(PAYLOAD)
+        for name, dumps in BACKENDS.items():
+            with self.subTest(name):
+                self.assertEqual(dumps(PAYLOAD), expected)
+
+    def test_decimals_are_numbers_like_drf_writes_them(self):
+        totals = {"income": Decimal("1234.50"), "balance": Decimal("-50.00")}
+        for name, dumps in BACKENDS.items():
+            with self.subTest(name):
+                self.assertEqual(dumps(totals), DRFJSONRenderer().render(totals))
+                self.assertEqual(dumps(totals), b'{"income":1234.5,"balance":-50.0}')
+
+    def test_floats_parse_to_the_same_value(self):
+        floats = [1e16, 1e-7, 0.1, -2.5, 123456.789]
+        for name, dumps in BACKENDS.items():
+            with self.subTest(name):
+                self.assertEqual(json.loads(dumps(floats)), floats)
+
+    def test_integers_beyond_64_bits_fall_back_to_the_json_module(self):
+        self.assertEqual(
+            renderers.dumps({"n": 2**70}), b'{"n":1180591620717411303424}'
+        )
+
+    def test_indented_output_goes_through_drf(self):
+        renderer = renderers.JSONRenderer()
+        content = renderer.render({"a": 1}, "application/json; indent=2", {"indent": 2})
+
+        self.assertEqual(content, b'{\n  "a": 1\n}')
+
+    def test_ndjson_renders_a_line_per_item(self):
+        content = renderers.NDJSONRenderer().render([{"id": 1}, {"id": 2}])
+
+        self.assertEqual(content, b'{"id":1}\n{"id":2}\n')
+
+    @unittest.skipIf(renderers.orjson is None, "orjson isn't installed")
+    def test_orjson_writes_exponents_its_own_way(self):
+        self.assertEqual(renderers.orjson_dumps([1e16, 1e-7]), b"[1e16,1e-7]")
+        self.assertEqual(renderers.stdlib_dumps([1e16, 1e-7]), b"[1e+16,1e-07]")
@@ -0,0 +1,134 @@
+import time
+import unittest
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import user_cache
+from budgetme.middleware import ReplicaMiddleware
+from budgetme.routers import ReplicaRouter, routing
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+    """where ReplicaRouter sends a request's queries, no database involved"""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.router = ReplicaRouter()
+        self.user = User(pk=1, username="spender")
+
+    def request(self, method, user=None):
+        request = getattr(RequestFactory(), method)("/")
+        if user is not None:
+            request.user = user
+        return request
+
+    def test_reads_of_safe_requests_go_to_a_replica(self):
+        with routing(self.request("get", self.user)):
+            self.assertEqual(self.router.db_for_read(User), "replica_1")
+
+    def test_reads_resolving_the_user_use_the_primary(self):
+        with routing(self.request("get")):
+            self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+
+    def test_unsafe_requests_and_reads_outside_requests_use_the_primary(self):
+        with routing(self.request("post", self.user)):
+            self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+
+    def test_writers_read_from_the_primary_for_a_while(self):
+        with routing(self.request("post", self.user)):
+            self.router.db_for_write(User)
+
+        with routing(self.request("get", self.user)):
+            self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+        with routing(self.request("get", User(pk=2, username="other"))):
+            self.assertEqual(self.router.db_for_read(User), "replica_1")
+
+    def test_async_middleware_routes_the_request(self):
+        async def view(request):
+            return HttpResponse(self.router.db_for_read(User))
+
+        middleware = ReplicaMiddleware(view)
+        response = async_to_sync(middleware)(self.request("get", self.user))
+
+        self.assertEqual(response.content, b"replica_1")
+
+
+@unittest.skipUnless(
+    settings.DATABASE_REPLICAS,
+    "no replicas, run with e.g. DATABASE_REPLICA_URLS=sqlite:///replica1.sqlite3",
+)
+@override_settings(REPLICA_STICKY_SECONDS=1)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    requests end to end, the replicas mirror default in tests.
+
+    A mirror is its own connection, so the rows have to be committed for it
+    to read them, and SQLite locks tables a TestCase transaction has written.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        user = User.objects.create_user("spender", password="Xx12345678!")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+        )
+
+    def queries(self, method, name, data=None):
+        """runs the request and counts the queries it ran per database"""
+        counts = Counter()
+
+        def count(alias):
+            def wrapper(execute, sql, params, many, context):
+                counts[alias] += 1
+                return execute(sql, params, many, context)
+
+            return wrapper
+
+        with ExitStack() as stack:
+            for alias in self.databases:
+                stack.enter_context(connections[alias].execute_wrapper(count(alias)))
+            response = getattr(self.client, method)(reverse(name), data, format="json")
+        self.assertLess(response.status_code, 400, response.content)
+        replica = sum(counts[alias] for alias in settings.DATABASE_REPLICAS)
+        return counts[DEFAULT_DB_ALIAS], replica
+
+    def test_reads_go_to_a_replica_until_the_user_writes(self):
+        _, replica = self.queries("get", "transaction_history")
+        self.assertTrue(replica)
+
+        primary, replica = self.queries(
+            "post", "transaction_create", {"description": "x", "amount": "1"}
+        )
+        self.assertTrue(primary)
+        self.assertFalse(replica)
+
+        primary, replica = self.queries("get", "transaction_history")
+        self.assertTrue(primary)
+        self.assertFalse(replica)
+
+        time.sleep(settings.REPLICA_STICKY_SECONDS + 0.1)
+        _, replica = self.queries("get", "transaction_history")
+        self.assertTrue(replica)
@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils.cache import has_vary_header
+
+from budgetme.schema import schema_store
+
+
+class SchemaTests(SimpleTestCase):
+    def setUp(self):
+        root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(SCHEMA_ARTIFACT_ROOT=root))
+        schema_store.clear()
+        self.addCleanup(schema_store.clear)
+
+    def get(self, **headers):
+        return self.client.get(reverse("schema"), {"format": "json"}, **headers)
+
+    def test_etag_is_the_documents_digest(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        digest = hashlib.sha256(response.content).hexdigest()[:32]
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertTrue(has_vary_header(response, "Accept"))
+        self.assertTrue(has_vary_header(response, "Accept-Encoding"))
+        self.assertEqual(response["Cache-Control"], "public, no-cache")
+
+    def test_current_etag_is_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_stale_etag_gets_the_document(self):
+        response = self.get(HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content)
+
+    def test_gzipped_copy_has_its_own_etag(self):
+        plain = self.get()
+
+        response = self.get(HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], plain["ETag"][:-1] + '-gzip"')
+        # either encoding's ETag still names the same document
+        revalidated = self.get(
+            HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain["ETag"]
+        )
+        self.assertEqual(revalidated.status_code, 304)
@@ -0,0 +1,115 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import user_cache
+from budgetme import throttling
+
+
+def with_rates(**rates):
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+    )
+
+
+class CheckTests(TestCase):
+    """the sliding window of throttling.check, with the clock passed in"""
+
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE].clear()
+
+    def test_allows_the_rate_then_waits_for_the_next_window(self):
+        for _ in range(3):
+            self.assertIsNone(throttling.check("test", "ip:1", 3, 60, now=600))
+
+        self.assertEqual(throttling.check("test", "ip:1", 3, 60, now=615), 45)
+
+    def test_rejected_requests_dont_use_up_the_rate(self):
+        for _ in range(3):
+            throttling.check("test", "ip:1", 3, 60, now=600)
+        for _ in range(5):
+            throttling.check("test", "ip:1", 3, 60, now=601)
+
+        # half of the previous window's 3 still counts, so one more fits
+        self.assertIsNone(throttling.check("test", "ip:1", 3, 60, now=690))
+        # until a third of the previous window is left in the sliding one
+        self.assertAlmostEqual(throttling.check("test", "ip:1", 3, 60, now=690), 10)
+
+    def test_scopes_and_clients_are_counted_apart(self):
+        for _ in range(3):
+            throttling.check("test", "ip:1", 3, 60, now=600)
+
+        self.assertIsNone(throttling.check("test", "ip:2", 3, 60, now=600))
+        self.assertIsNone(throttling.check("other", "ip:1", 3, 60, now=600))
+
+    def test_async_check_shares_the_counters(self):
+        for _ in range(3):
+            throttling.check("test", "ip:1", 3, 60, now=600)
+
+        wait = async_to_sync(throttling.acheck)("test", "ip:1", 3, 60, now=600)
+
+        self.assertEqual(wait, 60)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ScopedThrottleTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user("spender", password="Xx12345678!")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    @with_rates(history="2/min")
+    def test_over_the_rate_is_rejected_with_retry_after(self):
+        path = reverse("transaction_history")
+        for _ in range(2):
+            self.assertEqual(self.client.get(path).status_code, 200)
+
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    @with_rates(history="2/min")
+    def test_async_views_share_the_scope(self):
+        for _ in range(2):
+            self.client.get(reverse("transaction_history"))
+
+        response = self.client.get(reverse("transaction_async_history"))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    @with_rates(writes="1/min")
+    def test_method_scopes_leave_reads_alone(self):
+        transaction = self.client.post(
+            reverse("transaction_create"),
+            {"description": "rent", "amount": "-500.00"},
+            format="json",
+        ).json()["response"]
+        path = reverse("transaction_delete", args=[transaction["id"]])
+
+        self.assertEqual(self.client.get(path).status_code, 200)
+        self.assertEqual(self.client.delete(path).status_code, 429)
+
+    @with_rates(login="2/min")
+    def test_anonymous_requests_are_throttled_per_ip(self):
+        client = APIClient()
+        credentials = {"username": "spender", "password": "wrong"}
+        for _ in range(2):
+            client.post(reverse("login"), credentials, REMOTE_ADDR="10.0.0.1")
+
+        blocked = client.post(reverse("login"), credentials, REMOTE_ADDR="10.0.0.1")
+        other = client.post(reverse("login"), credentials, REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(other.status_code, 400)
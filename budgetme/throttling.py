@@ -0,0 +1,157 @@
+"""
+Rate limits per user, or per client IP for anonymous requests, kept in a cache
+shared by every worker.
+
+Views opt in with a throttle_scope, either one scope or a dict of scopes per
+HTTP method. Rates come from DEFAULT_THROTTLE_RATES, a scope without a rate
+isn't limited.
+
+Each scope counts requests in fixed windows as long as its rate's period,
+with one atomic cache.incr per request. A request is allowed while the count
+of the current window plus the previous window's count, weighted by how much
+of it the sliding window still overlaps, stays within the rate. That's the
+same sustained rate as a token bucket without the read-modify-write a bucket
+needs, which the cache API can't do atomically. The previous window is only
+read once the current count could exceed the rate.
+
+When the cache is unavailable requests are let through, a cache outage
+shouldn't take the API down with it.
+"""
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _key(scope, ident, window):
+    return f"throttle:{scope}:{ident}:{window}"
+
+
+def _estimate(count, previous, elapsed):
+    return previous * (1 - elapsed) + count
+
+
+def _wait(count, previous, limit, elapsed, duration):
+    """seconds until a request making the count count would be allowed"""
+    if count > limit or not previous:
+        # only the next window can make room
+        return (1 - elapsed) * duration
+    # previous * (1 - elapsed') + count <= limit, solved for elapsed'
+    return max(1 - (limit - count) / previous - elapsed, 0) * duration
+
+
+def _window(duration, now):
+    window, offset = divmod(now, duration)
+    return int(window), offset / duration
+
+
+def check(scope, ident, limit, duration, now=None):
+    """
+    counts a request of ident against scope, returns None when it's allowed,
+    otherwise the seconds to wait.
+    """
+    cache = caches[settings.THROTTLE_CACHE]
+    window, elapsed = _window(duration, time.time() if now is None else now)
+    key = _key(scope, ident, window)
+    try:
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # first request of the window, unless another worker just added it
+            if cache.add(key, 1, duration * 2):
+                count = 1
+            else:
+                count = cache.incr(key)
+        previous = 0
+        # the previous window held at most limit allowed requests
+        if count > limit * elapsed:
+            previous = cache.get(_key(scope, ident, window - 1), 0)
+        if _estimate(count, previous, elapsed) <= limit:
+            return None
+        # rejected requests don't use up the rate
+        cache.decr(key)
+    except Exception:
+        logger.exception("throttle cache unavailable, %s not throttled", scope)
+        return None
+    metrics.registry.record_throttled(scope)
+    return _wait(count, previous, limit, elapsed, duration)
+
+
+async def acheck(scope, ident, limit, duration, now=None):
+    """check for async views"""
+    cache = caches[settings.THROTTLE_CACHE]
+    window, elapsed = _window(duration, time.time() if now is None else now)
+    key = _key(scope, ident, window)
+    try:
+        try:
+            count = await cache.aincr(key)
+        except ValueError:
+            if await cache.aadd(key, 1, duration * 2):
+                count = 1
+            else:
+                count = await cache.aincr(key)
+        previous = 0
+        if count > limit * elapsed:
+            previous = await cache.aget(_key(scope, ident, window - 1), 0)
+        if _estimate(count, previous, elapsed) <= limit:
+            return None
+        await cache.adecr(key)
+    except Exception:
+        logger.exception("throttle cache unavailable, %s not throttled", scope)
+        return None
+    metrics.registry.record_throttled(scope)
+    return _wait(count, previous, limit, elapsed, duration)
+
+
+class ScopedThrottle(ScopedRateThrottle):
+    """DRF throttle of the view's throttle_scope, see the module docstring"""
+
+    def get_scope(self, request, view):
+        scope = getattr(view, self.scope_attr, None)
+        if isinstance(scope, dict):
+            return scope.get(request.method)
+        return scope
+
+    def get_rate(self):
+        # read per request so the rates follow override_settings
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        limit, duration = self.parse_rate(self.rate)
+        self.wait_seconds = check(
+            self.scope, self.get_ident_for(request), limit, duration
+        )
+        return self.wait_seconds is None
+
+    def wait(self):
+        return max(math.ceil(self.wait_seconds), 1)
+
+
+async def athrottle(scope, user):
+    """whole seconds an authenticated user of an async view has to wait before
+    another request of scope, None when the request is allowed"""
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if rate is None:
+        return None
+    limit, duration = ScopedThrottle().parse_rate(rate)
+    wait = await acheck(scope, f"user:{user.pk}", limit, duration)
+    return None if wait is None else max(math.ceil(wait), 1)
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET, require_safe
+from rest_framework.exceptions import APIException
+
+from account.authentication import CachedJWTAuthentication
+from account.hashing import hashing_limiter
+from transaction import cache as history_cache
+
+from .metrics import registry
+from .schema import FORMATS, schema_store
+
+
+def _process_samples():
+    history = history_cache.stats()
+    hashing = hashing_limiter.stats()
+    return [
+        (
+            "budgetme_history_cache_hits_total",
+            "counter",
+            "History cache lookups answered from the cache.",
+            history["hits"],
+        ),
+        (
+            "budgetme_history_cache_misses_total",
+            "counter",
+            "History cache lookups that had to be computed.",
+            history["misses"],
+        ),
+        (
+            "budgetme_password_hashes_total",
+            "counter",
+            "Password hash operations computed.",
+            hashing["count"],
+        ),
+        (
+            "budgetme_password_hashes_rejected_total",
+            "counter",
+            "Password hash operations rejected because too many were running.",
+            hashing["rejected"],
+        ),
+        (
+            "budgetme_password_hash_seconds_total",
+            "counter",
+            "Time spent hashing passwords.",
+            hashing["hash_seconds"],
+        ),
+        (
+            "budgetme_password_hash_wait_seconds_total",
+            "counter",
+            "Time password hash operations waited for their turn.",
+            hashing["wait_seconds"],
+        ),
+    ]
+
+
+def _can_read_metrics(request):
+    """whether request carries the metrics token or comes from a staff user"""
+    if settings.METRICS_TOKEN and constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return True
+    if request.user.is_staff:
+        return True
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+@require_GET
+def metrics(request):
+    """request metrics of this process in Prometheus text format"""
+    if not _can_read_metrics(request):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        registry.expose(_process_samples()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _schema_format(request):
+    requested = request.GET.get("format")
+    if requested in FORMATS:
+        return requested
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+@require_safe
+def schema(request):
+    """
+    the OpenAPI schema, YAML or JSON by ?format= or the Accept header.
+
+    Served from the artifact build_schema writes, gzipped when the client
+    accepts it and answered with a 304 when its ETag is still current.
+    """
+    format = _schema_format(request)
+    artifact = schema_store.get(format)
+    compressed = "gzip" in request.headers.get("Accept-Encoding", "")
+    etag = artifact.gzip_etag if compressed else artifact.etag
+
+    # both encodings carry the same document, so either ETag is current
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if "*" in if_none_match or {artifact.etag, artifact.gzip_etag} & {
+        tag.removeprefix("W/") for tag in if_none_match
+    }:
+        response = HttpResponseNotModified()
+    else:
+        suffix, content_type = FORMATS[format]
+        response = HttpResponse(
+            artifact.gzipped if compressed else artifact.body,
+            content_type=content_type,
+        )
+        if compressed:
+            response["Content-Encoding"] = "gzip"
+        title = settings.SPECTACULAR_SETTINGS.get("TITLE") or "schema"
+        response["Content-Disposition"] = f'inline; filename="{title}.{suffix}"'
+    response["ETag"] = etag
+    # cached, but revalidated each time so a deploy shows up straight away
+    response["Cache-Control"] = "public, no-cache"
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
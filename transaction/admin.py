@@ -1,6 +1,24 @@
 from django.contrib import admin
 
-from .models import Transaction
+from .models import (
+    ArchivedTransaction,
+    Budget,
+    BudgetSpend,
+    Category,
+    DeletedTransaction,
+    ExportJob,
+    MonthlyRollup,
+    Transaction,
+    UserBalance,
+)
 
 
 admin.site.register(Transaction)
+admin.site.register(UserBalance)
+admin.site.register(DeletedTransaction)
+admin.site.register(ExportJob)
+admin.site.register(ArchivedTransaction)
+admin.site.register(MonthlyRollup)
+admin.site.register(Category)
+admin.site.register(Budget)
+admin.site.register(BudgetSpend)
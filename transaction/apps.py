@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TransactionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "transaction"
+
+    def ready(self):
+        from .search import install_after_migrate
+
+        post_migrate.connect(install_after_migrate, sender=self)
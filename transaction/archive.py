@@ -0,0 +1,253 @@
+"""
+Cold storage of old transactions.
+
+archive_transactions moves each user's transactions added before a month
+boundary into ArchivedTransaction and adds them to that user's MonthlyRollup
+rows. UserBalance.archived_before records the boundary, and reads only look at
+the archive when the range they ask for starts before it, so the usual
+recent-history requests never touch cold rows.
+
+Totals and month summaries in UTC are answered from the rollups as long as
+the filters and date range line up with whole months. Amount and description
+filters, other periods and other time zones need the archived rows themselves.
+"""
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from . import ledger
+from .filters import filter_transactions, start_of_day
+from .models import ArchivedTransaction, MonthlyRollup, Transaction, UserBalance
+from .summary import AMOUNTS, get_summary
+from .totals import CENT, EXPENSE, INCOME, ZERO
+
+# filters monthly rollups can't answer
+ROW_FILTERS = {"min_amount", "max_amount", "search"}
+
+ROLLUP_TOTALS = {
+    "income": Coalesce(Sum("income"), ZERO),
+    "expense": Coalesce(Sum("expense"), ZERO),
+}
+
+
+def month_of(moment):
+    """first day of the UTC month moment falls in"""
+    return moment.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+def month_start(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def archive_cutoff(days, now):
+    """start of the UTC month holding now - days, rows before it get archived"""
+    return month_start(month_of(now - timedelta(days=days)))
+
+
+def get_boundary(user):
+    """the user's archived_before, None when nothing of theirs is archived"""
+    return (
+        UserBalance.objects.filter(user=user)
+        .values_list("archived_before", flat=True)
+        .first()
+    )
+
+
+def reaches_archive(boundary, filters):
+    """whether rows matching filters may be in the archive"""
+    if boundary is None:
+        return False
+    return "start" not in filters or start_of_day(filters["start"]) < boundary
+
+
+def archived_queryset(user, filters):
+    return filter_transactions(ArchivedTransaction.objects.filter(user=user), filters)
+
+
+def _month_aligned(moment):
+    moment = moment.astimezone(dt_timezone.utc)
+    return moment.day == 1 and moment.time() == time.min
+
+
+def _rollup_range(filters, boundary):
+    """(first month, month after the last) of the archived part of filters, or
+    None when the rollups can't stand in for the archived rows"""
+    if ROW_FILTERS & set(filters):
+        return None
+    first = None
+    if "start" in filters:
+        lower = start_of_day(filters["start"])
+        if not _month_aligned(lower):
+            return None
+        first = month_of(lower)
+    upper = boundary
+    if "end" in filters:
+        upper = min(upper, start_of_day(filters["end"] + timedelta(days=1)))
+        if not _month_aligned(upper):
+            return None
+    return first, month_of(upper)
+
+
+def _rollups(user, filters, boundary):
+    months = _rollup_range(filters, boundary)
+    if months is None:
+        return None
+    first, last = months
+    rollups = MonthlyRollup.objects.filter(user=user, month__lt=last)
+    if first is not None:
+        rollups = rollups.filter(month__gte=first)
+    return rollups
+
+
+def _typed(totals, filters):
+    # a rollup keeps income and expense apart, which is all the type filter needs
+    if filters.get("type") == "income":
+        totals["expense"] = Decimal("0.00")
+    elif filters.get("type") == "expense":
+        totals["income"] = Decimal("0.00")
+    return totals
+
+
+def archived_totals(user, filters, boundary):
+    """income and expense of the user's archived rows matching filters"""
+    rollups = _rollups(user, filters, boundary)
+    if rollups is not None:
+        totals = rollups.aggregate(**ROLLUP_TOTALS)
+        totals = _typed(totals, filters)
+    else:
+        totals = (
+            archived_queryset(user, filters)
+            .order_by()
+            .aggregate(income=INCOME, expense=EXPENSE)
+        )
+    return {key: value.quantize(CENT) for key, value in totals.items()}
+
+
+def add_archived_totals(totals, user, filters, boundary):
+    """adds the archived rows matching filters to totals of the hot ones"""
+    if not reaches_archive(boundary, filters):
+        return totals
+    archived = archived_totals(user, filters, boundary)
+    income = totals["income"] + archived["income"]
+    expense = totals["expense"] + archived["expense"]
+    return {"income": income, "expense": expense, "balance": income + expense}
+
+
+def _is_utc(tzinfo):
+    return getattr(tzinfo, "key", None) in ("UTC", "Etc/UTC")
+
+
+def archived_summary(user, filters, period, tzinfo, boundary):
+    """get_summary buckets of the user's archived rows matching filters"""
+    rollups = None
+    if period == "month" and _is_utc(tzinfo):
+        rollups = _rollups(user, filters, boundary)
+    if rollups is None:
+        return get_summary(archived_queryset(user, filters), period, tzinfo)
+    buckets = []
+    for month, income, expense in rollups.order_by("month").values_list(
+        "month", "income", "expense"
+    ):
+        bucket = _typed({"income": income, "expense": expense}, filters)
+        bucket["net"] = bucket["income"] + bucket["expense"]
+        buckets.append({"bucket": month_start(month), **bucket})
+    return buckets
+
+
+def merge_summaries(hot, archived, cumulative=False, rolling=None):
+    """
+    adds archived buckets into the hot ones, then the running balance.
+
+    A bucket can hold both hot and archived rows when the boundary falls
+    inside it, so buckets with the same start are summed.
+    """
+    merged = {}
+    for bucket in (*archived, *hot):
+        current = merged.get(bucket["bucket"])
+        if current is None:
+            merged[bucket["bucket"]] = dict(bucket)
+            continue
+        for key in ("income", "expense", "net"):
+            current[key] += bucket[key]
+    buckets = [merged[key] for key in sorted(merged)]
+    if cumulative or rolling:
+        nets = [bucket["net"] for bucket in buckets]
+        for index, bucket in enumerate(buckets):
+            first = max(index - rolling + 1, 0) if rolling else 0
+            bucket["balance"] = sum(nets[first : index + 1], Decimal("0.00"))
+    for bucket in buckets:
+        for key in AMOUNTS:
+            if key in bucket:
+                bucket[key] = bucket[key].quantize(CENT)
+    return buckets
+
+
+def _month_totals(rows):
+    months = {}
+    for date_added, amount in rows:
+        income, expense, count = months.get(month_of(date_added), (0, 0, 0))
+        if amount > 0:
+            income += amount
+        else:
+            expense += amount
+        months[month_of(date_added)] = (income, expense, count + 1)
+    return months
+
+
+def archive_batch(user_id, cutoff, batch_size):
+    """
+    moves up to batch_size of the user's rows added before cutoff into the
+    archive in one atomic block, returns how many it moved.
+
+    The boundary is raised in the same block, so readers look at the archive
+    as soon as the first rows are there.
+    """
+    with db_transaction.atomic():
+        if not UserBalance.objects.filter(user_id=user_id).exists():
+            # the boundary lives on the ledger row
+            ledger.rebuild(user_id)
+        rows = list(
+            Transaction.objects.select_for_update()
+            .filter(user_id=user_id, date_added__lt=cutoff)
+            .order_by("date_added", "id")[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        ArchivedTransaction.objects.bulk_create(
+            ArchivedTransaction(
+                id=row.id,
+                user_id=user_id,
+                description=row.description,
+                amount=row.amount,
+                date_added=row.date_added,
+                date_modified=row.date_modified,
+                type=row.type,
+                category_id=row.category_id,
+            )
+            for row in rows
+        )
+        months = _month_totals((row.date_added, row.amount) for row in rows)
+        for month, (income, expense, count) in months.items():
+            updated = MonthlyRollup.objects.filter(user_id=user_id, month=month).update(
+                income=F("income") + income,
+                expense=F("expense") + expense,
+                count=F("count") + count,
+            )
+            if not updated:
+                MonthlyRollup.objects.create(
+                    user_id=user_id,
+                    month=month,
+                    income=income,
+                    expense=expense,
+                    count=count,
+                )
+        Transaction.objects.filter(id__in=[row.id for row in rows]).delete()
+        UserBalance.objects.filter(user_id=user_id).filter(
+            Q(archived_before__isnull=True) | Q(archived_before__lt=cutoff)
+        ).update(archived_before=cutoff)
+    return len(rows)
@@ -0,0 +1,267 @@
+"""
+Native async versions of the hot transaction endpoints, for ASGI deployments.
+
+DRF views are sync only, so under ASGI every request to them is handed to a
+thread. These plain Django async views authenticate and read with the async
+ORM instead. Writes still go through one sync transaction.atomic block,
+because Django can't run atomic blocks in async code.
+"""
+import heapq
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import transaction as db_transaction
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+from account.authentication import CachedJWTAuthentication
+from budgetme import throttling
+from budgetme.parsers import loads
+from budgetme.renderers import dumps
+
+from . import archive, budgets, ledger
+from . import cache as history_cache
+from .filters import filter_transactions
+from .models import ArchivedTransaction, Transaction, UserBalance
+from .pagination import KeysetPagination, encode_position
+from .serializers import (
+    TRANSACTION_COLUMNS,
+    HistoryFilterSerializer,
+    TransactionSerializer,
+    serialize_transactions,
+)
+from .totals import CENT, EXPENSE, INCOME
+
+
+def _response(data, status_code, headers=None):
+    return HttpResponse(
+        dumps(data),
+        status=status_code,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+def _error(exc, headers=None):
+    detail = exc.detail
+    data = detail if isinstance(detail, (list, dict)) else {"detail": detail}
+    return _response(data, exc.status_code, headers)
+
+
+def authenticated(view):
+    """authenticates an async view with the JWT in the Authorization header"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authenticator = CachedJWTAuthentication()
+        challenge = {"WWW-Authenticate": authenticator.authenticate_header(request)}
+        try:
+            result = await authenticator.aauthenticate(request)
+        except APIException as exc:
+            return _error(exc, challenge)
+        if result is None:
+            return _response(
+                {"detail": "Authentication credentials were not provided."},
+                status.HTTP_401_UNAUTHORIZED,
+                challenge,
+            )
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def throttled(scope):
+    """rejects requests over the user's rate of scope, goes below authenticated"""
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            wait = await throttling.athrottle(scope, request.user)
+            if wait is not None:
+                return _error(Throttled(wait), {"Retry-After": str(wait)})
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _save_transaction(serializer, user):
+    """
+    validates and saves on a thread, since the category is looked up with the
+    sync ORM. Returns the budget statuses, or None when the data is invalid.
+    """
+    if not serializer.is_valid():
+        return None
+    amount = serializer.validated_data["amount"]
+    type = "income" if amount > 0 else "expense"
+    with db_transaction.atomic():
+        instance = serializer.save(user=user, type=type)
+        ledger.record(user, added=[amount])
+        statuses = budgets.record(
+            user, added=[(instance.category_id, amount, instance.date_added)]
+        )
+        history_cache.invalidate_on_commit(user.pk)
+    return statuses
+
+
+async def _boundary(user):
+    return (
+        await UserBalance.objects.filter(user=user)
+        .values_list("archived_before", flat=True)
+        .afirst()
+    )
+
+
+async def _totals(user, queryset, filters, boundary):
+    if not filters:
+        balance = await UserBalance.objects.filter(user=user).afirst()
+        if balance is not None:
+            return {
+                "income": balance.income,
+                "expense": balance.expense,
+                "balance": balance.balance,
+            }
+    totals = await queryset.order_by().aaggregate(income=INCOME, expense=EXPENSE)
+    totals["income"] = totals["income"].quantize(CENT)
+    totals["expense"] = totals["expense"].quantize(CENT)
+    totals["balance"] = totals["income"] + totals["expense"]
+    if archive.reaches_archive(boundary, filters):
+        # cold rows are rare enough to read them on a thread
+        totals = await sync_to_async(archive.add_archived_totals)(
+            totals, user, filters, boundary
+        )
+    return totals
+
+
+def _page(queryset, position, page_size):
+    page = queryset.order_by(*KeysetPagination.ordering)
+    if position is not None:
+        page = KeysetPagination.after(page, position)
+    return page.values_list(*TRANSACTION_COLUMNS, "date_added")[: page_size + 1]
+
+
+def _position(row):
+    return row[-1], row[0]
+
+
+@csrf_exempt
+@require_POST
+@authenticated
+@throttled("writes")
+async def create_transaction(request):
+    """creates a new transaction"""
+    try:
+        data = loads(request.body)
+    except ValueError as exc:
+        return _response(
+            {"detail": f"JSON parse error - {exc}"}, status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = TransactionSerializer(data=data, context={"request": request})
+    budget_statuses = await sync_to_async(_save_transaction)(serializer, request.user)
+    if budget_statuses is None:
+        return _response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    response = {
+        "message": "Transaction created successfully",
+        "status": status.HTTP_201_CREATED,
+        "response": serializer.data,
+        "budgets": budget_statuses,
+    }
+    return _response(response, status.HTTP_201_CREATED)
+
+
+@require_GET
+@authenticated
+@throttled("history")
+async def transaction_history(request):
+    """gets all transactions, a page at a time"""
+    filters = HistoryFilterSerializer(data=request.GET)
+    if not filters.is_valid():
+        return _response(filters.errors, status.HTTP_400_BAD_REQUEST)
+
+    paginator = KeysetPagination()
+    query = Request(request)
+    page_size = paginator.get_page_size(query)
+    try:
+        position = paginator.decode_cursor(query)
+    except APIException as exc:
+        return _error(exc)
+
+    queryset = filter_transactions(
+        Transaction.objects.filter(user=request.user), filters.validated_data
+    )
+    boundary = await _boundary(request.user)
+    totals = await _totals(request.user, queryset, filters.validated_data, boundary)
+
+    rows = [row async for row in _page(queryset, position, page_size)]
+    # like KeysetPagination, only pages reaching past the boundary read the archive
+    if archive.reaches_archive(boundary, filters.validated_data) and (
+        len(rows) <= page_size or rows[-1][-1] < boundary
+    ):
+        archived = archive.archived_queryset(request.user, filters.validated_data)
+        archived_rows = [row async for row in _page(archived, position, page_size)]
+        merged = heapq.merge(rows, archived_rows, key=_position, reverse=True)
+        rows = list(merged)[: page_size + 1]
+    next_link = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_link = replace_query_param(
+            request.build_absolute_uri(),
+            paginator.cursor_query_param,
+            encode_position((rows[-1][-1], rows[-1][0])),
+        )
+
+    response = {
+        "message": "Transactions retrieved successfully",
+        "status": status.HTTP_200_OK,
+        "response": {
+            **totals,
+            "history": serialize_transactions(rows),
+            "next": next_link,
+        },
+    }
+    return _response(response, status.HTTP_200_OK)
+
+
+@require_GET
+@authenticated
+async def transaction_detail(request, pk):
+    """gets one transaction"""
+    for model in (Transaction, ArchivedTransaction):
+        instance = await model.objects.filter(id=pk, user=request.user).afirst()
+        if instance is not None:
+            return _response(TransactionSerializer(instance).data, status.HTTP_200_OK)
+    return _response(
+        {"detail": "The transaction does not exist"}, status.HTTP_404_NOT_FOUND
+    )
+
+
+@require_GET
+@authenticated
+@throttled("history")
+async def transaction_totals(request):
+    """income, expense and balance, optionally over filtered history"""
+    filters = HistoryFilterSerializer(data=request.GET)
+    if not filters.is_valid():
+        return _response(filters.errors, status.HTTP_400_BAD_REQUEST)
+
+    queryset = filter_transactions(
+        Transaction.objects.filter(user=request.user), filters.validated_data
+    )
+    boundary = await _boundary(request.user) if filters.validated_data else None
+    response = {
+        "message": "Totals retrieved successfully",
+        "status": status.HTTP_200_OK,
+        "response": await _totals(
+            request.user, queryset, filters.validated_data, boundary
+        ),
+    }
+    return _response(response, status.HTTP_200_OK)
@@ -0,0 +1,182 @@
+"""
+Running spend of budgets, so limits are checked without summing history.
+
+A Budget caps what a user spends in a category per week or month of
+TIME_ZONE. Each of its periods has a BudgetSpend row, and every write adjusts
+the rows of the periods it touches with F() updates inside the write's own
+transaction.atomic block, like ledger.record does for the balance. Create
+and patch responses read their budget's status from that one row.
+
+A new budget starts tracking at its current period, which is filled with a
+single aggregate. reconcile_budgets recomputes every tracked period from the
+raw rows and fixes drift.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import ArchivedTransaction, Budget, BudgetSpend, Transaction
+from .summary import TRUNCATE
+from .totals import CENT
+
+
+def period_start(moment, period):
+    """first day of the week (Monday) or month moment falls in"""
+    day = timezone.localdate(moment, timezone.get_default_timezone())
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _midnight(day):
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_default_timezone()
+    )
+
+
+def expected_spends(budget, since):
+    """{period start: (spent, count)} of the budget's periods from since on,
+    summed from the raw transactions, archived ones included"""
+    spends = {}
+    for model in (Transaction, ArchivedTransaction):
+        rows = (
+            model.objects.filter(
+                user_id=budget.user_id,
+                category_id=budget.category_id,
+                date_added__gte=_midnight(since),
+            )
+            .order_by()
+            .annotate(
+                start=TRUNCATE[budget.period](
+                    "date_added", tzinfo=timezone.get_default_timezone()
+                )
+            )
+            .values("start")
+            .annotate(total=Sum("amount"), count=Count("id"))
+        )
+        for row in rows:
+            start = timezone.localdate(row["start"], timezone.get_default_timezone())
+            spent, count = spends.get(start, (Decimal("0.00"), 0))
+            spends[start] = (spent - row["total"], count + row["count"])
+    return {
+        start: (spent.quantize(CENT), count) for start, (spent, count) in spends.items()
+    }
+
+
+def start_tracking(budget):
+    """
+    tracks the budget from its current period on, dropping older spend rows.
+
+    Must run inside the atomic block that saves the budget.
+    """
+    budget.tracked_from = period_start(timezone.now(), budget.period)
+    budget.save(update_fields=["tracked_from"])
+    budget.spends.all().delete()
+    spent, count = expected_spends(budget, budget.tracked_from).get(
+        budget.tracked_from, (Decimal("0.00"), 0)
+    )
+    BudgetSpend.objects.create(
+        budget=budget, start=budget.tracked_from, spent=spent, count=count
+    )
+
+
+def status(budget, start, spend=None):
+    """where the budget stands in the period starting at start"""
+    spent = spend.spent if spend is not None else Decimal("0.00")
+    return {
+        "start": start,
+        "spent": spent,
+        "remaining": budget.limit - spent,
+        "over_limit": spent > budget.limit,
+    }
+
+
+def current_statuses(budgets):
+    """{budget id: status} of each budget's current period, in one query"""
+    now = timezone.now()
+    starts = {budget.pk: period_start(now, budget.period) for budget in budgets}
+    spends = {
+        (spend.budget_id, spend.start): spend
+        for spend in BudgetSpend.objects.filter(
+            budget__in=budgets, start__in=set(starts.values())
+        )
+    }
+    return {
+        budget.pk: status(
+            budget, starts[budget.pk], spends.get((budget.pk, starts[budget.pk]))
+        )
+        for budget in budgets
+    }
+
+
+def _apply(budget_id, start, spent, count):
+    changes = {"spent": F("spent") + spent, "count": F("count") + count}
+    if BudgetSpend.objects.filter(budget_id=budget_id, start=start).update(**changes):
+        return
+    try:
+        # the first write of the period, unless another one just beat us to it
+        with db_transaction.atomic():
+            BudgetSpend.objects.create(
+                budget_id=budget_id, start=start, spent=spent, count=count
+            )
+    except IntegrityError:
+        BudgetSpend.objects.filter(budget_id=budget_id, start=start).update(**changes)
+
+
+def record(user, added=(), removed=()):
+    """
+    applies written transactions to the spend of the user's budgets.
+
+    added and removed are (category id, amount, date_added) of the rows
+    written and of what they replaced. Returns the status of each budget the
+    added rows count against. Must run inside the same transaction.atomic
+    block as the write itself.
+    """
+    categories = {category for category, _, _ in (*added, *removed) if category}
+    if not categories:
+        return []
+    budgets = list(Budget.objects.filter(user=user, category_id__in=categories))
+    if not budgets:
+        return []
+
+    changes, touched = {}, {}
+    for sign, rows in ((1, added), (-1, removed)):
+        for category, amount, date_added in rows:
+            for budget in budgets:
+                if budget.category_id != category:
+                    continue
+                start = period_start(date_added, budget.period)
+                if start < budget.tracked_from:
+                    continue
+                spent, count = changes.get((budget.pk, start), (0, 0))
+                changes[(budget.pk, start)] = (spent - sign * amount, count + sign)
+                if sign > 0:
+                    touched[(budget.pk, start)] = budget
+
+    for (budget_id, start), (spent, count) in changes.items():
+        if spent or count:
+            _apply(budget_id, start, spent, count)
+
+    if not touched:
+        return []
+    spends = {
+        (spend.budget_id, spend.start): spend
+        for spend in BudgetSpend.objects.filter(
+            budget_id__in={budget_id for budget_id, _ in touched},
+            start__in={start for _, start in touched},
+        )
+    }
+    return [
+        {
+            "budget": budget.pk,
+            "category": budget.category_id,
+            "period": budget.period,
+            "limit": budget.limit,
+            **status(budget, start, spends.get((budget.pk, start))),
+        }
+        for (_, start), budget in touched.items()
+    ]
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _version_key(user_id):
+    return f"transaction:history:version:{user_id}"
+
+
+def _new_version():
+    # a fresh, ever increasing value so entries written under a version that
+    # was evicted from the cache can never be served again
+    return time.time_ns()
+
+
+def get_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(user_id):
+    """bumps the user's version so every cached history page goes stale"""
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def invalidate_on_commit(user_id):
+    """invalidates once the surrounding write commits, so readers can't re-cache old rows"""
+    transaction.on_commit(lambda: invalidate(user_id))
+
+
+def history_key(user_id, version, query_string):
+    """key of a history page cached under version, as read by get_version"""
+    digest = hashlib.md5(query_string.encode()).hexdigest()
+    return f"transaction:history:{user_id}:{version}:{digest}"
+
+
+def _count(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def get_history(key):
+    """returns the cached history payload or None"""
+    payload = cache.get(key)
+    _count("misses" if payload is None else "hits")
+    return payload
+
+
+def set_history(key, payload):
+    cache.set(key, payload, timeout=settings.TRANSACTION_HISTORY_CACHE_TIMEOUT)
+
+
+def stats():
+    """hit and miss counts of this process"""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+    }
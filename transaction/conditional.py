@@ -0,0 +1,75 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import ArchivedTransaction, Transaction, UserBalance
+
+
+def _etag(*parts):
+    return quote_etag(hashlib.md5(":".join(map(str, parts)).encode()).hexdigest())
+
+
+def history_validators(user, query_string, media_format, version):
+    """
+    returns the ETag and Last-Modified of a user's history in the negotiated
+    renderer's format.
+
+    They come from the ledger row, which every write (including deletes)
+    touches, so no transaction rows are loaded. Users without a ledger yet
+    fall back to one max(date_modified)/count aggregate. The ETag also holds
+    version, the user's history cache version, which changes with writes
+    that leave the ledger alone, like deleting a category.
+    """
+    state = (
+        UserBalance.objects.filter(user=user).values("last_modified", "count").first()
+    )
+    if state is None:
+        state = Transaction.objects.filter(user=user).aggregate(
+            last_modified=Max("date_modified"), count=Count("id")
+        )
+    last_modified = state["last_modified"]
+    etag = _etag(
+        user.pk,
+        state["count"],
+        last_modified,
+        version,
+        query_string,
+        media_format,
+    )
+    return etag, last_modified
+
+
+def transaction_validators(user, pk):
+    """returns the ETag and Last-Modified of one transaction, archived or not, or
+    None if it doesn't exist"""
+    for model in (Transaction, ArchivedTransaction):
+        date_modified = (
+            model.objects.filter(id=pk, user=user)
+            .values_list("date_modified", flat=True)
+            .first()
+        )
+        if date_modified is not None:
+            return _etag(user.pk, pk, date_modified), date_modified
+    return None
+
+
+def not_modified(request, etag, last_modified):
+    """returns a 304 response if the client's copy is still current, else None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
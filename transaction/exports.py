@@ -0,0 +1,242 @@
+"""
+Exports of a user's transactions to files on local storage.
+
+ExportJob rows are the queue: the API creates them pending and the run_exports
+command claims them one at a time, streams the rows from a server-side cursor
+into a temporary file and renames it into EXPORT_ROOT when it's complete. Rows
+are written chunk by chunk, so a worker's memory doesn't grow with the size of
+the export.
+
+CSV exports are gzipped. Parquet exports need pyarrow, which isn't in
+requirements.txt, and can only be requested where it's installed.
+"""
+import csv
+import gzip
+import heapq
+import io
+import os
+import re
+import tempfile
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from . import archive
+from .filters import filter_transactions
+from .models import ExportJob, Transaction
+from .serializers import HistoryFilterSerializer
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+
+EXPORT_COLUMNS = ("id", "date_added", "description", "amount", "type")
+
+# format -> (file suffix, content type)
+EXPORT_FILES = {
+    "csv": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [format for format in EXPORT_FILES if format != "parquet" or pyarrow]
+
+
+def _rows(queryset, chunk_size):
+    return (
+        queryset.order_by("date_added", "id")
+        .values_list(*EXPORT_COLUMNS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _chunks(job, chunk_size):
+    filters = HistoryFilterSerializer(data=job.filters)
+    filters.is_valid(raise_exception=True)
+    filters = filters.validated_data
+    queryset = filter_transactions(
+        Transaction.objects.filter(user_id=job.user_id), filters
+    )
+    rows = _rows(queryset, chunk_size)
+    if archive.reaches_archive(archive.get_boundary(job.user_id), filters):
+        archived = _rows(archive.archived_queryset(job.user_id, filters), chunk_size)
+        rows = heapq.merge(rows, archived, key=lambda row: (row[1], row[0]))
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_csv(file, chunks):
+    count = 0
+    # mtime=0 so the same rows always give the same file
+    with gzip.GzipFile(fileobj=file, mode="wb", mtime=0) as compressed:
+        text = io.TextIOWrapper(compressed, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(
+                (id, date_added.isoformat(), description, f"{amount:f}", type)
+                for id, date_added, description, amount, type in chunk
+            )
+            count += len(chunk)
+        text.flush()
+        text.detach()
+    return count
+
+
+def _parquet_schema():
+    field = Transaction._meta.get_field("amount")
+    return pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("date_added", pyarrow.timestamp("us", tz="UTC")),
+            ("description", pyarrow.string()),
+            ("amount", pyarrow.decimal128(field.max_digits, field.decimal_places)),
+            ("type", pyarrow.string()),
+        ]
+    )
+
+
+def _write_parquet(file, chunks):
+    count = 0
+    schema = _parquet_schema()
+    # one row group per chunk keeps a single chunk in memory at a time
+    with pyarrow.parquet.ParquetWriter(file, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = [list(column) for column in zip(*chunk)]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet}
+
+
+def export_path(job):
+    suffix, _ = EXPORT_FILES[job.format]
+    return Path(settings.EXPORT_ROOT) / str(job.user_id) / f"{job.pk}.{suffix}"
+
+
+def claim_job():
+    """marks the oldest pending job running and returns it, None when idle"""
+    while True:
+        job = (
+            ExportJob.objects.filter(status="pending").order_by("date_created").first()
+        )
+        if job is None:
+            return None
+        # another worker may have claimed it since, only one update wins
+        claimed = ExportJob.objects.filter(pk=job.pk, status="pending").update(
+            status="running", date_started=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job, chunk_size):
+    """writes the export of a claimed job and marks it done or failed"""
+    path = export_path(job)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            rows = WRITERS[job.format](file, _chunks(job, chunk_size))
+        os.replace(temporary, path)
+    except Exception as exc:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        job.status, job.error = "failed", str(exc) or exc.__class__.__name__
+    else:
+        job.status, job.rows, job.file = "done", rows, str(path)
+        job.size = path.stat().st_size
+    job.date_finished = timezone.now()
+    job.save(update_fields=["status", "rows", "size", "file", "error", "date_finished"])
+    return job
+
+
+def requeue_stale_jobs(timeout):
+    """puts jobs whose worker died while running them back in the queue"""
+    started_before = timezone.now() - timedelta(seconds=timeout)
+    return ExportJob.objects.filter(
+        status="running", date_started__lt=started_before
+    ).update(status="pending", date_started=None)
+
+
+def delete_expired_jobs(retention):
+    """deletes finished jobs older than retention seconds, with their files"""
+    finished_before = timezone.now() - timedelta(seconds=retention)
+    expired = ExportJob.objects.filter(
+        status__in=["done", "failed"], date_finished__lt=finished_before
+    )
+    for job in expired.only("file"):
+        if job.file:
+            Path(job.file).unlink(missing_ok=True)
+    return expired.delete()[0]
+
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _file_range(path, start, length, block_size=64 * 1024):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(block_size, length))
+            if not block:
+                return
+            length -= len(block)
+            yield block
+
+
+def ranged_file_response(request, path, content_type, filename, etag):
+    """
+    the file at path, or the single byte range the request asks for.
+
+    Multiple ranges and a stale If-Range get the whole file, as RFC 9110
+    allows. Either way the file is streamed, never read into memory.
+    """
+    size = path.stat().st_size
+    match = RANGE.match(request.headers.get("Range", "").replace(" ", ""))
+    if_range = request.headers.get("If-Range")
+    if match and (if_range is None or if_range == etag) and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # bytes=-n is the last n bytes
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            response["Accept-Ranges"] = "bytes"
+            return response
+        response = StreamingHttpResponse(
+            _file_range(path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    else:
+        response = FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,30 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_transactions(queryset, filters):
+    """
+    narrows queryset by validated HistoryFilterSerializer data.
+
+    Dates become half-open date_added ranges rather than __date lookups so
+    the (user, -date_added) index can serve them.
+    """
+    if "start" in filters:
+        queryset = queryset.filter(date_added__gte=start_of_day(filters["start"]))
+    if "end" in filters:
+        end = filters["end"] + timedelta(days=1)
+        queryset = queryset.filter(date_added__lt=start_of_day(end))
+    if "type" in filters:
+        queryset = queryset.filter(type=filters["type"])
+    if "min_amount" in filters:
+        queryset = queryset.filter(amount__gte=filters["min_amount"])
+    if "max_amount" in filters:
+        queryset = queryset.filter(amount__lte=filters["max_amount"])
+    if "search" in filters:
+        queryset = queryset.filter(description__istartswith=filters["search"])
+    return queryset
@@ -0,0 +1,65 @@
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import MonthlyRollup, Transaction, UserBalance
+from .totals import EXPENSE, INCOME, get_totals
+
+
+def split_amounts(amounts):
+    """returns the income, expense and count contributed by amounts"""
+    income = sum(amount for amount in amounts if amount > 0)
+    expense = sum(amount for amount in amounts if amount < 0)
+    return income, expense, len(amounts)
+
+
+def record(user, added=(), removed=()):
+    """
+    applies written amounts to the user's ledger row.
+
+    Must run inside the same transaction.atomic block as the write itself so
+    the ledger and the rows it summarises can never disagree.
+    """
+    added_income, added_expense, added_count = split_amounts(list(added))
+    removed_income, removed_expense, removed_count = split_amounts(list(removed))
+    income = added_income - removed_income
+    expense = added_expense - removed_expense
+
+    updated = UserBalance.objects.filter(user=user).update(
+        income=F("income") + income,
+        expense=F("expense") + expense,
+        balance=F("balance") + income + expense,
+        count=F("count") + added_count - removed_count,
+        last_modified=timezone.now(),
+    )
+    if not updated:
+        # first write of this user, the raw rows already include it
+        rebuild(user)
+
+
+def rebuild(user):
+    """recomputes the ledger row of user, a User or its id, from the raw
+    transactions and the rollups of the archived ones"""
+    user_id = getattr(user, "pk", user)
+    totals = Transaction.objects.filter(user_id=user_id).aggregate(
+        income=INCOME, expense=EXPENSE, count=Count("id")
+    )
+    archived = MonthlyRollup.objects.filter(user_id=user_id).aggregate(
+        income=Sum("income"), expense=Sum("expense"), count=Sum("count")
+    )
+    for key, value in archived.items():
+        if value is not None:
+            totals[key] += value
+    totals["balance"] = totals["income"] + totals["expense"]
+    UserBalance.objects.update_or_create(user_id=user_id, defaults=totals)
+
+
+def get_balance(user):
+    """returns income, expense and balance of all of the user's transactions"""
+    ledger = UserBalance.objects.filter(user=user).first()
+    if ledger is None:
+        return get_totals(Transaction.objects.filter(user=user))
+    return {
+        "income": ledger.income,
+        "expense": ledger.expense,
+        "balance": ledger.balance,
+    }
@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from transaction import archive
+from transaction.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves transactions added before the start of the month "
+        "TRANSACTION_ARCHIVE_AFTER_DAYS ago into the archive table in batches, "
+        "and adds them to the users' monthly rollups. History, "
+        "totals and summaries keep including them, but only read them when the "
+        "requested range goes back that far. Safe to run again at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TRANSACTION_ARCHIVE_AFTER_DAYS,
+            help="archive transactions older than this, rounded down to a month",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="seconds to pause between batches to spare the database",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive.archive_cutoff(options["days"], timezone.now())
+        user_ids = list(
+            Transaction.objects.filter(date_added__lt=cutoff)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        started = time.perf_counter()
+        moved = 0
+        for user_id in user_ids:
+            while True:
+                count = archive.archive_batch(user_id, cutoff, options["batch_size"])
+                moved += count
+                if count < options["batch_size"]:
+                    break
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+
+        self.stdout.write(
+            f"archived {moved} transactions of {len(user_ids)} users added before "
+            f"{cutoff:%Y-%m-%d} in {time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,132 @@
+import time
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from transaction import search
+from transaction.models import Transaction
+
+# merchant, share of the rows, subscriptions are rare next to daily spending
+MERCHANTS = [
+    ("Netflix", 0.002),
+    ("IKEA", 0.001),
+    ("Trainline", 0.005),
+    ("Amazon Marketplace", 0.08),
+    ("Tesco Express", 0.15),
+    ("Sainsbury's Local", 0.1),
+    ("Uber Trip", 0.06),
+    ("Uber Eats", 0.06),
+    ("Deliveroo", 0.05),
+    ("Starbucks Coffee", 0.12),
+    ("Pret A Manger", 0.1),
+    ("Shell Petrol", 0.05),
+    ("Boots Pharmacy", 0.05),
+    ("Vodafone", 0.01),
+]
+DETAILS = ["monthly", "refund", "card payment", "online", "London", "Manchester"]
+# rare words, where icontains has to read the whole history to fill a page,
+# then common ones, where it stops after a page of early matches
+QUERIES = ["netflix", "ikea", "trainl", "uber eats", "coffee", "refund"]
+
+
+def naive_search(user, text, limit):
+    """what a search would do without an index"""
+    return list(
+        Transaction.objects.filter(user=user, description__icontains=text)
+        .order_by("-date_added", "-id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the indexed description search against a plain icontains scan "
+        "for growing numbers of rows per user, in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,50000",
+            help="comma separated row counts per user to benchmark",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        databases = runner.setup_databases()
+        try:
+            self.run(options)
+        finally:
+            runner.teardown_databases(databases)
+            teardown_test_environment()
+
+    def run(self, options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        limit = options["page_size"]
+        rng = Random(0)
+        # a second user with as many rows, which every query has to skip
+        users = [
+            User.objects.create(username=f"__benchmark_search_{i}__") for i in (0, 1)
+        ]
+        self.stdout.write(
+            f"{connection.vendor}, index used: {search.is_indexed(connection)}"
+        )
+        self.stdout.write(
+            f"{'rows':>8} {'query':<10} {'matches':>8} {'index ms':>9} "
+            f"{'icontains ms':>13}"
+        )
+        names = [name for name, _ in MERCHANTS]
+        weights = [share for _, share in MERCHANTS]
+        rows = 0
+        for size in sizes:
+            for user in users:
+                Transaction.objects.bulk_create(
+                    (
+                        Transaction(
+                            user=user,
+                            description=(
+                                f"{rng.choices(names, weights)[0]} "
+                                f"{rng.choice(DETAILS)}"
+                            ),
+                            amount=Decimal(rng.randint(-50000, -1)) / 100,
+                            type="expense",
+                        )
+                        for _ in range(size - rows)
+                    ),
+                    batch_size=1000,
+                )
+            rows = size
+            user = users[0]
+            for query in QUERIES:
+                matches = len(naive_search(user, query, size))
+                indexed = self.best_of(
+                    options["repeat"], lambda: search.search(user, query, limit)
+                )
+                naive = self.best_of(
+                    options["repeat"], lambda: naive_search(user, query, limit)
+                )
+                self.stdout.write(
+                    f"{rows:>8} {query:<10} {matches:>8} {indexed:>9.2f} "
+                    f"{naive:>13.2f}"
+                )
+
+            # whole words at the start of a word match the same rows both ways
+            found = {id for id, _ in search.search(user, "netflix", size)}
+            if found != set(naive_search(user, "netflix", size)):
+                self.stderr.write(f"search and icontains disagree at {rows} rows")
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
@@ -0,0 +1,85 @@
+import time
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from transaction.models import Transaction
+from transaction.pagination import KeysetPagination
+from transaction.serializers import (
+    TRANSACTION_COLUMNS,
+    TransactionSerializer,
+    serialize_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times serializing transaction listings with TransactionSerializer over "
+        "model instances against serialize_transactions over values_list rows, "
+        "query included, and checks both give the same output. All rows are "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="50,500,5000,50000",
+            help="comma separated row counts to benchmark",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        repeat = options["repeat"]
+        rng = Random(0)
+
+        self.stdout.write(
+            f"{'rows':>10} {'serializer ms':>14} {'values ms':>10} {'speedup':>8}"
+        )
+        with db_transaction.atomic():
+            user = User.objects.create(username="__benchmark_serialization__")
+            rows = 0
+            for size in sizes:
+                Transaction.objects.bulk_create(
+                    (
+                        Transaction(
+                            user=user,
+                            description=f"benchmark {rng.randint(0, 10**6)}",
+                            amount=Decimal(rng.randint(-50000, 50000)) / 100,
+                        )
+                        for _ in range(size - rows)
+                    ),
+                    batch_size=1000,
+                )
+                rows = size
+                queryset = Transaction.objects.filter(user=user).order_by(
+                    *KeysetPagination.ordering
+                )
+
+                def serializer():
+                    return TransactionSerializer(list(queryset.all()), many=True).data
+
+                def values():
+                    return serialize_transactions(
+                        queryset.values_list(*TRANSACTION_COLUMNS)
+                    )
+
+                if serializer() != values():
+                    raise CommandError(f"outputs differ at {rows} rows")
+                slow = self.best_of(repeat, serializer)
+                fast = self.best_of(repeat, values)
+                self.stdout.write(
+                    f"{rows:>10} {slow:>14.2f} {fast:>10.2f} {slow / fast:>7.1f}x"
+                )
+            db_transaction.set_rollback(True)
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
@@ -0,0 +1,75 @@
+import time
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+
+from transaction.models import Transaction
+from transaction.totals import get_totals
+
+
+def python_totals(queryset):
+    """the previous implementation, kept for comparison"""
+    income = sum(t.amount for t in queryset if t.amount > 0)
+    expense = sum(t.amount for t in queryset if t.amount < 0)
+    return {"income": income, "expense": expense, "balance": float(income + expense)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Times history totals computed in the database against the python loop "
+        "for growing row counts. All rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000,10000,50000",
+            help="comma separated row counts to benchmark",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        repeat = options["repeat"]
+        rng = Random(0)
+
+        self.stdout.write(f"{'rows':>10} {'aggregate ms':>14} {'python ms':>12}")
+        with db_transaction.atomic():
+            user = User.objects.create(username="__benchmark_totals__")
+            rows = 0
+            for size in sizes:
+                Transaction.objects.bulk_create(
+                    (
+                        Transaction(
+                            user=user,
+                            description="benchmark",
+                            amount=Decimal(rng.randint(-50000, 50000)) / 100,
+                        )
+                        for _ in range(size - rows)
+                    ),
+                    batch_size=1000,
+                )
+                rows = size
+                queryset = Transaction.objects.filter(user=user)
+
+                aggregate = self.best_of(repeat, lambda: get_totals(queryset))
+                python = self.best_of(repeat, lambda: python_totals(queryset.all()))
+                self.stdout.write(f"{rows:>10} {aggregate:>14.2f} {python:>12.2f}")
+
+                if (
+                    float(get_totals(queryset)["balance"])
+                    != python_totals(queryset.all())["balance"]
+                ):
+                    self.stderr.write(f"totals mismatch at {rows} rows")
+            db_transaction.set_rollback(True)
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
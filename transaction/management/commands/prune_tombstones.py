@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from transaction import sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes deletion tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS. "
+        "Sync tokens from before then get a 410 and clients do a full sync."
+    )
+
+    def handle(self, *args, **options):
+        pruned = sync.prune_tombstones(timezone.now())
+        self.stdout.write(
+            f"pruned {pruned} tombstones older than "
+            f"{settings.SYNC_TOMBSTONE_RETENTION_DAYS} days"
+        )
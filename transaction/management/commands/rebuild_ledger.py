@@ -0,0 +1,88 @@
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+
+from transaction.models import MonthlyRollup, Transaction, UserBalance
+from transaction.totals import CENT, EXPENSE, INCOME
+
+
+FIELDS = ("income", "expense", "balance", "count")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes every user's balance ledger from the raw transactions, and "
+        "the monthly rollups of the archived ones, in batches of users. With "
+        "--verify it only reports drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="report users whose ledger drifted without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        verify = options["verify"]
+        user_ids = User.objects.order_by("pk").values_list("pk", flat=True).iterator()
+        checked = drifted = 0
+
+        while batch := list(islice(user_ids, options["batch_size"])):
+            with db_transaction.atomic():
+                expected = self.expected_balances(batch)
+                ledgers = {
+                    ledger.user_id: ledger
+                    for ledger in UserBalance.objects.select_for_update().filter(
+                        user_id__in=batch
+                    )
+                }
+                for user_id in batch:
+                    totals = expected.get(user_id)
+                    ledger = ledgers.get(user_id)
+                    if totals is None and ledger is None:
+                        continue
+                    totals = totals or dict.fromkeys(FIELDS, 0)
+                    checked += 1
+                    if ledger is not None and all(
+                        getattr(ledger, field) == totals[field] for field in FIELDS
+                    ):
+                        continue
+
+                    drifted += 1
+                    self.stdout.write(f"user {user_id}: ledger drifted from {totals}")
+                    if not verify:
+                        UserBalance.objects.update_or_create(
+                            user_id=user_id, defaults=totals
+                        )
+
+        self.stdout.write(f"checked {checked} ledgers, {drifted} drifted")
+        if verify and drifted:
+            raise CommandError(f"{drifted} ledgers drifted")
+
+    def expected_balances(self, user_ids):
+        rows = (
+            Transaction.objects.filter(user_id__in=user_ids)
+            .order_by()
+            .values("user")
+            .annotate(income=INCOME, expense=EXPENSE, count=Count("id"))
+        )
+        archived = (
+            MonthlyRollup.objects.filter(user_id__in=user_ids)
+            .order_by()
+            .values("user")
+            .annotate(income=Sum("income"), expense=Sum("expense"), count=Sum("count"))
+        )
+        expected = {}
+        for row in [*rows, *archived]:
+            totals = expected.setdefault(row["user"], dict.fromkeys(FIELDS, 0))
+            totals["income"] += row["income"].quantize(CENT)
+            totals["expense"] += row["expense"].quantize(CENT)
+            totals["count"] += row["count"]
+        for totals in expected.values():
+            totals["balance"] = totals["income"] + totals["expense"]
+        return expected
@@ -0,0 +1,60 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+
+from transaction import budgets
+from transaction.models import Budget, BudgetSpend
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the spend of every tracked budget period from the raw "
+        "transactions, archived ones included, in batches of budgets. With "
+        "--verify it only reports drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="report budget periods whose spend drifted without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        verify = options["verify"]
+        budget_ids = Budget.objects.order_by("pk").values_list("pk", flat=True)
+        budget_ids = budget_ids.iterator()
+        checked = drifted = 0
+
+        while batch := list(islice(budget_ids, options["batch_size"])):
+            with db_transaction.atomic():
+                for budget in Budget.objects.select_for_update().filter(pk__in=batch):
+                    expected = budgets.expected_spends(budget, budget.tracked_from)
+                    stored = {spend.start: spend for spend in budget.spends.all()}
+                    for start in sorted({*expected, *stored}):
+                        spent, count = expected.get(start, (0, 0))
+                        spend = stored.get(start)
+                        checked += 1
+                        if spend is not None and (spend.spent, spend.count) == (
+                            spent,
+                            count,
+                        ):
+                            continue
+
+                        drifted += 1
+                        self.stdout.write(
+                            f"budget {budget.pk} from {start}: spend drifted from "
+                            f"{spent} in {count} transactions"
+                        )
+                        if not verify:
+                            BudgetSpend.objects.update_or_create(
+                                budget=budget,
+                                start=start,
+                                defaults={"spent": spent, "count": count},
+                            )
+
+        self.stdout.write(f"checked {checked} budget periods, {drifted} drifted")
+        if verify and drifted:
+            raise CommandError(f"{drifted} budget periods drifted")
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from transaction import exports
+
+
+class Command(BaseCommand):
+    help = (
+        "Works through the queued transaction exports, writing each one into "
+        "EXPORT_ROOT, then waits for new ones. Run it as a separate process "
+        "next to the web workers, on storage they can read, or pass --once to "
+        "exit when the queue is empty. Finished exports older than "
+        "EXPORT_RETENTION_HOURS are deleted along the way."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="exit once the queue is empty"
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2.0, help="seconds between queue polls"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=3600,
+            help="requeue jobs that have been running for this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        retention = settings.EXPORT_RETENTION_HOURS * 3600
+        try:
+            while True:
+                close_old_connections()
+                requeued = exports.requeue_stale_jobs(options["stale_after"])
+                if requeued:
+                    self.stderr.write(f"requeued {requeued} stale exports")
+
+                job = exports.claim_job()
+                if job is not None:
+                    self.run(job, options["chunk_size"])
+                    continue
+
+                deleted = exports.delete_expired_jobs(retention)
+                if deleted:
+                    self.stdout.write(f"deleted {deleted} expired exports")
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+
+    def run(self, job, chunk_size):
+        started = time.perf_counter()
+        job = exports.run_job(job, chunk_size)
+        elapsed = time.perf_counter() - started
+        if job.status == "done":
+            self.stdout.write(
+                f"export {job.pk}: {job.rows} rows, {job.size} bytes "
+                f"in {elapsed:.1f}s"
+            )
+        else:
+            self.stderr.write(f"export {job.pk} failed: {job.error}")
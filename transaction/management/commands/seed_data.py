@@ -0,0 +1,164 @@
+import math
+import time
+from datetime import timedelta
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from transaction.models import Transaction, UserBalance
+
+
+# description, median amount, share of the day-to-day expenses
+EXPENSES = [
+    ("Groceries", 45, 0.25),
+    ("Coffee", 4, 0.15),
+    ("Restaurant", 30, 0.12),
+    ("Transport", 12, 0.12),
+    ("Shopping", 60, 0.1),
+    ("Utilities", 90, 0.06),
+    ("Subscription", 15, 0.06),
+    ("Entertainment", 25, 0.06),
+    ("Health", 50, 0.04),
+    ("Travel", 350, 0.04),
+]
+# share of the day-to-day transactions that are money coming in
+EXTRA_INCOME_SHARE = 0.05
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates users with a year of realistic transactions each: a monthly "
+        "salary and rent, and log-normally distributed day-to-day spending spread "
+        "over the period. The same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument(
+            "--transactions", type=int, default=1000, help="transactions per user"
+        )
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--prefix", default="seed_user_")
+        parser.add_argument("--password", default="Seed-password-1")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        usernames = [f"{prefix}{i}" for i in range(options["users"])]
+        if User.objects.filter(username__in=usernames).exists():
+            raise CommandError(f"users named {prefix}* exist already, pass --prefix")
+
+        rng = Random(options["seed"])
+        end = timezone.now().replace(microsecond=0)
+        start = end - timedelta(days=options["days"])
+        password = make_password(options["password"])
+        started = time.perf_counter()
+
+        with db_transaction.atomic():
+            users = User.objects.bulk_create(
+                User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    password=password,
+                )
+                for username in usernames
+            )
+            if users[0].pk is None:
+                users = list(User.objects.filter(username__in=usernames).order_by("pk"))
+
+            balances = []
+            for user in users:
+                rows = self.transactions(rng, user, options["transactions"], start, end)
+                self.create(user, rows, options["batch_size"])
+                balances.append(self.balance(user, rows))
+            UserBalance.objects.bulk_create(balances, batch_size=options["batch_size"])
+
+        created = len(users) * options["transactions"]
+        self.stdout.write(
+            f"created {len(users)} users and {created} transactions "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def create(self, user, rows, batch_size):
+        """
+        bulk-creates rows, then writes back their dates, which bulk_create
+        replaced with now()
+        """
+        dates = [row.date_added for row in rows]
+        Transaction.objects.bulk_create(rows, batch_size=batch_size)
+        if rows and rows[0].pk is None:
+            # backends that don't return the new ids insert them in order
+            ids = Transaction.objects.filter(user=user).order_by("pk")
+            for row, pk in zip(rows, ids.values_list("pk", flat=True)):
+                row.pk = pk
+        for row, moment in zip(rows, dates):
+            row.date_added = row.date_modified = moment
+        Transaction.objects.bulk_update(
+            rows, ["date_added", "date_modified"], batch_size=batch_size
+        )
+
+    def transactions(self, rng, user, count, start, end):
+        rows = []
+        month = start.replace(day=1, hour=9, minute=0, second=0)
+        while len(rows) + 2 <= count and month <= end:
+            if month >= start:
+                salary = Decimal(round(rng.gauss(3200, 600), 2)).quantize(
+                    Decimal("0.01")
+                )
+                rows.append(
+                    self.row(user, "Salary", max(salary, Decimal("500")), month)
+                )
+                rows.append(
+                    self.row(
+                        user, "Rent", -Decimal(rng.choice([850, 1100, 1400])), month
+                    )
+                )
+            month = (month + timedelta(days=32)).replace(day=1)
+
+        weights = [share for _, _, share in EXPENSES]
+        span = (end - start).total_seconds()
+        while len(rows) < count:
+            moment = start + timedelta(seconds=rng.random() * span)
+            # people mostly spend between 8am and 10pm
+            moment = min(moment.replace(hour=int(rng.gauss(15, 3.5)) % 24), end)
+            if rng.random() < EXTRA_INCOME_SHARE:
+                amount = self.lognormal(rng, 150, 0.8)
+                rows.append(self.row(user, "Refund", amount, moment))
+                continue
+            description, median, _ = rng.choices(EXPENSES, weights)[0]
+            rows.append(
+                self.row(user, description, -self.lognormal(rng, median, 0.6), moment)
+            )
+        rows.sort(key=lambda row: row.date_added)
+        return rows
+
+    def lognormal(self, rng, median, sigma):
+        amount = rng.lognormvariate(math.log(median), sigma)
+        return max(Decimal(f"{amount:.2f}"), Decimal("0.01"))
+
+    def row(self, user, description, amount, moment):
+        return Transaction(
+            user=user,
+            description=description,
+            amount=amount,
+            type="income" if amount > 0 else "expense",
+            date_added=moment,
+            date_modified=moment,
+        )
+
+    def balance(self, user, rows):
+        income = sum((row.amount for row in rows if row.amount > 0), Decimal("0.00"))
+        expense = sum((row.amount for row in rows if row.amount < 0), Decimal("0.00"))
+        return UserBalance(
+            user=user,
+            income=income,
+            expense=expense,
+            balance=income + expense,
+            count=len(rows),
+        )
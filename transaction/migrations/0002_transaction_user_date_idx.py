@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 15:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+from transaction.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # the index is built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ("transaction", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "-date_added", "-id"], name="transaction_user_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0 on 2026-10-18 15:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_balances(apps, schema_editor):
+    Transaction = apps.get_model("transaction", "Transaction")
+    UserBalance = apps.get_model("transaction", "UserBalance")
+    rows = (
+        Transaction.objects.order_by()
+        .values("user")
+        .annotate(
+            income=Sum("amount", filter=Q(amount__gt=0)),
+            expense=Sum("amount", filter=Q(amount__lt=0)),
+            count=Count("id"),
+        )
+    )
+    balances = []
+    for row in rows.iterator():
+        income = row["income"] or 0
+        expense = row["expense"] or 0
+        balances.append(
+            UserBalance(
+                user_id=row["user"],
+                income=income,
+                expense=expense,
+                balance=income + expense,
+                count=row["count"],
+            )
+        )
+    UserBalance.objects.bulk_create(balances, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transaction", "0002_transaction_user_date_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "income",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "expense",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("last_modified", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(build_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0 on 2026-10-18 15:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from transaction.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # the transaction index is built concurrently on PostgreSQL, outside a
+    # transaction
+    atomic = False
+
+    dependencies = [
+        ("transaction", "0003_userbalance"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("transaction_id", models.BigIntegerField()),
+                ("date_deleted", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "date_modified", "id"],
+                name="transaction_user_modified_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="deletedtransaction",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deletedtransaction",
+            index=models.Index(
+                fields=["user", "date_deleted", "id"], name="deleted_user_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.0 on 2026-10-18 16:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transaction", "0005_exportjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userbalance",
+            name="archived_before",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                (
+                    "income",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                (
+                    "expense",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("description", models.CharField(max_length=255)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("date_added", models.DateTimeField()),
+                ("date_modified", models.DateTimeField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("income", "income"), ("expense", "expense")],
+                        default="income",
+                        max_length=20,
+                    ),
+                ),
+                ("date_archived", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date_added"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-date_added", "-id"],
+                        name="archived_user_date_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "month"), name="rollup_user_month"
+            ),
+        ),
+    ]
@@ -8,6 +8,21 @@ TRANSACTION_TYPES = (
 )
 
 
+class Category(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=50)
+    date_added = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "name"], name="category_user_name")
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class Transaction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     description = models.CharField(max_length=255)
@@ -15,9 +30,198 @@ class Transaction(models.Model):
     date_added = models.DateTimeField(auto_now_add=True)
     date_modified = models.DateTimeField(auto_now=True)
     type = models.CharField(max_length=20, choices=TRANSACTION_TYPES, default="income")
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ["-date_added"]
+        indexes = [
+            models.Index(
+                fields=["user", "-date_added", "-id"], name="transaction_user_date_idx"
+            ),
+            models.Index(
+                fields=["user", "date_modified", "id"],
+                name="transaction_user_modified_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.description
+
+
+class UserBalance(models.Model):
+    """running totals of a user's transactions, kept in step by transaction.ledger"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="balance")
+    income = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+    last_modified = models.DateTimeField(auto_now=True)
+    # the user's transactions added before this are in ArchivedTransaction
+    archived_before = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} balance"
+
+
+class DeletedTransaction(models.Model):
+    """tombstone of a deleted transaction, so sync clients learn about deletions"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    transaction_id = models.BigIntegerField()
+    date_deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "date_deleted", "id"], name="deleted_user_date_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"deleted transaction {self.transaction_id}"
+
+
+class ArchivedTransaction(models.Model):
+    """
+    a transaction moved out of the hot table by archive_transactions.
+
+    Keeps the id it had as a Transaction, so cursors and exports order the
+    two tables as one. Archived rows are read-only.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    date_added = models.DateTimeField()
+    date_modified = models.DateTimeField()
+    type = models.CharField(max_length=20, choices=TRANSACTION_TYPES, default="income")
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    date_archived = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-date_added"]
+        indexes = [
+            models.Index(
+                fields=["user", "-date_added", "-id"], name="archived_user_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.description
+
+
+class MonthlyRollup(models.Model):
+    """income, expense and count of a user's archived transactions in a UTC month"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    month = models.DateField()
+    income = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="rollup_user_month")
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.month:%Y-%m}"
+
+
+BUDGET_PERIODS = (
+    ("week", "week"),
+    ("month", "month"),
+)
+
+
+class Budget(models.Model):
+    """a spending limit on a category per week or month"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    period = models.CharField(max_length=10, choices=BUDGET_PERIODS, default="month")
+    limit = models.DecimalField(max_digits=12, decimal_places=2)
+    # first period with a BudgetSpend row, earlier ones aren't tracked
+    tracked_from = models.DateField()
+    date_added = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["category", "period"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "period"], name="budget_category_period"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.category} {self.period}ly budget"
+
+
+class BudgetSpend(models.Model):
+    """
+    running spend of a budget's category in one period, kept in step by
+    transaction.budgets.
+
+    spent is the negated sum of the amounts, so refunds in the category count
+    against it.
+    """
+
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name="spends")
+    start = models.DateField()
+    spent = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["budget", "start"], name="spend_budget_start"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.budget} from {self.start}"
+
+
+EXPORT_FORMATS = (
+    ("csv", "gzipped CSV"),
+    ("parquet", "Parquet"),
+)
+
+EXPORT_STATUSES = (
+    ("pending", "pending"),
+    ("running", "running"),
+    ("done", "done"),
+    ("failed", "failed"),
+)
+
+
+class ExportJob(models.Model):
+    """an export of a user's transactions, written to a file by run_exports"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    format = models.CharField(max_length=10, choices=EXPORT_FORMATS, default="csv")
+    # validated HistoryFilterSerializer query params
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=EXPORT_STATUSES, default="pending")
+    rows = models.PositiveIntegerField(default=0)
+    size = models.PositiveBigIntegerField(default=0)
+    file = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_started = models.DateTimeField(null=True, blank=True)
+    date_finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "date_created"], name="export_status_idx"),
+            models.Index(fields=["user", "-date_created"], name="export_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.format} export {self.pk} of {self.user}"
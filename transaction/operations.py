@@ -0,0 +1,29 @@
+from django.contrib.postgres.operations import AddIndexConcurrently as PostgresAddIndex
+from django.db import migrations
+
+
+class AddIndexConcurrently(PostgresAddIndex):
+    """
+    builds the index without locking the table against writes on PostgreSQL,
+    a plain AddIndex on other databases.
+
+    Migrations using it need atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
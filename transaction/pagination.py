@@ -0,0 +1,153 @@
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_position(position):
+    """encodes a (datetime, id) keyset position as an opaque url-safe token"""
+    timestamp, pk = position
+    payload = json.dumps([timestamp.isoformat(), pk], separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+
+
+def decode_position(token):
+    """decodes a token made by encode_position, raises ValueError if it's invalid"""
+    try:
+        timestamp, pk = json.loads(urlsafe_b64decode(token.encode("ascii")))
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        raise ValueError("invalid position token")
+    # naive timestamps can't be compared with the stored, aware ones
+    if timestamp is None or timezone.is_naive(timestamp):
+        raise ValueError("invalid position token")
+    return timestamp, pk
+
+
+class KeysetPagination(BasePagination):
+    """
+    keyset pagination over (-date_added, -id).
+
+    The cursor is an opaque token holding the position of the last row of the
+    previous page, so every page is a single indexed range scan no matter how
+    deep the client has paged.
+    """
+
+    ordering = ("-date_added", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = settings.TRANSACTION_PAGE_SIZE
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._paginate(queryset, request, lambda row: (row.date_added, row.id))
+
+    def paginate_values(self, queryset, request, fields, archived=None, boundary=None):
+        """
+        like paginate_queryset, but returns values_list tuples of fields.
+
+        The tuples end with date_added and id, which the next cursor is
+        made of. archived, matching ArchivedTransaction rows which are all
+        older than boundary, is merged in once the page reaches back that far.
+        """
+        columns = (*fields, "date_added", "id")
+        return self._paginate(
+            queryset.values_list(*columns),
+            request,
+            lambda row: (row[-2], row[-1]),
+            None if archived is None else archived.values_list(*columns),
+            boundary,
+        )
+
+    def _rows(self, queryset, position):
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = self.after(queryset, position)
+        return list(queryset[: self.page_size + 1])
+
+    def _paginate(self, queryset, request, position_of, archived=None, boundary=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.next_position = None
+
+        position = self.decode_cursor(request)
+        results = self._rows(queryset, position)
+        # a page already full of rows newer than the boundary can't contain
+        # archived ones, so the archive is only read for the pages past it
+        if archived is not None and (
+            len(results) <= self.page_size or position_of(results[-1])[0] < boundary
+        ):
+            merged = heapq.merge(
+                results, self._rows(archived, position), key=position_of, reverse=True
+            )
+            results = list(islice(merged, self.page_size + 1))
+
+        if len(results) > self.page_size:
+            results = results[: self.page_size]
+            self.next_position = position_of(results[-1])
+        return results
+
+    @staticmethod
+    def after(queryset, position):
+        """rows that come after position in (-date_added, -id) order"""
+        date_added, pk = position
+        return queryset.filter(
+            Q(date_added__lt=date_added) | Q(date_added=date_added, id__lt=pk)
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def encode_cursor(self, position):
+        return encode_position(position)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return decode_position(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
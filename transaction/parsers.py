@@ -0,0 +1,41 @@
+import codecs
+import csv
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from budgetme.parsers import loads
+
+
+class NDJSONParser(BaseParser):
+    """parses newline delimited JSON, one object per line, into a list"""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items, number = [], 1
+        lines = enumerate(codecs.getreader(encoding)(stream), start=1)
+        try:
+            for number, line in lines:
+                if line.strip():
+                    items.append(loads(line))
+        except ValueError as exc:
+            raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+        return items
+
+
+class CSVParser(BaseParser):
+    """parses CSV with a header row into a list of dicts"""
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return list(csv.DictReader(codecs.getreader(encoding)(stream)))
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f"CSV parse error - {exc}")
@@ -0,0 +1,208 @@
+"""
+Ranked full-text search over transaction descriptions.
+
+SQLite keeps an FTS5 index per transaction table, filled by triggers on
+insert, update and delete. Postgres indexes to_tsvector('simple', description)
+with GIN, which it keeps up to date itself, plus a pg_trgm index so substring
+matches are indexed too where the extension can be installed.
+
+Both are set up by install() after every migrate. It's idempotent, and on
+SQLite it also brings back triggers lost when a migration rebuilt a table.
+Other databases fall back to an unranked icontains scan.
+"""
+import logging
+import re
+
+from django.db import DatabaseError, connections, router
+
+from .models import ArchivedTransaction, Transaction
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+
+# (table, FTS5 table) pairs, on Postgres only the table is used
+TABLES = [
+    (Transaction._meta.db_table, "transaction_search"),
+    (ArchivedTransaction._meta.db_table, "transaction_archived_search"),
+]
+
+SQLITE_INDEX = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+        description, content='{table}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {fts}_update
+    AFTER UPDATE OF description ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description);
+    END""",
+]
+
+POSTGRES_INDEX = """CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_description_tsv
+    ON {table} USING gin (to_tsvector('simple'::regconfig, description))"""
+
+POSTGRES_TRIGRAM_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_description_trgm
+    ON {table} USING gin (description gin_trgm_ops)""",
+]
+
+
+def _install_sqlite(cursor):
+    for table, fts in TABLES:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE %s ESCAPE '\\'",
+            [f"{fts}\\_%"],
+        )
+        complete = cursor.fetchone()[0] == len(SQLITE_INDEX) - 1
+        for statement in SQLITE_INDEX:
+            cursor.execute(statement.format(table=table, fts=fts))
+        if not complete:
+            # rows written while the triggers were missing aren't indexed
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _install_postgres(cursor):
+    for table, _ in TABLES:
+        cursor.execute(POSTGRES_INDEX.format(table=table))
+    try:
+        for table, _ in TABLES:
+            for statement in POSTGRES_TRIGRAM_INDEX:
+                cursor.execute(statement.format(table=table))
+    except DatabaseError as exc:
+        logger.warning("substring matches won't be indexed: %s", exc)
+
+
+def install(using):
+    """creates the search indexes on the database using, if it supports them"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            _install_sqlite(cursor)
+        elif connection.vendor == "postgresql":
+            _install_postgres(cursor)
+
+
+def install_after_migrate(using, **kwargs):
+    """post_migrate receiver"""
+    try:
+        install(using)
+    except DatabaseError as exc:
+        # e.g. SQLite built without FTS5, search scans instead
+        logger.warning("search index not installed on %s: %s", using, exc)
+
+
+def _sqlite_available(connection, fts):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [fts])
+        return cursor.fetchone() is not None
+
+
+_available = {}
+
+
+def is_indexed(connection):
+    """whether search can use the index on this connection"""
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor != "sqlite":
+        return False
+    if connection.alias not in _available:
+        _available[connection.alias] = _sqlite_available(connection, TABLES[0][1])
+    return _available[connection.alias]
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+def _sqlite_query(tables):
+    selects = [
+        f"SELECT {table}.id AS id, {table}.date_added AS date_added, "
+        f"-bm25({fts}) AS score FROM {fts} JOIN {table} ON {table}.id = {fts}.rowid "
+        f"WHERE {fts} MATCH %(match)s AND {table}.user_id = %(user)s"
+        for table, fts in tables
+    ]
+    # every word has to match, as a prefix so "netfl" finds Netflix
+    return " UNION ALL ".join(selects), lambda terms: " ".join(
+        f'"{term}"*' for term in terms
+    )
+
+
+def _postgres_query(tables):
+    selects = [
+        f"SELECT id, date_added, "
+        f"ts_rank_cd(to_tsvector('simple'::regconfig, description), query) AS score "
+        f"FROM {table}, to_tsquery('simple'::regconfig, %(match)s) query "
+        f"WHERE user_id = %(user)s AND ("
+        f"to_tsvector('simple'::regconfig, description) @@ query "
+        f"OR description ILIKE %(like)s)"
+        for table, _ in tables
+    ]
+    return " UNION ALL ".join(selects), lambda terms: " & ".join(
+        f"{term}:*" for term in terms
+    )
+
+
+def search(user, text, limit, offset=0, archived=False):
+    """
+    ids of the user's transactions matching text, best match first.
+
+    Returns up to limit (id, score) pairs after skipping offset of them, ties
+    broken by recency. With archived the ArchivedTransaction rows are
+    searched too. Rankings come from each table's own index statistics.
+    """
+    terms = words(text)
+    if not terms:
+        return []
+    connection = connections[router.db_for_read(Transaction)]
+    tables = TABLES if archived else TABLES[:1]
+    if not is_indexed(connection):
+        return _scan(user, text, limit, offset, archived)
+
+    if connection.vendor == "sqlite":
+        sql, match = _sqlite_query(tables)
+    else:
+        sql, match = _postgres_query(tables)
+    like = "%{}%".format(
+        text.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    sql += (
+        " ORDER BY score DESC, date_added DESC, id DESC"
+        " LIMIT %(limit)s OFFSET %(offset)s"
+    )
+    params = {
+        "match": match(terms),
+        "like": like,
+        "user": user.pk,
+        "limit": limit,
+        "offset": offset,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(id, score) for id, _, score in cursor.fetchall()]
+
+
+def _scan(user, text, limit, offset, archived):
+    querysets = [Transaction.objects.filter(user=user)]
+    if archived:
+        querysets.append(ArchivedTransaction.objects.filter(user=user))
+    ids = []
+    for queryset in querysets:
+        ids.extend(
+            queryset.filter(description__icontains=text.strip())
+            .order_by("-date_added", "-id")
+            .values_list("date_added", "id")[: offset + limit]
+        )
+    ids.sort(reverse=True)
+    return [(id, 0.0) for _, id in ids[offset : offset + limit]]
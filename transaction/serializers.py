@@ -1,9 +1,240 @@
+import decimal
+import zoneinfo
+from typing import Optional
+
+from django.conf import settings
+from django.urls import reverse
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from budgetme.metrics import (
+    TimedListSerializer,
+    TimedSerializerMixin,
+    timed_serialization,
+)
+
+from .models import EXPORT_FORMATS, Budget, Category, ExportJob, Transaction
+from .search import words
+
+
+class CategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    id of one of the requesting user's categories.
+
+    The user's categories are loaded once per serializer, so validating a bulk
+    upload doesn't cost a query per row.
+    """
 
-from .models import Transaction
+    def get_queryset(self):
+        request = self.context.get("request")
+        if request is None:
+            return Category.objects.none()
+        return Category.objects.filter(user=request.user)
 
+    def to_internal_value(self, data):
+        if not hasattr(self, "_categories"):
+            self._categories = {
+                category.pk: category for category in self.get_queryset()
+            }
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self._categories[int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    category = CategoryField(required=False, allow_null=True)
 
-class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
-        fields = ["id", "description", "amount"]
+        fields = ["id", "description", "amount", "category"]
+        list_serializer_class = TimedListSerializer
+
+
+# columns read by serialize_transactions, values_list("category") gives the
+# category id like the field does
+TRANSACTION_COLUMNS = tuple(TransactionSerializer.Meta.fields)
+
+
+def serialize_transactions(rows):
+    """
+    TransactionSerializer(rows, many=True).data for values_list rows.
+
+    rows start with the TRANSACTION_COLUMNS, any columns after them are
+    ignored. Building model instances and running every serializer field per
+    row costs far more than the query for long histories, so this formats the
+    tuples in one pass, rounding amounts exactly like the amount field does.
+    """
+    amount = TransactionSerializer().fields["amount"]
+    exponent = decimal.Decimal(".1") ** amount.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = amount.max_digits
+    rounding = amount.rounding
+    coerce_to_string = getattr(
+        amount, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    with timed_serialization():
+        # zip stops at the last of the TRANSACTION_COLUMNS
+        results = [dict(zip(TRANSACTION_COLUMNS, row)) for row in rows]
+        for result in results:
+            value = result["amount"].quantize(exponent, rounding, context)
+            # once quantized to a negative exponent str() never uses scientific
+            # notation, so it matches the field's "{:f}" formatting at half the
+            # cost
+            result["amount"] = str(value) if coerce_to_string else value
+        return results
+
+
+class HistoryFilterSerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="first day, inclusive")
+    end = serializers.DateField(required=False, help_text="last day, inclusive")
+    type = serializers.ChoiceField(choices=["income", "expense"], required=False)
+    min_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    max_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    search = serializers.CharField(
+        max_length=255, required=False, help_text="description prefix"
+    )
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "end must not be before start."})
+        if (
+            "min_amount" in attrs
+            and "max_amount" in attrs
+            and attrs["min_amount"] > attrs["max_amount"]
+        ):
+            raise serializers.ValidationError(
+                {"max_amount": "max_amount must not be below min_amount."}
+            )
+        return attrs
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255, help_text="words to look for")
+    page = serializers.IntegerField(min_value=1, max_value=100, default=1)
+
+    def validate_q(self, value):
+        if not words(value):
+            raise serializers.ValidationError("Enter at least one word.")
+        return value
+
+
+class SummaryQuerySerializer(HistoryFilterSerializer):
+    period = serializers.ChoiceField(choices=["day", "week", "month"], default="month")
+    tz = serializers.CharField(
+        default=settings.TIME_ZONE, help_text="IANA time zone of the buckets"
+    )
+    cumulative = serializers.BooleanField(
+        default=False, help_text="add the running balance of each bucket"
+    )
+    rolling = serializers.IntegerField(
+        min_value=1,
+        max_value=366,
+        required=False,
+        help_text="add the balance of the last n buckets",
+    )
+
+    def validate_tz(self, value):
+        try:
+            return zoneinfo.ZoneInfo(value)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(f"Unknown time zone {value}.")
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["cumulative"] and "rolling" in attrs:
+            raise serializers.ValidationError(
+                {"rolling": "rolling can't be combined with cumulative."}
+            )
+        return attrs
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ["id", "name"]
+
+    def validate_name(self, value):
+        categories = Category.objects.filter(
+            user=self.context["request"].user, name__iexact=value
+        )
+        if self.instance is not None:
+            categories = categories.exclude(pk=self.instance.pk)
+        if categories.exists():
+            raise serializers.ValidationError(f"You already have a category {value}.")
+        return value
+
+
+class BudgetStatusSerializer(serializers.Serializer):
+    start = serializers.DateField(help_text="first day of the current period")
+    spent = serializers.DecimalField(max_digits=20, decimal_places=2)
+    remaining = serializers.DecimalField(max_digits=20, decimal_places=2)
+    over_limit = serializers.BooleanField()
+
+
+class BudgetSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    category = CategoryField()
+    status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Budget
+        fields = ["id", "category", "period", "limit", "status"]
+        extra_kwargs = {"limit": {"min_value": decimal.Decimal("0.01")}}
+
+    @extend_schema_field(BudgetStatusSerializer)
+    def get_status(self, budget):
+        # filled in by the view with budgets.current_statuses
+        return self.context.get("statuses", {}).get(budget.pk)
+
+    def validate(self, attrs):
+        category = attrs.get("category", getattr(self.instance, "category", None))
+        period = attrs.get("period", getattr(self.instance, "period", "month"))
+        budgets = Budget.objects.filter(category=category, period=period)
+        if self.instance is not None:
+            budgets = budgets.exclude(pk=self.instance.pk)
+        if budgets.exists():
+            raise serializers.ValidationError(
+                {"period": f"{category} already has a {period}ly budget."}
+            )
+        return attrs
+
+
+class ExportRequestSerializer(HistoryFilterSerializer):
+    format = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+
+
+class ExportJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "format",
+            "filters",
+            "status",
+            "rows",
+            "size",
+            "error",
+            "date_created",
+            "date_started",
+            "date_finished",
+            "download",
+        ]
+        read_only_fields = fields
+
+    def get_download(self, job) -> Optional[str]:
+        if job.status != "done":
+            return None
+        path = reverse("transaction_export_download", kwargs={"pk": job.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request is not None else path
@@ -0,0 +1,63 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from budgetme.renderers import dumps
+
+from .serializers import TRANSACTION_COLUMNS, serialize_transactions
+
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _position(row):
+    return row[-1], row[0]
+
+
+def _serialized_chunks(queryset, chunk_size, archived=None):
+    """
+    yields serialized rows chunk by chunk from a server-side cursor.
+
+    With archived, the matching ArchivedTransaction rows are read from a
+    second cursor and merged in, both already in (-date_added, -id) order.
+    """
+    columns = (*TRANSACTION_COLUMNS, "date_added")
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    if archived is not None:
+        archived_rows = archived.values_list(*columns).iterator(chunk_size=chunk_size)
+        rows = heapq.merge(rows, archived_rows, key=_position, reverse=True)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield serialize_transactions(chunk)
+
+
+def _json_stream(chunks):
+    separator = b"["
+    for chunk in chunks:
+        yield separator + dumps(chunk)[1:-1]
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def _ndjson_stream(chunks):
+    for chunk in chunks:
+        yield b"".join(dumps(row) + b"\n" for row in chunk)
+
+
+def stream_transactions(queryset, stream_format, archived=None):
+    """streams a whole queryset as a JSON array or as NDJSON without materializing it"""
+    chunks = _serialized_chunks(
+        queryset, settings.TRANSACTION_STREAM_CHUNK_SIZE, archived
+    )
+    if stream_format == "ndjson":
+        content = _ndjson_stream(chunks)
+    else:
+        content = _json_stream(chunks)
+    return StreamingHttpResponse(content, content_type=STREAM_FORMATS[stream_format])
@@ -0,0 +1,57 @@
+from django.db import connections
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+
+from .totals import CENT, EXPENSE, INCOME, ZERO
+
+
+TRUNCATE = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+AMOUNTS = ("income", "expense", "net", "balance")
+
+
+def _rounded(bucket):
+    for key in AMOUNTS:
+        if key in bucket:
+            bucket[key] = bucket[key].quantize(CENT)
+    return bucket
+
+
+def get_summary(queryset, period, tzinfo, cumulative=False, rolling=None):
+    """
+    returns income, expense and net per period bucket of queryset.
+
+    Buckets come from one GROUP BY over date_added truncated in tzinfo. With
+    cumulative or rolling the running balance is added by a SUM() OVER window
+    wrapped around that same grouped query, so it's still one round-trip.
+    """
+    grouped = (
+        queryset.order_by()
+        .annotate(bucket=TRUNCATE[period]("date_added", tzinfo=tzinfo))
+        .values("bucket")
+        .annotate(income=INCOME, expense=EXPENSE, net=Coalesce(Sum("amount"), ZERO))
+    )
+    if not cumulative and not rolling:
+        return [_rounded(bucket) for bucket in grouped.order_by("bucket")]
+
+    connection = connections[grouped.db]
+    compiler = grouped.query.get_compiler(connection=connection)
+    sql, params = compiler.as_sql()
+    aliases = [alias for _, _, alias in compiler.select]
+    converters = compiler.get_converters([column for column, _, _ in compiler.select])
+    # the window sums net, so it converts like net
+    if aliases.index("net") in converters:
+        converters[len(aliases)] = converters[aliases.index("net")]
+
+    if rolling:
+        frame = f"ROWS BETWEEN {int(rolling) - 1} PRECEDING AND CURRENT ROW"
+    else:
+        frame = "ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW"
+    bucket, net = map(connection.ops.quote_name, ("bucket", "net"))
+    sql = (
+        f"SELECT grouped.*, SUM(grouped.{net}) OVER (ORDER BY grouped.{bucket} {frame}) "
+        f"FROM ({sql}) grouped ORDER BY grouped.{bucket}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = compiler.apply_converters(cursor.fetchall(), converters)
+        return [_rounded(dict(zip(aliases + ["balance"], row))) for row in rows]
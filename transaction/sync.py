@@ -0,0 +1,139 @@
+"""
+Delta sync of a user's transactions and deletion tombstones.
+
+Each stream is read in ascending (timestamp, id) order, but the timestamps
+are assigned by the app before the row commits. A row can commit after a
+later-timestamped one was already handed out, so a plain high-water mark
+would skip it for good. The token therefore carries a settled position per
+stream, which never gets closer to now than SYNC_OVERLAP_SECONDS, and a sync
+that catches up resumes from it. Rows newer than that are sent again on the
+next sync, clients apply changes and deletions by id so the repeats are
+harmless. While has_more is set the token also holds the position of the
+last row sent, so paging through a backlog moves forward.
+
+Tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS are deleted by
+prune_tombstones. A token settled before that cutoff may have missed
+deletions, get_changes raises ResyncRequired for it.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DeletedTransaction, Transaction
+from .pagination import decode_position, encode_position
+
+
+class ResyncRequired(Exception):
+    """the token is older than the tombstones kept, the client has to start over"""
+
+
+def encode_sync_token(changed, deleted):
+    """
+    packs the (settled, page) positions of the changed and deleted streams into
+    one opaque token
+    """
+    return ".".join(
+        encode_position(position) if position else ""
+        for position in (*changed, *deleted)
+    )
+
+
+def decode_sync_token(token):
+    """unpacks a token made by encode_sync_token, raises ValueError if it's invalid"""
+    parts = token.split(".")
+    if len(parts) != 4:
+        raise ValueError("invalid sync token")
+    changed_settled, changed_page, deleted_settled, deleted_page = (
+        decode_position(part) if part else None for part in parts
+    )
+    if deleted_settled is None:
+        raise ValueError("invalid sync token")
+    return (changed_settled, changed_page), (deleted_settled, deleted_page)
+
+
+def retention_cutoff(now):
+    """tombstones deleted before this are pruned"""
+    return now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_tombstones(now):
+    """deletes the tombstones past retention, returns how many"""
+    return DeletedTransaction.objects.filter(
+        date_deleted__lt=retention_cutoff(now)
+    ).delete()[0]
+
+
+def _after(queryset, field, position, limit):
+    """up to limit + 1 rows after position in ascending (field, id) order"""
+    queryset = queryset.order_by(field, "id")
+    if position is not None:
+        timestamp, pk = position
+        queryset = queryset.filter(
+            Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, "id__gt": pk})
+        )
+    return list(queryset[: limit + 1])
+
+
+def _read(queryset, field, positions, limit, horizon):
+    """
+    the rows of one stream and its next (settled, page) positions.
+
+    Rows up to horizon are settled, any committing later with an earlier
+    timestamp are assumed not to exist.
+    """
+    settled, page = positions
+    start = page or settled
+    rows = _after(queryset, field, start, limit)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        last = (getattr(rows[-1], field), rows[-1].id)
+        reached, page = min(last, horizon), last
+    else:
+        reached, page = horizon, None
+    # pages that went past the horizon of their own read may have missed rows,
+    # only a read from the settled position can move it
+    if start == settled and (settled is None or reached > settled):
+        settled = reached
+    return rows, (settled, page), has_more
+
+
+def get_changes(user, token, limit):
+    """
+    returns the user's transactions created or modified since token, the ids
+    deleted since token and the token to resume from.
+
+    Without a token every transaction is returned, and deletions start from
+    the overlap window, since a fresh client has nothing to delete.
+    """
+    now = timezone.now()
+    horizon = (now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), 0)
+    if token is None:
+        changed_positions, deleted_positions = (None, None), (horizon, None)
+    else:
+        changed_positions, deleted_positions = decode_sync_token(token)
+        if deleted_positions[0][0] < retention_cutoff(now):
+            raise ResyncRequired()
+
+    changed, changed_positions, more_changed = _read(
+        Transaction.objects.filter(user=user),
+        "date_modified",
+        changed_positions,
+        limit,
+        horizon,
+    )
+    deleted, deleted_positions, more_deleted = _read(
+        DeletedTransaction.objects.filter(user=user),
+        "date_deleted",
+        deleted_positions,
+        limit,
+        horizon,
+    )
+    return {
+        "changed": changed,
+        "deleted": [tombstone.transaction_id for tombstone in deleted],
+        "next": encode_sync_token(changed_positions, deleted_positions),
+        "has_more": more_changed or more_deleted,
+    }
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account.authentication import user_cache
+from transaction.models import Transaction
+
+
+# reads stay on default, a replica can't see what a test's transaction wrote
+@override_settings(DATABASE_REPLICAS=[])
+class APITestCase(TestCase):
+    """a user with an authenticated client, and clean caches for each test"""
+
+    def setUp(self):
+        # ids are reused after a rollback, cached users and counters aren't
+        for cache in caches.all():
+            cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user("spender", password="Xx12345678!")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def add(self, amount, description="test", **fields):
+        amount = Decimal(amount)
+        fields.setdefault("type", "income" if amount > 0 else "expense")
+        return Transaction.objects.create(
+            user=self.user, description=description, amount=amount, **fields
+        )
@@ -0,0 +1,57 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+
+from transaction import archive
+from transaction.models import ArchivedTransaction, Transaction, UserBalance
+
+from .base import APITestCase
+
+
+class ArchiveTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.add("-20.00", description="old")
+        self.recent = self.add("100.00", description="recent")
+        Transaction.objects.filter(pk=self.old.pk).update(
+            date_added=timezone.now() - timedelta(days=800)
+        )
+        self.cutoff = archive.archive_cutoff(730, timezone.now())
+
+    def test_archives_a_user_without_a_ledger_row(self):
+        self.assertFalse(UserBalance.objects.filter(user=self.user).exists())
+
+        moved = archive.archive_batch(self.user.id, self.cutoff, 100)
+
+        self.assertEqual(moved, 1)
+        self.assertTrue(ArchivedTransaction.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(Transaction.objects.filter(pk=self.old.pk).exists())
+        balance = UserBalance.objects.get(user=self.user)
+        self.assertEqual(balance.archived_before, self.cutoff)
+        self.assertEqual(balance.income, Decimal("100.00"))
+        self.assertEqual(balance.expense, Decimal("-20.00"))
+
+    def test_archived_transaction_is_read_only(self):
+        archive.archive_batch(self.user.id, self.cutoff, 100)
+        path = reverse("transaction_delete", args=[self.old.pk])
+
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["description"], "old")
+
+        response = self.client.patch(path, {"description": "new"}, format="json")
+        self.assertEqual(response.status_code, 409)
+        response = self.client.delete(path)
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(ArchivedTransaction.objects.filter(pk=self.old.pk).exists())
+
+    def test_archived_transaction_of_another_user_is_not_found(self):
+        archive.archive_batch(self.user.id, self.cutoff, 100)
+        other = type(self.user).objects.create_user("other", password="Xx12345678!")
+        self.client.force_authenticate(other)
+
+        response = self.client.get(reverse("transaction_delete", args=[self.old.pk]))
+
+        self.assertEqual(response.status_code, 404)
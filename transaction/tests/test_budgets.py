@@ -0,0 +1,101 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from transaction import budgets, ledger
+from transaction.models import Budget, BudgetSpend, Category
+
+from .base import APITestCase
+
+
+class BudgetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(user=self.user, name="food")
+
+    def create_budget(self, limit="50.00"):
+        response = self.client.post(
+            reverse("transaction_budgets"),
+            {"category": self.category.pk, "period": "month", "limit": limit},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Budget.objects.get(pk=response.json()["response"]["id"])
+
+    def create(self, amount):
+        response = self.client.post(
+            reverse("transaction_create"),
+            {"description": "lunch", "amount": amount, "category": self.category.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def spend(self, budget):
+        return budgets.current_statuses([budget])[budget.pk]["spent"]
+
+    def test_new_budget_counts_the_current_period(self):
+        self.add("-20.00", category=self.category)
+        self.add("-99.00")
+
+        budget = self.create_budget()
+
+        self.assertEqual(self.spend(budget), Decimal("20.00"))
+
+    def test_writes_keep_the_spend(self):
+        budget = self.create_budget()
+
+        body = self.create("-30.00")
+        [status] = body["budgets"]
+        self.assertEqual(status["budget"], budget.pk)
+        self.assertFalse(status["over_limit"])
+
+        path = reverse("transaction_delete", args=[body["response"]["id"]])
+        response = self.client.patch(path, {"amount": "-60.00"}, format="json")
+        self.assertTrue(response.json()["budgets"][0]["over_limit"])
+        self.assertEqual(self.spend(budget), Decimal("60.00"))
+
+        self.client.delete(path)
+        self.assertEqual(self.spend(budget), Decimal("0.00"))
+
+    def test_refunds_count_against_the_spend(self):
+        budget = self.create_budget()
+        self.create("-30.00")
+
+        self.create("10.00")
+
+        self.assertEqual(self.spend(budget), Decimal("20.00"))
+
+    def test_reconcile_fixes_drift(self):
+        budget = self.create_budget()
+        self.create("-30.00")
+        BudgetSpend.objects.filter(budget=budget).update(spent=Decimal("1.00"))
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_budgets", verify=True, stdout=StringIO())
+        self.assertEqual(self.spend(budget), Decimal("1.00"))
+
+        call_command("reconcile_budgets", stdout=StringIO())
+        self.assertEqual(self.spend(budget), Decimal("30.00"))
+        call_command("reconcile_budgets", verify=True, stdout=StringIO())
+
+
+class CategoryTests(APITestCase):
+    def test_deleting_a_category_changes_the_history_etag(self):
+        category = Category.objects.create(user=self.user, name="food")
+        self.add("-5.00", category=category)
+        ledger.rebuild(self.user)
+        path = reverse("transaction_history")
+        etag = self.client.get(path)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(
+                reverse("transaction_category_detail", args=[category.pk])
+            )
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()["response"]["history"]
+        self.assertIsNone(row["category"])
@@ -0,0 +1,106 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from transaction.models import Transaction, UserBalance
+
+from .base import APITestCase
+
+
+class BulkCreateTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = reverse("transaction_bulk_create")
+
+    def upload(self, content, content_type):
+        return self.client.post(self.path, content, content_type=content_type)
+
+    def descriptions(self):
+        rows = Transaction.objects.filter(user=self.user).order_by("id")
+        return list(rows.values_list("description", "type"))
+
+    def test_valid_rows_are_created_and_invalid_ones_reported(self):
+        response = self.client.post(
+            self.path,
+            [
+                {"description": "pay", "amount": "900.00"},
+                {"description": "rent", "amount": "lots"},
+                {"amount": "-4.00"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(len(body["response"]), 1)
+        self.assertEqual([error["index"] for error in body["errors"]], [1, 2])
+        self.assertIn("amount", body["errors"][0]["errors"])
+        self.assertIn("description", body["errors"][1]["errors"])
+        self.assertEqual(self.descriptions(), [("pay", "income")])
+        self.assertEqual(UserBalance.objects.get(user=self.user).count, 1)
+
+    def test_nothing_valid_is_a_bad_request(self):
+        response = self.client.post(
+            self.path, [{"description": "rent", "amount": "lots"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 0)
+        self.assertEqual(self.descriptions(), [])
+
+    def test_a_single_object_is_a_bad_request(self):
+        response = self.client.post(
+            self.path, {"description": "pay", "amount": "900.00"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"Error": "Expected a list of transactions"})
+
+    @override_settings(TRANSACTION_BULK_MAX_ITEMS=2)
+    def test_more_rows_than_the_limit_are_refused(self):
+        items = [{"description": f"row {n}", "amount": "-1.00"} for n in range(3)]
+
+        response = self.client.post(self.path, items, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("At most 2", response.json()["Error"])
+        self.assertEqual(self.descriptions(), [])
+
+    def test_ndjson_upload(self):
+        response = self.upload(
+            b'{"description": "pay", "amount": "900.00"}\n'
+            b"\n"
+            b'{"description": "coffee", "amount": "-3.50"}\n',
+            "application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.descriptions(), [("pay", "income"), ("coffee", "expense")]
+        )
+
+    def test_malformed_ndjson_line_is_a_bad_request(self):
+        response = self.upload(
+            b'{"description": "pay", "amount": "900.00"}\n{"description": \n',
+            "application/x-ndjson",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", response.json()["detail"])
+        self.assertEqual(self.descriptions(), [])
+
+    def test_csv_upload_reports_bad_rows(self):
+        response = self.upload(
+            b"description,amount\npay,900.00\nrent,lots\ncoffee,-3.50\n", "text/csv"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [1])
+        self.assertEqual(
+            self.descriptions(), [("pay", "income"), ("coffee", "expense")]
+        )
+
+    def test_undecodable_csv_is_a_bad_request(self):
+        response = self.upload(b"description,amount\n\xff\xfe,1.00\n", "text/csv")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("CSV parse error", response.json()["detail"])
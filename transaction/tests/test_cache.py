@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from transaction import cache as history_cache
+from transaction.pagination import KeysetPagination
+
+from .base import APITestCase
+
+
+class HistoryCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add("-5.00", description="coffee")
+        self.path = reverse("transaction_history")
+
+    def history(self):
+        response = self.client.get(self.path)
+        body = response.json()["response"]
+        return response["X-Cache"], [row["description"] for row in body["history"]]
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        self.assertEqual(self.history(), ("MISS", ["coffee"]))
+        self.assertEqual(self.history(), ("HIT", ["coffee"]))
+
+    def test_create_invalidates_once_committed(self):
+        self.history()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("transaction_create"),
+                {"description": "rent", "amount": "-500.00"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.history(), ("MISS", ["rent", "coffee"]))
+
+    def test_delete_invalidates_once_committed(self):
+        transaction = self.add("-1.00", description="gum")
+        self.history()
+        path = reverse("transaction_delete", args=[transaction.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(path)
+
+        self.assertEqual(self.history(), ("MISS", ["coffee"]))
+
+    def test_page_read_during_a_write_is_not_cached_as_current(self):
+        paginate_values = KeysetPagination.paginate_values
+
+        def written_meanwhile(paginator, *args, **kwargs):
+            page = paginate_values(paginator, *args, **kwargs)
+            self.add("-1.00", description="gum")
+            history_cache.invalidate(self.user.pk)
+            return page
+
+        with mock.patch.object(KeysetPagination, "paginate_values", written_meanwhile):
+            self.assertEqual(self.history(), ("MISS", ["coffee"]))
+
+        self.assertEqual(self.history(), ("MISS", ["gum", "coffee"]))
+
+    def test_nothing_is_invalidated_before_the_commit(self):
+        self.history()
+        with self.captureOnCommitCallbacks() as callbacks:
+            history_cache.invalidate_on_commit(self.user.pk)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.history()[0], "HIT")
+
+    def test_other_users_pages_stay_cached(self):
+        other = User.objects.create_user("other", password="Xx12345678!")
+        self.history()
+
+        history_cache.invalidate(other.pk)
+
+        self.assertEqual(self.history()[0], "HIT")
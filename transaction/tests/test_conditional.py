@@ -0,0 +1,40 @@
+from django.urls import reverse
+
+from .base import APITestCase
+
+NDJSON = "application/x-ndjson"
+
+
+class HistoryValidatorTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add("-5.00", description="coffee")
+        self.path = reverse("transaction_history")
+
+    def test_json_and_ndjson_get_different_etags(self):
+        json = self.client.get(self.path, HTTP_ACCEPT="application/json")
+        ndjson = self.client.get(self.path, HTTP_ACCEPT=NDJSON)
+
+        self.assertEqual(json["Content-Type"], "application/json")
+        self.assertTrue(ndjson["Content-Type"].startswith(NDJSON))
+        self.assertNotEqual(json["ETag"], ndjson["ETag"])
+
+    def test_etag_of_one_format_does_not_match_the_other(self):
+        etag = self.client.get(self.path, HTTP_ACCEPT="application/json")["ETag"]
+
+        same = self.client.get(
+            self.path, HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=etag
+        )
+        other = self.client.get(self.path, HTTP_ACCEPT=NDJSON, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(same.status_code, 304)
+        self.assertEqual(other.status_code, 200)
+
+    def test_responses_vary_on_accept(self):
+        response = self.client.get(self.path)
+        unchanged = self.client.get(self.path, HTTP_IF_NONE_MATCH=response["ETag"])
+        streamed = self.client.get(self.path, HTTP_ACCEPT=NDJSON)
+
+        self.assertEqual(unchanged.status_code, 304)
+        for each in (response, unchanged, streamed):
+            self.assertIn("Accept", each["Vary"])
@@ -0,0 +1,123 @@
+import csv
+import gzip
+import io
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from transaction.models import ExportJob
+
+from .base import APITestCase
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(
+            override_settings(
+                EXPORT_ROOT=self.enterContext(tempfile.TemporaryDirectory())
+            )
+        )
+        self.add("900.00", description="pay")
+        self.add("-3.50", description="coffee")
+        self.add("-500.00", description="rent")
+
+    def queue(self, **data):
+        response = self.client.post(
+            reverse("transaction_exports"), {"format": "csv", **data}, format="json"
+        )
+        self.assertEqual(response.status_code, 202)
+        return response
+
+    def finished_job(self, **data):
+        job_id = self.queue(**data).json()["response"]["id"]
+        call_command("run_exports", once=True, stdout=StringIO())
+        return ExportJob.objects.get(pk=job_id)
+
+    def download(self, job, **headers):
+        path = reverse("transaction_export_download", args=[job.pk])
+        return self.client.get(path, **headers)
+
+    def test_queued_export_runs_and_downloads(self):
+        response = self.queue(type="expense")
+        job = response.json()["response"]
+        detail = reverse("transaction_export_detail", args=[job["id"]])
+        self.assertTrue(response["Location"].endswith(detail))
+        self.assertEqual((job["status"], job["download"]), ("pending", None))
+        pending = ExportJob.objects.get(pk=job["id"])
+        self.assertEqual(self.download(pending).status_code, 409)
+
+        call_command("run_exports", once=True, stdout=StringIO())
+
+        job = self.client.get(detail).json()["response"]
+        self.assertEqual((job["status"], job["rows"]), ("done", 2))
+        response = self.download(ExportJob.objects.get(pk=job["id"]))
+        self.assertEqual(response.status_code, 200)
+        content = gzip.decompress(b"".join(response.streaming_content))
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual([row["description"] for row in rows], ["coffee", "rent"])
+
+    def test_too_many_active_exports_conflict(self):
+        with override_settings(EXPORT_MAX_ACTIVE_JOBS=1):
+            self.queue()
+            response = self.client.post(
+                reverse("transaction_exports"), {"format": "csv"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 409)
+
+    def test_other_users_export_is_not_found(self):
+        other = User.objects.create_user("other", password="Xx12345678!")
+        job = ExportJob.objects.create(user=other)
+
+        detail = reverse("transaction_export_detail", args=[job.pk])
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        self.assertEqual(self.download(job).status_code, 404)
+        self.assertEqual(self.client.delete(detail).status_code, 404)
+        self.assertTrue(ExportJob.objects.filter(pk=job.pk).exists())
+
+    def test_byte_range_download(self):
+        job = self.finished_job()
+        content = Path(job.file).read_bytes()
+
+        response = self.download(job, HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(content)}")
+        self.assertEqual(b"".join(response.streaming_content), content[10:20])
+
+        tail = self.download(job, HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(tail.streaming_content), content[-5:])
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        job = self.finished_job()
+
+        response = self.download(
+            job, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"something-else"'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), job.size)
+
+    def test_range_past_the_end_is_not_satisfiable(self):
+        job = self.finished_job()
+
+        response = self.download(job, HTTP_RANGE=f"bytes={job.size}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{job.size}")
+
+    def test_delete_removes_the_file(self):
+        job = self.finished_job()
+
+        response = self.client.delete(
+            reverse("transaction_export_detail", args=[job.pk])
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Path(job.file).exists())
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+from django.urls import reverse
+
+from transaction.models import Transaction
+
+from .base import APITestCase
+
+
+class HistoryFilterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.at("1500.00", "Salary January", 2024, 1, 5, 10)
+        self.at("-84.20", "Groceries", 2024, 1, 20, 12)
+        self.at("-700.00", "Rent February", 2024, 2, 3, 9)
+        self.at("-35.55", "Groceries market", 2024, 2, 14, 18)
+        self.at("1500.00", "Salary March", 2024, 3, 1, 8)
+
+    def at(self, amount, description, *when):
+        row = self.add(amount, description)
+        Transaction.objects.filter(pk=row.pk).update(
+            date_added=datetime(*when, tzinfo=timezone.utc)
+        )
+
+    def history(self, **params):
+        response = self.client.get(reverse("transaction_history"), params)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()["response"]
+        totals = {key: body[key] for key in ("income", "expense", "balance")}
+        return [row["description"] for row in body["history"]], totals
+
+    def test_dates_are_inclusive_days(self):
+        descriptions, totals = self.history(start="2024-01-20", end="2024-02-14")
+
+        self.assertEqual(
+            descriptions, ["Groceries market", "Rent February", "Groceries"]
+        )
+        self.assertEqual(
+            totals, {"income": 0.0, "expense": -819.75, "balance": -819.75}
+        )
+
+    def test_single_day(self):
+        descriptions, _ = self.history(start="2024-02-14", end="2024-02-14")
+
+        self.assertEqual(descriptions, ["Groceries market"])
+
+    def test_type(self):
+        descriptions, totals = self.history(type="income")
+
+        self.assertEqual(descriptions, ["Salary March", "Salary January"])
+        self.assertEqual(totals, {"income": 3000.0, "expense": 0.0, "balance": 3000.0})
+
+    def test_amount_range_is_inclusive(self):
+        descriptions, totals = self.history(min_amount="-84.20", max_amount="-35.55")
+
+        self.assertEqual(descriptions, ["Groceries market", "Groceries"])
+        self.assertEqual(
+            totals, {"income": 0.0, "expense": -119.75, "balance": -119.75}
+        )
+
+    def test_search_is_a_case_insensitive_prefix(self):
+        self.assertEqual(
+            self.history(search="groc")[0], ["Groceries market", "Groceries"]
+        )
+        self.assertEqual(self.history(search="market")[0], [])
+
+    def test_filters_combine(self):
+        descriptions, totals = self.history(
+            start="2024-02-01", type="expense", search="rent"
+        )
+
+        self.assertEqual(descriptions, ["Rent February"])
+        self.assertEqual(totals, {"income": 0.0, "expense": -700.0, "balance": -700.0})
+
+    def test_invalid_filters_are_bad_requests(self):
+        cases = [
+            ({"start": "yesterday"}, "start"),
+            ({"end": "2024-02-30"}, "end"),
+            ({"start": "2024-02-01", "end": "2024-01-31"}, "end"),
+            ({"type": "refund"}, "type"),
+            ({"min_amount": "lots"}, "min_amount"),
+            ({"max_amount": "1.001"}, "max_amount"),
+            ({"min_amount": "10", "max_amount": "-10"}, "max_amount"),
+        ]
+        for params, field in cases:
+            with self.subTest(params):
+                response = self.client.get(reverse("transaction_history"), params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
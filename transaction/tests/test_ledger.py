@@ -0,0 +1,124 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from transaction import ledger
+from transaction.models import DeletedTransaction, Transaction, UserBalance
+from transaction.totals import get_totals
+from transaction.views import RetrieveEditDestroyTransaction
+
+from .base import APITestCase
+
+
+class LedgerTests(APITestCase):
+    def create(self, amount, description="lunch"):
+        response = self.client.post(
+            reverse("transaction_create"),
+            {"description": description, "amount": amount},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return reverse("transaction_delete", args=[response.json()["response"]["id"]])
+
+    def assertLedgerMatchesRows(self):
+        balance = UserBalance.objects.get(user=self.user)
+        rows = Transaction.objects.filter(user=self.user)
+        self.assertEqual(
+            {
+                "income": balance.income,
+                "expense": balance.expense,
+                "balance": balance.balance,
+            },
+            get_totals(rows),
+        )
+        self.assertEqual(balance.count, rows.count())
+
+    def test_writes_keep_the_ledger(self):
+        self.add("100.00")
+        path = self.create("-30.00")
+        self.create("20.00")
+        self.assertLedgerMatchesRows()
+
+        self.client.patch(path, {"amount": "45.00"}, format="json")
+        self.assertLedgerMatchesRows()
+
+        self.client.delete(path)
+        self.assertLedgerMatchesRows()
+        self.assertEqual(ledger.get_balance(self.user)["balance"], Decimal("120.00"))
+
+    def test_put_keeps_the_ledger(self):
+        path = self.create("10.00")
+        self.client.get(reverse("transaction_history"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                path, {"description": "refund", "amount": "-50.00"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Transaction.objects.get(user=self.user).type, "expense")
+        self.assertLedgerMatchesRows()
+        history = self.client.get(reverse("transaction_history"))
+        self.assertEqual(history["X-Cache"], "MISS")
+        self.assertEqual(history.json()["response"]["balance"], -50)
+
+    def test_delete_that_lost_a_race_records_nothing(self):
+        path = self.create("-30.00")
+        lock_object = RetrieveEditDestroyTransaction.lock_object
+
+        def deleted_meanwhile(view):
+            instance = lock_object(view)
+            # what a concurrent delete does where rows can't be locked
+            Transaction.objects.filter(id=instance.id).delete()
+            return instance
+
+        with mock.patch.object(
+            RetrieveEditDestroyTransaction, "lock_object", deleted_meanwhile
+        ):
+            self.client.delete(path)
+
+        self.assertFalse(DeletedTransaction.objects.exists())
+        balance = UserBalance.objects.get(user=self.user)
+        self.assertEqual((balance.balance, balance.count), (Decimal("-30.00"), 1))
+
+    def test_bulk_create_keeps_the_ledger(self):
+        self.create("-5.00")
+
+        response = self.client.post(
+            reverse("transaction_bulk_create"),
+            [
+                {"description": "pay", "amount": "900.00"},
+                {"description": "rent", "amount": "-500.00"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLedgerMatchesRows()
+
+    def test_patch_without_amount_keeps_it(self):
+        path = self.create("-30.00")
+
+        response = self.client.patch(path, {"description": "dinner"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        transaction = Transaction.objects.get(user=self.user)
+        self.assertEqual(
+            (transaction.description, transaction.amount, transaction.type),
+            ("dinner", Decimal("-30.00"), "expense"),
+        )
+        self.assertLedgerMatchesRows()
+
+    def test_rebuild_ledger_fixes_drift(self):
+        self.create("-30.00")
+        UserBalance.objects.filter(user=self.user).update(balance=Decimal("1.00"))
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_ledger", verify=True, stdout=StringIO())
+
+        call_command("rebuild_ledger", stdout=StringIO())
+        self.assertLedgerMatchesRows()
+        call_command("rebuild_ledger", verify=True, stdout=StringIO())
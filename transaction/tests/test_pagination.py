@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from transaction.models import Transaction
+from transaction.pagination import decode_position, encode_position
+
+from .base import APITestCase
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        for i in range(5):
+            self.add("-1.00", description=f"t{i}")
+        # two rows share a timestamp, id breaks the tie
+        Transaction.objects.filter(description__in=["t1", "t2"]).update(
+            date_added=now - timedelta(days=1)
+        )
+
+    def pages(self, **params):
+        pages, path = [], reverse("transaction_history")
+        while path:
+            body = self.client.get(path, params).json()["response"]
+            pages.append([row["description"] for row in body["history"]])
+            path, params = body["next"], None
+        return pages
+
+    def test_pages_walk_the_history_once_newest_first(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by("-date_added", "-id")
+            .values_list("description", flat=True)
+        )
+
+        pages = self.pages(page_size=2)
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_rows_added_while_paging_dont_shift_pages(self):
+        path = reverse("transaction_history")
+        first = self.client.get(path, {"page_size": 2}).json()["response"]
+        self.add("-1.00", description="new")
+
+        second = self.client.get(first["next"]).json()["response"]
+
+        seen = [row["description"] for row in first["history"] + second["history"]]
+        self.assertNotIn("new", seen)
+        self.assertEqual(len(set(seen)), 4)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse("transaction_history"), {"cursor": "nope"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_position_round_trips(self):
+        position = (timezone.now(), 42)
+
+        self.assertEqual(decode_position(encode_position(position)), position)
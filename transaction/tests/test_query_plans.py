@@ -0,0 +1,89 @@
+import re
+import unittest
+from decimal import Decimal
+from random import Random
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from transaction.models import Transaction
+from transaction.pagination import KeysetPagination
+from transaction.totals import get_totals
+
+# plan nodes that mean the query read every row or sorted the result itself
+BAD_PLAN_NODES = {
+    "sqlite": [r"\bSCAN transaction_transaction\b", r"USE TEMP B-TREE FOR ORDER BY"],
+    "postgresql": [r"Seq Scan on transaction_transaction", r"(^|->\s*)Sort\b"],
+}
+
+
+def explain(query):
+    """runs query and returns the plan of every SQL statement it executed"""
+    statements = []
+
+    def capture(execute, sql, params, many, context):
+        statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        query()
+
+    plans = []
+    with connection.cursor() as cursor:
+        for sql, params in statements:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            plans.append("\n".join(" ".join(map(str, row)) for row in cursor))
+    return plans
+
+
+@unittest.skipUnless(
+    connection.vendor in BAD_PLAN_NODES, "query plans aren't checked on this database"
+)
+class QueryPlanTests(TestCase):
+    """history, detail and totals read a user's rows off the index, unsorted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = Random(0)
+        owners = User.objects.bulk_create(User(username=f"owner{i}") for i in range(20))
+        Transaction.objects.bulk_create(
+            (
+                Transaction(
+                    user=owner,
+                    description="query plan",
+                    amount=Decimal(rng.randint(-50000, 50000)) / 100,
+                )
+                for owner in owners
+                for _ in range(500)
+            ),
+            batch_size=1000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Transaction._meta.db_table}")
+        cls.user = owners[0]
+
+    def setUp(self):
+        self.queryset = Transaction.objects.filter(user=self.user)
+        self.page = self.queryset.order_by(*KeysetPagination.ordering)
+        self.last = self.page[10]
+
+    def assertIndexed(self, query):
+        for plan in explain(query):
+            for pattern in BAD_PLAN_NODES[connection.vendor]:
+                self.assertIsNone(re.search(pattern, plan, re.MULTILINE), plan)
+
+    def test_history(self):
+        self.assertIndexed(lambda: list(self.page[:51]))
+
+    def test_history_next_page(self):
+        position = (self.last.date_added, self.last.id)
+        self.assertIndexed(
+            lambda: list(KeysetPagination.after(self.page, position)[:51])
+        )
+
+    def test_detail(self):
+        self.assertIndexed(lambda: self.queryset.get(id=self.last.id))
+
+    def test_totals(self):
+        self.assertIndexed(lambda: get_totals(self.queryset))
@@ -0,0 +1,105 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+
+from transaction import search
+from transaction.models import Transaction
+
+from .base import APITestCase
+
+
+class SearchTestsMixin:
+    def setUp(self):
+        super().setUp()
+        self.add("-3.50", description="Coffee")
+        self.add("-12.99", description="Netflix subscription")
+        self.add("-8.00", description="coffee beans from the corner market")
+        self.add("-20.00", description="Café crème at the airport")
+        other = User.objects.create_user("other", password="Xx12345678!")
+        Transaction.objects.create(
+            user=other, description="coffee", amount="-2.00", type="expense"
+        )
+
+    def find(self, q, **params):
+        response = self.client.get(reverse("transaction_search"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["description"] for row in response.json()["response"]["results"]]
+
+    def test_only_the_users_own_rows_match(self):
+        descriptions = self.find("coffee")
+
+        self.assertCountEqual(
+            descriptions, ["Coffee", "coffee beans from the corner market"]
+        )
+
+    def test_no_match(self):
+        self.assertEqual(self.find("rent"), [])
+
+    def test_query_without_words_is_a_bad_request(self):
+        response = self.client.get(reverse("transaction_search"), {"q": "%%"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("q", response.json())
+
+    def test_pages(self):
+        first = self.client.get(
+            reverse("transaction_search"), {"q": "coffee", "page_size": 1}
+        ).json()["response"]
+        second = self.client.get(first["next"]).json()["response"]
+
+        found = first["results"] + second["results"]
+        self.assertEqual(len(found), 2)
+        self.assertNotEqual(found[0]["id"], found[1]["id"])
+        self.assertIsNone(second["next"])
+
+
+class IndexedSearchTests(SearchTestsMixin, APITestCase):
+    def setUp(self):
+        if not search.is_indexed(connection):
+            self.skipTest("no full-text index on this database")
+        super().setUp()
+
+    def test_words_match_as_prefixes(self):
+        self.assertEqual(self.find("netfl"), ["Netflix subscription"])
+
+    def test_every_word_has_to_match(self):
+        self.assertEqual(
+            self.find("coffee market"), ["coffee beans from the corner market"]
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "accents are folded by FTS5")
+    def test_accents_are_ignored(self):
+        self.assertEqual(self.find("cafe creme"), ["Café crème at the airport"])
+
+    def test_better_match_ranks_above_a_newer_one(self):
+        self.assertEqual(
+            self.find("coffee"), ["Coffee", "coffee beans from the corner market"]
+        )
+
+    def test_index_follows_edits_and_deletes(self):
+        row = Transaction.objects.get(description="Coffee")
+        row.description = "Tea"
+        row.save()
+        Transaction.objects.filter(description__startswith="Netflix").delete()
+
+        self.assertEqual(self.find("tea"), ["Tea"])
+        self.assertEqual(self.find("coffee"), ["coffee beans from the corner market"])
+        self.assertEqual(self.find("netflix"), [])
+
+
+class ScanSearchTests(SearchTestsMixin, APITestCase):
+    """the fallback other databases use, forced here on the test database"""
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(search, "is_indexed", return_value=False))
+        super().setUp()
+
+    def test_newest_match_comes_first(self):
+        self.assertEqual(
+            self.find("coffee"), ["coffee beans from the corner market", "Coffee"]
+        )
+
+    def test_matches_substrings(self):
+        self.assertEqual(self.find("flix sub"), ["Netflix subscription"])
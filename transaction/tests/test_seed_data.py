@@ -0,0 +1,64 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from transaction.models import Transaction, UserBalance
+from transaction.totals import get_totals
+
+
+class SeedDataTests(TestCase):
+    def seed(self, prefix="seed_user_", seed=0):
+        call_command(
+            "seed_data",
+            users=2,
+            transactions=40,
+            days=60,
+            prefix=prefix,
+            seed=seed,
+            stdout=StringIO(),
+        )
+        return Transaction.objects.filter(user__username__startswith=prefix)
+
+    def test_rows_keep_their_generated_dates(self):
+        started = timezone.now()
+
+        rows = self.seed()
+
+        self.assertEqual(rows.count(), 80)
+        dates = rows.values_list("date_added", "date_modified")
+        self.assertTrue(all(added == modified for added, modified in dates))
+        self.assertLess(min(added for added, _ in dates), started - timedelta(days=30))
+
+    def test_model_dates_are_still_automatic(self):
+        self.seed()
+
+        row = Transaction.objects.first()
+        row.save()
+
+        self.assertGreater(row.date_modified, timezone.now() - timedelta(minutes=1))
+
+    def test_ledgers_match_the_rows(self):
+        self.seed()
+
+        for balance in UserBalance.objects.all():
+            rows = Transaction.objects.filter(user=balance.user)
+            self.assertEqual(get_totals(rows)["balance"], balance.balance)
+            self.assertEqual(rows.count(), balance.count)
+
+    def test_same_seed_same_data(self):
+        first = self.seed("first_")
+        second = self.seed("second_")
+
+        def amounts(rows):
+            return list(rows.order_by("id").values_list("amount", flat=True))
+
+        self.assertEqual(amounts(first), amounts(second))
+
+    def test_existing_prefix_is_refused(self):
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
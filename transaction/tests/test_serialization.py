@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import override_settings
+
+from transaction.models import Category, Transaction
+from transaction.serializers import (
+    TRANSACTION_COLUMNS,
+    TransactionSerializer,
+    serialize_transactions,
+)
+
+from .base import APITestCase
+
+
+class SerializeTransactionsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(user=self.user, name="food")
+        self.add("1200.00", description="Salary")
+        self.add("-3.5", description="Café crème", category=category)
+        self.add("-0.01", description='a "quote"')
+
+    def assertMatchesSerializer(self):
+        queryset = Transaction.objects.filter(user=self.user).order_by("id")
+
+        rows = serialize_transactions(
+            queryset.values_list(*TRANSACTION_COLUMNS, "date_added")
+        )
+
+        expected = TransactionSerializer(queryset, many=True).data
+        self.assertEqual(rows, [dict(row) for row in expected])
+        return rows
+
+    def test_matches_the_serializer(self):
+        rows = self.assertMatchesSerializer()
+
+        self.assertEqual(rows[1]["amount"], "-3.50")
+
+    @override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "COERCE_DECIMAL_TO_STRING": False}
+    )
+    def test_matches_the_serializer_with_decimal_amounts(self):
+        rows = self.assertMatchesSerializer()
+
+        self.assertEqual(rows[1]["amount"], Decimal("-3.50"))
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+from django.urls import reverse
+
+from transaction.models import Transaction
+
+from .base import APITestCase
+
+
+class SummaryTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.at("1500.00", "Salary January", 2024, 1, 5, 10)
+        self.at("-84.20", "Groceries", 2024, 1, 20, 12)
+        self.at("-700.00", "Rent February", 2024, 2, 3, 9)
+        self.at("-35.55", "Groceries market", 2024, 2, 14, 18)
+        self.at("1500.00", "Salary March", 2024, 3, 1, 8)
+
+    def at(self, amount, description, *when):
+        row = self.add(amount, description)
+        Transaction.objects.filter(pk=row.pk).update(
+            date_added=datetime(*when, tzinfo=timezone.utc)
+        )
+
+    def buckets(self, **params):
+        response = self.client.get(reverse("transaction_summary"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["response"]["buckets"]
+
+    def test_months(self):
+        self.assertEqual(
+            self.buckets(tz="UTC"),
+            [
+                {
+                    "bucket": "2024-01-01",
+                    "income": 1500.0,
+                    "expense": -84.2,
+                    "net": 1415.8,
+                },
+                {
+                    "bucket": "2024-02-01",
+                    "income": 0.0,
+                    "expense": -735.55,
+                    "net": -735.55,
+                },
+                {
+                    "bucket": "2024-03-01",
+                    "income": 1500.0,
+                    "expense": 0.0,
+                    "net": 1500.0,
+                },
+            ],
+        )
+
+    def test_cumulative_balance(self):
+        buckets = self.buckets(tz="UTC", cumulative="true")
+
+        self.assertEqual(
+            [bucket["balance"] for bucket in buckets], [1415.8, 680.25, 2180.25]
+        )
+
+    def test_rolling_balance(self):
+        buckets = self.buckets(tz="UTC", rolling=2)
+
+        self.assertEqual(
+            [bucket["balance"] for bucket in buckets], [1415.8, 680.25, 764.45]
+        )
+
+    def test_days_with_filters(self):
+        buckets = self.buckets(period="day", start="2024-02-01", type="expense")
+
+        self.assertEqual(
+            buckets,
+            [
+                {
+                    "bucket": "2024-02-03",
+                    "income": 0.0,
+                    "expense": -700.0,
+                    "net": -700.0,
+                },
+                {
+                    "bucket": "2024-02-14",
+                    "income": 0.0,
+                    "expense": -35.55,
+                    "net": -35.55,
+                },
+            ],
+        )
+
+    def test_buckets_follow_the_time_zone(self):
+        self.at("-5.00", "Late coffee", 2024, 1, 31, 23, 30)
+
+        utc = self.buckets(tz="UTC")
+        tokyo = self.buckets(tz="Asia/Tokyo")
+
+        self.assertEqual(utc[1]["expense"], -735.55)
+        self.assertEqual(tokyo[1]["expense"], -740.55)
+        self.assertEqual(tokyo[0]["expense"], -84.2)
+
+    def test_invalid_options_are_bad_requests(self):
+        cases = [
+            ({"period": "year"}, "period"),
+            ({"tz": "Mars/Olympus_Mons"}, "tz"),
+            ({"rolling": "0"}, "rolling"),
+            ({"cumulative": "true", "rolling": "3"}, "rolling"),
+            ({"start": "2024-13-01"}, "start"),
+            ({"type": "refund"}, "type"),
+        ]
+        for params, field in cases:
+            with self.subTest(params):
+                response = self.client.get(reverse("transaction_summary"), params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
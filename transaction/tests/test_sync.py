@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from transaction import sync
+from transaction.models import DeletedTransaction, Transaction
+
+from .base import APITestCase
+
+
+class SyncTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = reverse("transaction_sync")
+
+    def sync(self, since=None, **params):
+        if since is not None:
+            params["since"] = since
+        response = self.client.get(self.path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["response"]
+
+    def add_at(self, moment, description):
+        transaction = self.add("-1.00", description=description)
+        Transaction.objects.filter(pk=transaction.pk).update(date_modified=moment)
+        return transaction
+
+    def descriptions(self, changes):
+        return [row["description"] for row in changes["changed"]]
+
+    def test_pages_through_a_backlog_once(self):
+        day = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            self.add_at(day + timedelta(seconds=i), f"t{i}")
+
+        seen, since = [], None
+        while True:
+            changes = self.sync(since, page_size=2)
+            seen += self.descriptions(changes)
+            since = changes["next"]
+            if not changes["has_more"]:
+                break
+
+        self.assertEqual(seen, ["t0", "t1", "t2", "t3", "t4"])
+        self.assertEqual(self.sync(since)["changed"], [])
+
+    def test_row_committing_behind_a_later_one_is_picked_up(self):
+        now = timezone.now()
+        self.add_at(now, "first")
+        since = self.sync()["next"]
+
+        # timestamped before "first", but only committed after it was synced
+        self.add_at(now - timedelta(seconds=10), "late")
+
+        changes = self.sync(since)
+        self.assertEqual(self.descriptions(changes), ["late", "first"])
+
+    def test_settled_rows_arent_sent_again(self):
+        self.add_at(timezone.now() - timedelta(days=1), "old")
+        since = self.sync()["next"]
+
+        self.assertEqual(self.sync(since)["changed"], [])
+
+    def test_deletions_are_sent_by_id(self):
+        transaction = self.add("-1.00")
+        since = self.sync()["next"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("transaction_delete", args=[transaction.pk]))
+
+        changes = self.sync(since)
+
+        self.assertEqual(changes["deleted"], [transaction.pk])
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_token_older_than_the_tombstones_needs_a_full_sync(self):
+        since = sync.encode_sync_token(
+            (None, None), ((timezone.now() - timedelta(days=31), 0), None)
+        )
+
+        response = self.client.get(self.path, {"since": since})
+
+        self.assertEqual(response.status_code, 410)
+
+    def test_invalid_token(self):
+        response = self.client.get(self.path, {"since": "nope"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_token_without_a_timezone_is_invalid(self):
+        naive = timezone.make_naive(timezone.now())
+        since = sync.encode_sync_token((None, None), ((naive, 0), None))
+
+        response = self.client.get(self.path, {"since": since})
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_prune_tombstones(self):
+        old, _ = DeletedTransaction.objects.bulk_create(
+            DeletedTransaction(user=self.user, transaction_id=pk) for pk in (1, 2)
+        )
+        DeletedTransaction.objects.filter(pk=old.pk).update(
+            date_deleted=timezone.now() - timedelta(days=31)
+        )
+
+        call_command("prune_tombstones", stdout=StringIO())
+
+        self.assertQuerySetEqual(
+            DeletedTransaction.objects.values_list("transaction_id", flat=True), [2]
+        )
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from transaction import archive, ledger
+from transaction.models import Transaction
+
+from .base import APITestCase
+
+
+class TotalsTests(APITestCase):
+    """income, expense and balance are JSON numbers, whichever way they are summed"""
+
+    def setUp(self):
+        super().setUp()
+        self.add("1200.00")
+        self.add("-300.10")
+        self.totals = {"income": 1200.0, "expense": -300.1, "balance": 899.9}
+
+    def totals_of(self, name, **params):
+        body = self.client.get(reverse(name), params).json()["response"]
+        return {key: body[key] for key in self.totals}
+
+    def test_history_without_a_ledger(self):
+        self.assertEqual(self.totals_of("transaction_history"), self.totals)
+
+    def test_history_from_the_ledger(self):
+        ledger.rebuild(self.user)
+
+        self.assertEqual(self.totals_of("transaction_history"), self.totals)
+
+    def test_filtered_history(self):
+        totals = self.totals_of("transaction_history", type="expense")
+
+        self.assertEqual(totals, {"income": 0.0, "expense": -300.1, "balance": -300.1})
+
+    def test_async_totals(self):
+        self.assertEqual(self.totals_of("transaction_async_totals"), self.totals)
+        ledger.rebuild(self.user)
+        self.assertEqual(self.totals_of("transaction_async_totals"), self.totals)
+
+    def test_history_reaching_the_archive(self):
+        old = self.add("-0.90")
+        Transaction.objects.filter(pk=old.pk).update(
+            date_added=timezone.now() - timedelta(days=800)
+        )
+        archive.archive_batch(
+            self.user.pk, archive.archive_cutoff(730, timezone.now()), 100
+        )
+
+        totals = self.totals_of("transaction_history", min_amount="-1000")
+
+        self.assertEqual(
+            totals, {"income": 1200.0, "expense": -301.0, "balance": 899.0}
+        )
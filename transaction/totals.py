@@ -0,0 +1,24 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+ZERO = Value(
+    Decimal("0.00"), output_field=DecimalField(max_digits=20, decimal_places=2)
+)
+
+# SQLite returns sums of decimals as floats, results are rounded back to cents
+CENT = Decimal("0.01")
+
+INCOME = Coalesce(Sum("amount", filter=Q(amount__gt=0)), ZERO)
+EXPENSE = Coalesce(Sum("amount", filter=Q(amount__lt=0)), ZERO)
+
+
+def get_totals(queryset):
+    """returns income, expense and balance of a queryset in one aggregate query"""
+    totals = queryset.order_by().aggregate(income=INCOME, expense=EXPENSE)
+    totals["income"] = totals["income"].quantize(CENT)
+    totals["expense"] = totals["expense"].quantize(CENT)
+    totals["balance"] = totals["income"] + totals["expense"]
+    return totals
@@ -1,11 +1,76 @@
 from django.urls import path
 
-from .views import CreateTransaction, GetTransaction, RetrieveEditDestroyTransaction
+from . import async_views
+from .views import (
+    BulkCreateTransaction,
+    CreateTransaction,
+    GetTransaction,
+    HistoryCacheStats,
+    RetrieveEditDestroyTransaction,
+    TransactionBudgetDetail,
+    TransactionBudgets,
+    TransactionCategories,
+    TransactionCategoryDetail,
+    TransactionExportDetail,
+    TransactionExportDownload,
+    TransactionExports,
+    TransactionSearch,
+    TransactionSummary,
+    TransactionSync,
+)
 
 urlpatterns = [
     path("create/", CreateTransaction.as_view(), name="transaction_create"),
+    path("bulk/", BulkCreateTransaction.as_view(), name="transaction_bulk_create"),
     path("history/", GetTransaction.as_view(), name="transaction_history"),
+    path("sync/", TransactionSync.as_view(), name="transaction_sync"),
+    path("summary/", TransactionSummary.as_view(), name="transaction_summary"),
+    path("search/", TransactionSearch.as_view(), name="transaction_search"),
     path(
         "<int:pk>/", RetrieveEditDestroyTransaction.as_view(), name="transaction_delete"
     ),
+    path("exports/", TransactionExports.as_view(), name="transaction_exports"),
+    path(
+        "exports/<int:pk>/",
+        TransactionExportDetail.as_view(),
+        name="transaction_export_detail",
+    ),
+    path(
+        "exports/<int:pk>/download/",
+        TransactionExportDownload.as_view(),
+        name="transaction_export_download",
+    ),
+    path("categories/", TransactionCategories.as_view(), name="transaction_categories"),
+    path(
+        "categories/<int:pk>/",
+        TransactionCategoryDetail.as_view(),
+        name="transaction_category_detail",
+    ),
+    path("budgets/", TransactionBudgets.as_view(), name="transaction_budgets"),
+    path(
+        "budgets/<int:pk>/",
+        TransactionBudgetDetail.as_view(),
+        name="transaction_budget_detail",
+    ),
+    path("cache/stats/", HistoryCacheStats.as_view(), name="transaction_cache_stats"),
+    path(
+        "async/create/",
+        async_views.create_transaction,
+        name="transaction_async_create",
+    ),
+    path(
+        "async/history/",
+        async_views.transaction_history,
+        name="transaction_async_history",
+    ),
+    path(
+        "async/totals/",
+        async_views.transaction_totals,
+        name="transaction_async_totals",
+    ),
+    path(
+        "async/<int:pk>/",
+        async_views.transaction_detail,
+        name="transaction_async_detail",
+    ),
 ]
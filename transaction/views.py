@@ -1,12 +1,59 @@
+from pathlib import Path
+
 from rest_framework.response import Response
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework.decorators import action
+from rest_framework.utils.urls import replace_query_param
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from django.conf import settings
+from django.db import transaction as db_transaction
 from django.http import Http404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from budgetme.parsers import JSONParser
+from budgetme.renderers import NDJSONRenderer
 
-from .models import Transaction
-from .serializers import TransactionSerializer
+from . import cache as history_cache
+from . import archive, budgets, exports, ledger, search
+from .conditional import (
+    history_validators,
+    not_modified,
+    set_validators,
+    transaction_validators,
+)
+from .filters import filter_transactions
+from .models import (
+    ArchivedTransaction,
+    Budget,
+    Category,
+    DeletedTransaction,
+    ExportJob,
+    Transaction,
+)
+from .pagination import KeysetPagination
+from .parsers import CSVParser, NDJSONParser
+from .serializers import (
+    BudgetSerializer,
+    CategorySerializer,
+    ExportJobSerializer,
+    ExportRequestSerializer,
+    HistoryFilterSerializer,
+    SearchQuerySerializer,
+    SummaryQuerySerializer,
+    TRANSACTION_COLUMNS,
+    TransactionSerializer,
+    serialize_transactions,
+)
+from .streaming import STREAM_FORMATS, stream_transactions
+from .summary import get_summary
+from .sync import ResyncRequired, get_changes
+from .totals import get_totals
 
 
 @extend_schema(tags=["transaction"])
@@ -15,66 +62,423 @@ class CreateTransaction(generics.CreateAPIView):
 
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = "writes"
 
     def post(self, request, *args, **kwargs):
-        serializer = TransactionSerializer(data=request.data)
+        serializer = TransactionSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
         if serializer.is_valid():
             amount = serializer.validated_data["amount"]
             if amount > 0:
                 type = "income"
             else:
                 type = "expense"
-            serializer.save(user=request.user, type=type)
+            with db_transaction.atomic():
+                instance = serializer.save(user=request.user, type=type)
+                ledger.record(request.user, added=[amount])
+                budget_statuses = budgets.record(
+                    request.user,
+                    added=[(instance.category_id, amount, instance.date_added)],
+                )
+                history_cache.invalidate_on_commit(request.user.pk)
             response = {
                 "message": "Transaction created successfully",
                 "status": status.HTTP_201_CREATED,
                 "response": serializer.data,
+                "budgets": budget_statuses,
             }
             return Response(response, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-@extend_schema(tags=["transaction"])
+@extend_schema(
+    tags=["transaction"],
+    request=TransactionSerializer(many=True),
+    responses={201: TransactionSerializer(many=True)},
+)
+class BulkCreateTransaction(generics.CreateAPIView):
+    """creates many transactions from a JSON array, NDJSON or CSV upload"""
+
+    serializer_class = TransactionSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "bulk"
+    parser_classes = [JSONParser, NDJSONParser, CSVParser]
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"Error": "Expected a list of transactions"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.TRANSACTION_BULK_MAX_ITEMS:
+            return Response(
+                {
+                    "Error": f"At most {settings.TRANSACTION_BULK_MAX_ITEMS} "
+                    "transactions can be created at once"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = TransactionSerializer(
+            data=items, many=True, context=self.get_serializer_context()
+        )
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append(serializer.child.run_validation(item))
+            except ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+
+        if not valid:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        amounts = [data["amount"] for data in valid]
+        types = ["income" if amount > 0 else "expense" for amount in amounts]
+        transactions = [
+            Transaction(user=request.user, type=type, **data)
+            for data, type in zip(valid, types)
+        ]
+        with db_transaction.atomic():
+            created = Transaction.objects.bulk_create(
+                transactions, batch_size=settings.TRANSACTION_BULK_BATCH_SIZE
+            )
+            ledger.record(request.user, added=amounts)
+            budget_statuses = budgets.record(
+                request.user,
+                added=[
+                    (row.category_id, row.amount, row.date_added) for row in created
+                ],
+            )
+            history_cache.invalidate_on_commit(request.user.pk)
+
+        response = {
+            "message": f"{len(created)} transactions created successfully",
+            "status": status.HTTP_201_CREATED,
+            "response": TransactionSerializer(created, many=True).data,
+            "errors": errors,
+            "budgets": budget_statuses,
+        }
+        return Response(response, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(
+    tags=["transaction"],
+    parameters=[
+        HistoryFilterSerializer,
+        OpenApiParameter(
+            "stream",
+            str,
+            enum=list(STREAM_FORMATS),
+            description="stream the full history as a JSON array or NDJSON instead of a page",
+        ),
+    ],
+)
 class GetTransaction(generics.ListAPIView):
-    """gets all transactions"""
+    """gets all transactions, a page at a time"""
 
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = "history"
+    pagination_class = KeysetPagination
+    # Accept: application/x-ndjson streams the whole history like ?stream=ndjson
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
 
     def get_queryset(self):
         return Transaction.objects.filter(user=self.request.user)
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        # the ETag depends on Accept, DRF only adds this with several renderers
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    def get_archived(self, filters, boundary=None):
+        """the archived rows matching filters, None when filters can't reach them"""
+        if boundary is None:
+            boundary = archive.get_boundary(self.request.user)
+        if not archive.reaches_archive(boundary, filters):
+            return None
+        return archive.archived_queryset(self.request.user, filters)
+
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        total_income = sum(t.amount for t in queryset if t.amount > 0)
-        total_expense = sum(t.amount for t in queryset if t.amount < 0)
-        balance = float(total_income + total_expense)
-        serializer = TransactionSerializer(queryset, many=True)
+        filters = HistoryFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+
+        query_string = request.META.get("QUERY_STRING", "")
+        # read before the query, a write committing while the page is built
+        # then leaves it under a version that's already stale
+        version = history_cache.get_version(request.user.pk)
+        etag, last_modified = history_validators(
+            request.user, query_string, request.accepted_renderer.format, version
+        )
+        unchanged = not_modified(request, etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+
+        queryset = filter_transactions(self.get_queryset(), filters.validated_data)
+        stream_format = request.query_params.get("stream")
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            stream_format = "ndjson"
+        if stream_format in STREAM_FORMATS:
+            archived = self.get_archived(filters.validated_data)
+            if archived is not None:
+                archived = archived.order_by(*self.paginator.ordering)
+            return set_validators(
+                stream_transactions(
+                    queryset.order_by(*self.paginator.ordering),
+                    stream_format,
+                    archived,
+                ),
+                etag,
+                last_modified,
+            )
+
+        key = history_cache.history_key(request.user.pk, version, query_string)
+        payload = history_cache.get_history(key)
+        cache_status = "HIT"
+        if payload is None:
+            cache_status = "MISS"
+            boundary = archive.get_boundary(request.user)
+            if filters.validated_data:
+                totals = archive.add_archived_totals(
+                    get_totals(queryset),
+                    request.user,
+                    filters.validated_data,
+                    boundary,
+                )
+            else:
+                totals = ledger.get_balance(request.user)
+            page = self.paginator.paginate_values(
+                queryset,
+                request,
+                TRANSACTION_COLUMNS,
+                self.get_archived(filters.validated_data, boundary),
+                boundary,
+            )
+            payload = {
+                "income": totals["income"],
+                "expense": totals["expense"],
+                "balance": totals["balance"],
+                "history": serialize_transactions(page),
+                "next": self.paginator.get_next_link(),
+            }
+            history_cache.set_history(key, payload)
+
         response = {
             "message": "Transactions retrieved successfully",
             "status": status.HTTP_200_OK,
+            "response": payload,
+        }
+        return set_validators(
+            Response(
+                response, status=status.HTTP_200_OK, headers={"X-Cache": cache_status}
+            ),
+            etag,
+            last_modified,
+        )
+
+
+@extend_schema(
+    tags=["transaction"],
+    parameters=[SummaryQuerySerializer],
+    responses={200: OpenApiTypes.OBJECT},
+)
+class TransactionSummary(generics.GenericAPIView):
+    """income, expense and net per day, week or month"""
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "history"
+
+    def get_queryset(self):
+        return Transaction.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        query = SummaryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        options = query.validated_data
+
+        with timezone.override(options["tz"]):
+            queryset = filter_transactions(self.get_queryset(), options)
+            boundary = archive.get_boundary(request.user)
+            if archive.reaches_archive(boundary, options):
+                buckets = archive.merge_summaries(
+                    get_summary(queryset, options["period"], options["tz"]),
+                    archive.archived_summary(
+                        request.user,
+                        options,
+                        options["period"],
+                        options["tz"],
+                        boundary,
+                    ),
+                    cumulative=options["cumulative"],
+                    rolling=options.get("rolling"),
+                )
+            else:
+                buckets = get_summary(
+                    queryset,
+                    options["period"],
+                    options["tz"],
+                    cumulative=options["cumulative"],
+                    rolling=options.get("rolling"),
+                )
+            for bucket in buckets:
+                bucket["bucket"] = timezone.localdate(bucket["bucket"])
+
+        response = {
+            "message": "Summary retrieved successfully",
+            "status": status.HTTP_200_OK,
             "response": {
-                "income": total_income,
-                "expense": total_expense,
-                "balance": balance,
-                "history": serializer.data,
+                "period": options["period"],
+                "tz": str(options["tz"]),
+                "buckets": buckets,
             },
         }
         return Response(response, status=status.HTTP_200_OK)
 
 
+@extend_schema(
+    tags=["transaction"],
+    parameters=[
+        SearchQuerySerializer,
+        OpenApiParameter(
+            KeysetPagination.page_size_query_param,
+            int,
+            description="Number of results to return per page.",
+        ),
+    ],
+    responses={200: OpenApiTypes.OBJECT},
+)
+class TransactionSearch(generics.GenericAPIView):
+    """transactions whose description matches the search words, best match first"""
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "history"
+
+    def get(self, request, *args, **kwargs):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        page = query.validated_data["page"]
+        page_size = KeysetPagination().get_page_size(request)
+
+        boundary = archive.get_boundary(request.user)
+        matches = search.search(
+            request.user,
+            query.validated_data["q"],
+            page_size + 1,
+            (page - 1) * page_size,
+            archived=boundary is not None,
+        )
+        has_next = len(matches) > page_size
+        ids = [id for id, _ in matches[:page_size]]
+
+        rows = {}
+        for model in (Transaction, ArchivedTransaction) if boundary else (Transaction,):
+            for row in model.objects.filter(id__in=ids, user=request.user).values_list(
+                *TRANSACTION_COLUMNS
+            ):
+                rows[row[0]] = row
+        # a row deleted since the search ran is skipped
+        results = serialize_transactions(rows[id] for id in ids if id in rows)
+
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "page", page + 1
+            )
+        response = {
+            "message": "Transactions retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": {"results": results, "next": next_link},
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["transaction"],
+    parameters=[
+        OpenApiParameter(
+            "since",
+            str,
+            description=(
+                "the next token of the previous sync, omit for a full sync. "
+                "Changes and deletions of the last few minutes are sent again, "
+                "apply them by id. A 410 means the token expired and a full "
+                "sync is needed"
+            ),
+        ),
+        OpenApiParameter(
+            KeysetPagination.page_size_query_param,
+            int,
+            description="Number of changed and deleted rows to return at most.",
+        ),
+    ],
+    responses={200: OpenApiTypes.OBJECT},
+)
+class TransactionSync(generics.GenericAPIView):
+    """transactions changed and deleted since the last sync"""
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "history"
+
+    def get(self, request, *args, **kwargs):
+        limit = KeysetPagination().get_page_size(request)
+        try:
+            changes = get_changes(
+                request.user, request.query_params.get("since"), limit
+            )
+        except ValueError:
+            return Response(
+                {"Error": "Invalid sync token"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except ResyncRequired:
+            return Response(
+                {"Error": "Sync token expired, sync again without since"},
+                status=status.HTTP_410_GONE,
+            )
+
+        changes["changed"] = TransactionSerializer(changes["changed"], many=True).data
+        response = {
+            "message": "Changes retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": changes,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+
 @extend_schema(tags=["transaction"])
 class RetrieveEditDestroyTransaction(generics.RetrieveUpdateDestroyAPIView):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = {"PUT": "writes", "PATCH": "writes", "DELETE": "writes"}
 
     def get_object(self):
-        try:
-            transaction_id = self.kwargs["pk"]
-            return Transaction.objects.get(id=transaction_id, user=self.request.user)
-        except Transaction.DoesNotExist:
+        """the user's transaction, or the archived one with that id"""
+        transaction_id = self.kwargs["pk"]
+        for model in (Transaction, ArchivedTransaction):
+            instance = model.objects.filter(
+                id=transaction_id, user=self.request.user
+            ).first()
+            if instance is not None:
+                return instance
+        raise Http404("The transaction does not exist")
+
+    def archived_conflict(self):
+        return Response(
+            {"Error": "Archived transactions can't be changed"},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = transaction_validators(request.user, self.kwargs["pk"])
+        if validators is None:
             raise Http404("The transaction does not exist")
+        unchanged = not_modified(request, *validators)
+        if unchanged is not None:
+            return unchanged
+        return set_validators(super().retrieve(request, *args, **kwargs), *validators)
 
     @extend_schema(
         summary="Partially update a transaction",
@@ -82,25 +486,62 @@ class RetrieveEditDestroyTransaction(generics.RetrieveUpdateDestroyAPIView):
         responses={200: TransactionSerializer},
     )
     def patch(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = TransactionSerializer(instance, data=request.data, partial=True)
-        if serializer.is_valid():
-            amount = serializer.validated_data["amount"]
+        return self.update(request, *args, partial=True, **kwargs)
+
+    def lock_object(self):
+        """
+        the user's live transaction, locked until the surrounding atomic block
+        ends, so concurrent writes of it apply one after the other
+        """
+        instance = (
+            Transaction.objects.select_for_update()
+            .filter(id=self.kwargs["pk"], user=self.request.user)
+            .first()
+        )
+        if instance is None:
+            raise Http404("The transaction does not exist")
+        return instance
+
+    def update(self, request, *args, **kwargs):
+        """PUT and PATCH, both keep the ledger, budgets and cached history in step"""
+        if isinstance(self.get_object(), ArchivedTransaction):
+            return self.archived_conflict()
+        with db_transaction.atomic():
+            instance = self.lock_object()
+            previous = (instance.category_id, instance.amount, instance.date_added)
+            serializer = TransactionSerializer(
+                instance,
+                data=request.data,
+                partial=kwargs.get("partial", False),
+                context=self.get_serializer_context(),
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            amount = serializer.validated_data.get("amount", instance.amount)
             if amount > 0:
                 type = "income"
             else:
                 type = "expense"
-            serializer.save(type=type)
-            response = {
-                "message": "Transaction updated successfully",
-                "status": status.HTTP_200_OK,
-                "response": serializer.data,
-            }
-            return Response(response, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            instance = serializer.save(type=type)
+            ledger.record(request.user, added=[amount], removed=[previous[1]])
+            budget_statuses = budgets.record(
+                request.user,
+                added=[(instance.category_id, amount, instance.date_added)],
+                removed=[previous],
+            )
+            history_cache.invalidate_on_commit(request.user.pk)
+        response = {
+            "message": "Transaction updated successfully",
+            "status": status.HTTP_200_OK,
+            "response": serializer.data,
+            "budgets": budget_statuses,
+        }
+        return Response(response, status=status.HTTP_200_OK)
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
+        if isinstance(instance, ArchivedTransaction):
+            return self.archived_conflict()
         transaction_description = instance.description
         self.perform_destroy(instance)
 
@@ -113,4 +554,325 @@ class RetrieveEditDestroyTransaction(generics.RetrieveUpdateDestroyAPIView):
         )
 
     def perform_destroy(self, instance):
-        instance.delete()
+        with db_transaction.atomic():
+            instance = self.lock_object()
+            transaction_id = instance.id
+            deleted = Transaction.objects.filter(id=transaction_id).delete()[0]
+            if deleted != 1:
+                # a concurrent delete got there first and recorded it
+                return
+            DeletedTransaction.objects.create(
+                user=self.request.user, transaction_id=transaction_id
+            )
+            ledger.record(self.request.user, removed=[instance.amount])
+            budgets.record(
+                self.request.user,
+                removed=[(instance.category_id, instance.amount, instance.date_added)],
+            )
+            history_cache.invalidate_on_commit(self.request.user.pk)
+
+
+@extend_schema(tags=["transaction"], responses={200: dict})
+class HistoryCacheStats(generics.GenericAPIView):
+    """hit and miss counts of the history cache in this worker"""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        response = {
+            "message": "Cache stats retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": history_cache.stats(),
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["transaction"],
+    request=ExportRequestSerializer,
+    responses={200: ExportJobSerializer(many=True), 202: ExportJobSerializer},
+)
+class TransactionExports(generics.GenericAPIView):
+    """queues an export of the transaction history, or lists the latest exports"""
+
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_scope = {"POST": "bulk"}
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        jobs = self.get_queryset().order_by("-date_created")[
+            : settings.TRANSACTION_PAGE_SIZE
+        ]
+        response = {
+            "message": "Exports retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": self.get_serializer(jobs, many=True).data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def post(self, request, *args, **kwargs):
+        export = ExportRequestSerializer(data=request.data)
+        export.is_valid(raise_exception=True)
+        format = export.validated_data.pop("format")
+        if format not in exports.available_formats():
+            raise ValidationError(
+                {"format": [f"{format} exports aren't available on this server."]}
+            )
+
+        active = self.get_queryset().filter(status__in=["pending", "running"])
+        if active.count() >= settings.EXPORT_MAX_ACTIVE_JOBS:
+            return Response(
+                {"Error": "Wait for your running exports to finish first"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        filters = HistoryFilterSerializer(export.validated_data).data
+        job = ExportJob.objects.create(
+            user=request.user, format=format, filters=filters
+        )
+        response = {
+            "message": "Export queued successfully",
+            "status": status.HTTP_202_ACCEPTED,
+            "response": self.get_serializer(job).data,
+        }
+        location = reverse("transaction_export_detail", kwargs={"pk": job.pk})
+        return Response(
+            response,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": request.build_absolute_uri(location)},
+        )
+
+
+@extend_schema(tags=["transaction"])
+class TransactionExportDetail(generics.RetrieveDestroyAPIView):
+    """status of an export, or deletes it with its file"""
+
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = {
+            "message": "Export retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": self.get_serializer(self.get_object()).data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.get_object()
+        # the worker saves the job when it's done, let it finish first
+        if job.status == "running":
+            return Response(
+                {"Error": "The export is running, delete it once it has finished"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.file:
+            Path(job.file).unlink(missing_ok=True)
+        job.delete()
+        return Response(
+            {
+                "Message": "Export deleted successfully",
+                "status": status.HTTP_204_NO_CONTENT,
+            },
+            status=status.HTTP_204_NO_CONTENT,
+        )
+
+
+@extend_schema(tags=["transaction"], responses={(200, "*/*"): OpenApiTypes.BINARY})
+class TransactionExportDownload(generics.GenericAPIView):
+    """the file of a finished export, supports Range requests to resume downloads"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != "done":
+            return Response(
+                {"Error": f"The export is {job.status}"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        path = Path(job.file)
+        if not path.exists():
+            raise Http404("The export file does not exist")
+        suffix, content_type = exports.EXPORT_FILES[job.format]
+        etag = f'"export-{job.pk}-{job.size}-{job.date_finished.timestamp():.0f}"'
+        return exports.ranged_file_response(
+            request, path, content_type, f"transactions-{job.pk}.{suffix}", etag
+        )
+
+
+@extend_schema(tags=["transaction"])
+class TransactionCategories(generics.ListCreateAPIView):
+    """lists the categories transactions can be filed under, or adds one"""
+
+    serializer_class = CategorySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Category.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        response = {
+            "message": "Categories retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": self.get_serializer(self.get_queryset(), many=True).data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        response = {
+            "message": "Category created successfully",
+            "status": status.HTTP_201_CREATED,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["transaction"])
+class TransactionCategoryDetail(generics.RetrieveUpdateDestroyAPIView):
+    """renames or deletes a category, its transactions are kept uncategorised"""
+
+    serializer_class = CategorySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Category.objects.filter(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = {
+            "message": "Category retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": self.get_serializer(self.get_object()).data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            self.get_object(), data=request.data, partial=kwargs.get("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        response = {
+            "message": "Category updated successfully",
+            "status": status.HTTP_200_OK,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def destroy(self, request, *args, **kwargs):
+        category = self.get_object()
+        with db_transaction.atomic():
+            # sync clients and cached history have to see the category go
+            Transaction.objects.filter(category=category).update(
+                category=None, date_modified=timezone.now()
+            )
+            category.delete()
+            history_cache.invalidate_on_commit(request.user.pk)
+        return Response(
+            {
+                "Message": f"Category {category.name} deleted successfully",
+                "status": status.HTTP_204_NO_CONTENT,
+            },
+            status=status.HTTP_204_NO_CONTENT,
+        )
+
+
+@extend_schema(tags=["transaction"])
+class TransactionBudgets(generics.ListCreateAPIView):
+    """lists the budgets with their current spend, or adds one"""
+
+    serializer_class = BudgetSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Budget.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        budget_list = list(self.get_queryset())
+        serializer = self.get_serializer(budget_list, many=True)
+        serializer.context["statuses"] = budgets.current_statuses(budget_list)
+        response = {
+            "message": "Budgets retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with db_transaction.atomic():
+            # start_tracking replaces tracked_from with the start of the period
+            budget = serializer.save(user=request.user, tracked_from=timezone.now())
+            budgets.start_tracking(budget)
+        serializer.context["statuses"] = budgets.current_statuses([budget])
+        response = {
+            "message": "Budget created successfully",
+            "status": status.HTTP_201_CREATED,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["transaction"])
+class TransactionBudgetDetail(generics.RetrieveUpdateDestroyAPIView):
+    """a budget with its current spend, changes its limit, or deletes it"""
+
+    serializer_class = BudgetSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Budget.objects.filter(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        budget = self.get_object()
+        serializer = self.get_serializer(budget)
+        serializer.context["statuses"] = budgets.current_statuses([budget])
+        response = {
+            "message": "Budget retrieved successfully",
+            "status": status.HTTP_200_OK,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def update(self, request, *args, **kwargs):
+        budget = self.get_object()
+        tracked = (budget.category_id, budget.period)
+        serializer = self.get_serializer(
+            budget, data=request.data, partial=kwargs.get("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+        with db_transaction.atomic():
+            budget = serializer.save()
+            if (budget.category_id, budget.period) != tracked:
+                # the old spend rows count something else now
+                budgets.start_tracking(budget)
+        serializer.context["statuses"] = budgets.current_statuses([budget])
+        response = {
+            "message": "Budget updated successfully",
+            "status": status.HTTP_200_OK,
+            "response": serializer.data,
+        }
+        return Response(response, status=status.HTTP_200_OK)
+
+    def destroy(self, request, *args, **kwargs):
+        self.get_object().delete()
+        return Response(
+            {
+                "Message": "Budget deleted successfully",
+                "status": status.HTTP_204_NO_CONTENT,
+            },
+            status=status.HTTP_204_NO_CONTENT,
+        )